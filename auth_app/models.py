@@ -61,6 +61,7 @@ class JobProvider(models.Model):
     company_website = models.URLField(null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     location = models.CharField(max_length=255)
+    canonical_location = models.ForeignKey('location_app.Location', on_delete=models.SET_NULL, null=True, blank=True, related_name='job_providers')
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
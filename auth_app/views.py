@@ -8,7 +8,7 @@ from rest_framework import status
 from django.contrib.auth import authenticate,login
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework.permissions import IsAuthenticated
-from django.core.mail import send_mail
+from notification_app.email import queue_email
 from django.core.cache import cache
 import random
 from django.middleware.csrf import get_token
@@ -134,13 +134,7 @@ class SignupView(APIView):
             cache.set(cache_key, otp, timeout=300)
 
             try:
-                send_mail(
-                    subject='Seekerspot Email Verification OTP',
-                    message=f'Your OTP to verify your email is: {otp}. It expires in 5 minutes.',
-                    from_email=None,
-                    recipient_list=[user.email],
-                    fail_silently=False,
-                )
+                queue_email('verification_otp', user.email, {'otp': otp})
             except Exception as e:
                 return Response({'error': f'Failed to send OTP: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -163,13 +157,7 @@ class SendVerificationOTPView(APIView):
             cache.set(cache_key, otp, timeout=300) 
 
             try:
-                send_mail(
-                    subject='Seekerspot Email Verification OTP',
-                    message=f'Your OTP to verify your email is: {otp}. It expires in 5 minutes.',
-                    from_email=None,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
+                queue_email('verification_otp', email, {'otp': otp})
             except Exception as e:
                 return Response({'error': f'Failed to send OTP: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -183,14 +171,7 @@ class VerifyOTPView(APIView):
             user = serializer.save()
             if user.user_type == 'job_provider':
                 try:
-                    send_mail(
-                        subject='Seekerspot Account Verification Pending',
-                        message='Thank you for verifying your email. Your profile is now pending admin verification. '
-                                'You will receive an email once your account has been verified by our admin team.',
-                        from_email=None,
-                        recipient_list=[user.email],
-                        fail_silently=False,
-                    )
+                    queue_email('provider_verification_pending', user.email)
                 except Exception as e:
                     print(f"Failed to send admin verification email: {str(e)}")
             return Response({'message': 'Email verified successfully.', 'user': UserSerializer(user).data}, status=status.HTTP_200_OK)
@@ -239,13 +220,7 @@ class ForgotPasswordView(APIView):
             cache.set(cache_key,otp,timeout=300)
 
             try:
-                send_mail(
-                    subject='Seekerspot Password Reset OTP',
-                    message=f'Your OTP for password reset is: {otp}. It expires in 5 minutes.',
-                    from_email=None,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
+                queue_email('password_reset_otp', email, {'otp': otp})
             except Exception as e:
                 return Response({'error': f'Failed to send email: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(Exception):
+    """Raised when a client sends a cursor that cannot be decoded"""
+    pass
+
+
+def is_cursor_request(request):
+    """Cursor mode is opted into with ?pagination=cursor or by sending a cursor"""
+    return (
+        request.query_params.get('pagination', '').lower() == 'cursor'
+        or 'cursor' in request.query_params
+    )
+
+
+def wants_total(request):
+    return request.query_params.get('include_total', '').lower() == 'true'
+
+
+def approximate_count(queryset):
+    """
+    Estimate the number of rows a queryset would return from the
+    Postgres planner instead of running COUNT(*).
+    """
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f"Could not estimate row count: {str(e)}")
+        return None
+
+
+class KeysetPaginator:
+    """
+    Keyset (seek) pagination over a queryset.
+
+    Rows are ordered by ``ordering`` with the primary key as a tie breaker and
+    each page is fetched with a ``WHERE (field, id) < (last_field, last_id)``
+    style predicate, so deep pages cost the same as the first one and no
+    COUNT(*) is needed. Cursors are opaque base64 tokens.
+
+    ``ordering`` may name a model field, a related field (``user__email``) or
+    an annotation already present on the queryset (``search_rank``), with an
+    optional leading ``-`` for descending order. Float keys are compared in
+    double precision: ``ts_rank`` returns a 4 byte ``real`` that would never
+    equal the 8 byte float stored in the cursor, breaking the id tie-break.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        self.page_size = page_size
+
+    def encode_cursor(self, obj, direction):
+        value = getattr(obj, '_keyset_value')
+        payload = {'v': value, 'id': obj.pk, 'd': direction}
+        if isinstance(value, datetime):
+            # Keep full microsecond precision so no row is skipped or repeated
+            payload['v'] = value.isoformat()
+            payload['t'] = 'dt'
+        raw = json.dumps(payload).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value, pk, direction = payload['v'], payload['id'], payload['d']
+            if payload.get('t') == 'dt':
+                value = parse_datetime(value)
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            raise InvalidCursor('Invalid cursor')
+        if direction not in ('n', 'p') or value is None:
+            raise InvalidCursor('Invalid cursor')
+        return value, pk, direction
+
+    def _seek_filter(self, value, pk, forward):
+        # Moving forward through a descending ordering means smaller keys
+        smaller = self.descending == forward
+        op = 'lt' if smaller else 'gt'
+        return (
+            Q(**{f'_keyset_value__{op}': value})
+            | Q(_keyset_value=value, **{f'pk__{op}': pk})
+        )
+
+    def paginate(self, cursor=None):
+        """
+        Return ``(items, next_cursor, previous_cursor)`` for the page that
+        follows (or precedes) ``cursor``.
+        """
+        queryset = self.queryset.annotate(_keyset_value=F(self.field))
+        if isinstance(queryset.query.annotations['_keyset_value'].output_field, FloatField):
+            queryset = self.queryset.annotate(_keyset_value=Cast(self.field, FloatField()))
+        forward = True
+        if cursor:
+            value, pk, direction = self.decode_cursor(cursor)
+            forward = direction == 'n'
+            queryset = queryset.filter(self._seek_filter(value, pk, forward))
+
+        # Walking backwards reads the rows in reverse and flips them afterwards
+        reverse = self.descending == forward
+        prefix = '-' if reverse else ''
+        queryset = queryset.order_by(f'{prefix}_keyset_value', f'{prefix}pk')
+
+        items = list(queryset[:self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[:self.page_size]
+        if not forward:
+            items.reverse()
+
+        if not items:
+            return items, None, None
+
+        if forward:
+            next_cursor = self.encode_cursor(items[-1], 'n') if has_more else None
+            previous_cursor = self.encode_cursor(items[0], 'p') if cursor else None
+        else:
+            next_cursor = self.encode_cursor(items[-1], 'n')
+            previous_cursor = self.encode_cursor(items[0], 'p') if has_more else None
+        return items, next_cursor, previous_cursor
+
+    def get_response_data(self, results, next_cursor, previous_cursor, include_total=False):
+        data = {
+            'results': results,
+            'next_cursor': next_cursor,
+            'previous_cursor': previous_cursor,
+        }
+        if include_total:
+            data['approximate_count'] = approximate_count(self.queryset)
+        return data
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -56,6 +57,7 @@ INSTALLED_APPS = [
     'notification_app',
     'user_management_app',
     'dashboard_app',
+    'location_app',
     'social_django',
     ]
 # Channels settings
@@ -217,19 +219,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'auth_app.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() == 'true'
 EMAIL_HOST_USER = os.getenv('EMAIL_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Shared between workers: unread counters, skill bitsets and the cache
+# generation keys all rely on every process seeing the same values
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',  
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://127.0.0.1:6379/1'),
     }
 }
+# Notifications older than this move to the archive table (archive_notifications command)
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_ARCHIVE_RETENTION_DAYS = int(os.getenv('NOTIFICATION_ARCHIVE_RETENTION_DAYS', 365))
+# Same-source notifications of these types are merged when they arrive within the window (seconds)
+NOTIFICATION_COALESCE_WINDOWS = {
+    'job_applied': int(os.getenv('NOTIFICATION_COALESCE_JOB_APPLIED_SECONDS', 15 * 60)),
+}
+# Insert chat messages in batches and broadcast them once committed (community_app.writer)
+COMMUNITY_CHAT_BATCH_WRITES = os.getenv('COMMUNITY_CHAT_BATCH_WRITES', 'false').lower() == 'true'
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 os.makedirs(LOGS_DIR, exist_ok=True)
 
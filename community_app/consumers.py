@@ -1,10 +1,15 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import Community, CommunityMessage, CommunityMember, UserReadStatus
+from .models import Community, CommunityMessage, UserReadStatus
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 import logging
-from .utils import get_attachment_type
+from .membership import is_member, user_group_name
+from .recent import append_recent_message
+from .unread import get_unread_counts, read_position
+from .writer import chat_message_event, find_resent_messages, lock_message_order, message_writer
 from django.db import transaction
 
 logger = logging.getLogger(__name__)
@@ -31,6 +36,9 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
                 self.community_groups[community.id] = group_name
                 await self.channel_layer.group_add(group_name, self.channel_name)
                 logger.debug("Joined group: %s", group_name)
+            # Per-connection membership, kept current by membership_changed events
+            self.member_of = set(self.community_groups) if self.user.user_type != 'admin' else set()
+            await self.channel_layer.group_add(user_group_name(self.user.id), self.channel_name)
             
             await self.accept()
             logger.info("WebSocket connection accepted for user: %s", self.user.username)
@@ -53,6 +61,7 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
                     logger.debug("Discarded group: %s", group_name)
                 except Exception as e:
                     logger.error("Error discarding group %s: %s", group_name, str(e))
+            await self.channel_layer.group_discard(user_group_name(self.user.id), self.channel_name)
         logger.info("WebSocket disconnected: close_code=%s", close_code)
 
     async def receive(self, text_data):
@@ -69,6 +78,8 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
             community_id = data.get('community_id')
             message = data.get('message', '')
             attachment = data.get('attachment')
+            # Echoed back in the acknowledgement so the client can match it
+            client_id = data.get('client_id')
             
             
             if not community_id:
@@ -86,28 +97,24 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
                 }))
                 return
                 
-            if message.strip() or attachment:
-                saved_message = await self.save_message(community_id, message, attachment)
-                
-                attachment_url = None
-                if saved_message.attachment:
-                    attachment_url = saved_message.attachment.url
+            if client_id is not None:
+                client_id = str(client_id)[:64]
+            
+            if message.strip() and not attachment and settings.COMMUNITY_CHAT_BATCH_WRITES:
+                self.queue_message(community_id, message, client_id)
+            elif message.strip() or attachment:
+                saved_message = await self.save_message(community_id, message, attachment, client_id)
                 
                 await self.channel_layer.group_send(
                     f'community_{community_id}',
-                    {
-                        'type': 'chat_message',
-                        'community_id': community_id,
-                        'message': message,
-                        'attachment': attachment_url,
-                        'attachment_type': get_attachment_type(saved_message.attachment) if saved_message.attachment else None,
-                        'sender': self.user.username,
-                        'sender_id': self.user.id,
-                        'timestamp': saved_message.created_at.isoformat(),
-                        'id': saved_message.id
-                    }
+                    chat_message_event(saved_message)
                 )
                 logger.debug("Message sent to group: community_%s", community_id)
+                await self.message_persisted({
+                    'community_id': community_id,
+                    'id': saved_message.id,
+                    'client_id': client_id
+                })
         except json.JSONDecodeError:
             logger.error("Invalid message format received")
             await self.send(text_data=json.dumps({
@@ -135,6 +142,37 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error("Error sending chat message to client: %s", str(e))
 
+    def queue_message(self, community_id, message, client_id):
+        """
+        Hand a text message to the batching writer, which broadcasts it and
+        acknowledges it to this socket once it is stored
+        """
+        message_writer.submit(CommunityMessage(
+            community_id=int(community_id),
+            sender=self.user,
+            content=message,
+            created_at=timezone.now(),
+            client_id=client_id
+        ), self.channel_name)
+
+    async def message_persisted(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'message_ack',
+            'community_id': event['community_id'],
+            'id': event['id'],
+            'client_id': event.get('client_id'),
+            'status': 'persisted'
+        }))
+
+    async def message_failed(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'message_failed',
+            'community_id': event['community_id'],
+            'id': event['id'],
+            'client_id': event.get('client_id'),
+            'error': 'Message could not be saved, please resend it'
+        }))
+
     @database_sync_to_async
     def get_user_communities(self):
         try:
@@ -145,42 +183,65 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
             logger.error("Error fetching user communities: %s", str(e))
             raise
 
-    @database_sync_to_async
-    def is_member_or_admin(self, community_id):
+    async def is_member_or_admin(self, community_id):
+        """Answered from this connection's memberships, then the shared cache"""
         if not self.user.is_authenticated:
             return False
         
-        logger.debug("Checking membership for user: %s, community_id: %s", self.user.username, community_id)
-        
         if self.user.user_type == 'admin':
             return True
-            
+        
         try:
-            community = Community.objects.get(id=community_id)
-            is_member = CommunityMember.objects.filter(
-                community=community,
-                user=self.user
-            ).exists()
-            
-            logger.debug("User %s membership check for community %s: %s", self.user.username, community_id, is_member)
-            return is_member
-        except Community.DoesNotExist:
-            logger.warning("Community not found: %s", community_id)
+            community_id = int(community_id)
+        except (TypeError, ValueError):
+            logger.warning("Invalid community id: %s", community_id)
             return False
+        if community_id in self.member_of:
+            return True
+        
+        try:
+            member = await database_sync_to_async(is_member)(community_id, self.user.id)
+            logger.debug("User %s membership check for community %s: %s", self.user.username, community_id, member)
+            return member
         except Exception as e:
             logger.error("Error checking membership: %s", str(e))
             return False
 
+    async def membership_changed(self, event):
+        """The user joined or left a community, possibly from another device"""
+        community_id = event['community_id']
+        group_name = f'community_{community_id}'
+        if event['is_member']:
+            self.member_of.add(community_id)
+            if community_id not in self.community_groups:
+                self.community_groups[community_id] = group_name
+                await self.channel_layer.group_add(group_name, self.channel_name)
+        else:
+            self.member_of.discard(community_id)
+            if self.user.user_type != 'admin' and self.community_groups.pop(community_id, None):
+                await self.channel_layer.group_discard(group_name, self.channel_name)
+        await self.send(text_data=json.dumps(event))
+
     @database_sync_to_async
-    def save_message(self, community_id, message, attachment):
+    def save_message(self, community_id, message, attachment, client_id=None):
         try:
             community = Community.objects.get(id=community_id)
-            return CommunityMessage.objects.create(
-                community=community,
-                sender=self.user,
-                content=message,
-                attachment=attachment
-            )
+            with transaction.atomic():
+                lock_message_order([community.id])
+                saved_message = CommunityMessage(
+                    community=community,
+                    sender=self.user,
+                    content=message,
+                    attachment=attachment,
+                    client_id=client_id
+                )
+                resent = find_resent_messages([saved_message]).get((self.user.id, client_id))
+                if resent is not None:
+                    # Resend of a message whose acknowledgement was lost
+                    return resent
+                saved_message.save()
+                append_recent_message(saved_message)
+            return saved_message
         except Community.DoesNotExist:
             raise ValueError(f"Community not found: {community_id}")
         except Exception as e:
@@ -232,15 +293,7 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
         try:
             with transaction.atomic():
                 community = Community.objects.get(id=community_id)
-                
-                if message_id:
-                    try:
-                        message_id = int(message_id)
-                        message = CommunityMessage.objects.get(id=message_id, community=community)
-                    except (ValueError, TypeError):
-                        message = CommunityMessage.objects.filter(community=community).order_by('-created_at').first()
-                else:
-                    message = CommunityMessage.objects.filter(community=community).order_by('-created_at').first()
+                message = read_position(community.id, message_id)
                     
                 if message:
                     UserReadStatus.objects.update_or_create(
@@ -271,31 +324,10 @@ class CommunityChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def get_unread_counts(self):
         try:
-            result = {}
-            if self.user.user_type == 'admin':
-                communities = Community.objects.all()
-            else:
-                communities = Community.objects.filter(members__user=self.user)
-                
-            for community in communities:
-                read_status = UserReadStatus.objects.filter(
-                    user=self.user,
-                    community=community
-                ).first()
-                
-                if read_status and read_status.last_read_message:
-                    unread_count = CommunityMessage.objects.filter(
-                        community=community,
-                        created_at__gt=read_status.last_read_message.created_at
-                    ).exclude(sender=self.user).count()  
-                else:
-                    unread_count = CommunityMessage.objects.filter(
-                        community=community
-                    ).exclude(sender=self.user).count()
-                
-                result[str(community.id)] = unread_count
-                
-            return result
+            return {
+                str(community_id): unread_count
+                for community_id, (_, unread_count) in get_unread_counts(self.user).items()
+            }
         except Exception as e:
             logger.error("Error getting unread counts: %s", str(e))
-            return {}
\ No newline at end of file
+            return {}
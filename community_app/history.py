@@ -0,0 +1,77 @@
+"""
+Paginated community message history.
+
+Pages are seeked on the (community, id) index instead of offsets, so
+scrolling back through a busy community costs the same on every page. A page
+is either the newest messages, the messages ``before`` or ``after`` a message
+id, or a window ``around`` one (e.g. the first unread message). Messages are
+always returned oldest first. Requests without any paging parameter keep
+getting the full history as a bare list, see ``is_page_request``.
+"""
+from .models import CommunityMessage
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+PAGE_MODES = ('before', 'after', 'around')
+PAGE_PARAMS = PAGE_MODES + ('limit',)
+
+
+def is_page_request(params):
+    """Whether the client asked for a page rather than the legacy full list"""
+    return any(name in params for name in PAGE_PARAMS)
+
+
+def parse_page_params(params):
+    """
+    Read ``before`` / ``after`` / ``around`` and ``limit`` from query params.
+
+    Returns (mode, message_id, limit), mode being None for the newest page.
+
+    Raises:
+        ValueError: On a malformed value or when more than one mode is given
+    """
+    modes = [mode for mode in PAGE_MODES if params.get(mode) not in (None, '')]
+    if len(modes) > 1:
+        raise ValueError("Only one of before, after or around can be given")
+    try:
+        limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        message_id = int(params[modes[0]]) if modes else None
+    except (TypeError, ValueError):
+        raise ValueError("before, after, around and limit must be integers")
+    return (modes[0] if modes else None), message_id, limit
+
+
+def _newest_first(messages, limit):
+    page = list(messages.order_by('-id')[:limit + 1])
+    return page[:limit][::-1], len(page) > limit
+
+
+def _oldest_first(messages, limit):
+    page = list(messages.order_by('id')[:limit + 1])
+    return page[:limit], len(page) > limit
+
+
+def get_message_page(community_id, mode=None, message_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of a community's messages as a dict with ``messages``
+    (CommunityMessage instances, oldest first), ``has_older`` and
+    ``has_newer``. An ``around`` page puts ``message_id`` in its middle.
+    """
+    messages = CommunityMessage.objects.filter(community_id=community_id).select_related('sender')
+
+    if mode == 'around':
+        older_limit = limit // 2
+        older, has_older = _newest_first(messages.filter(id__lt=message_id), older_limit)
+        newer, has_newer = _oldest_first(messages.filter(id__gte=message_id), limit - older_limit)
+        page = older + newer
+    elif mode == 'after':
+        # Everything up to message_id was already delivered
+        page, has_newer = _oldest_first(messages.filter(id__gt=message_id), limit)
+        has_older = True
+    else:
+        if mode == 'before':
+            messages = messages.filter(id__lt=message_id)
+        page, has_older = _newest_first(messages, limit)
+        has_newer = mode == 'before'
+
+    return {'messages': page, 'has_older': has_older, 'has_newer': has_newer}
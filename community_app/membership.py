@@ -0,0 +1,59 @@
+"""
+Community membership cache for chat authorization.
+
+Membership answers (positive and negative) live in the shared cache and are
+rewritten whenever a CommunityMember row is created or deleted: joining,
+leaving, admin deletes and community deletes all go through the
+CommunityMember signals. The same change is pushed to the user's open chat
+sockets, which keep their own set of communities so the hot chat path asks
+neither the cache nor the database.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+import logging
+
+from .models import CommunityMember
+
+logger = logging.getLogger(__name__)
+
+MEMBERSHIP_KEY = 'community:member:{}:{}'
+MEMBERSHIP_TIMEOUT = 60 * 60 * 24
+
+
+def user_group_name(user_id):
+    """Channel group of one user's community chat sockets"""
+    return f'community_user_{user_id}'
+
+
+def is_member(community_id, user_id):
+    """Whether the user belongs to the community, from the cache when possible"""
+    key = MEMBERSHIP_KEY.format(community_id, user_id)
+    member = cache.get(key)
+    if member is None:
+        member = CommunityMember.objects.filter(community_id=community_id, user_id=user_id).exists()
+        cache.add(key, member, timeout=MEMBERSHIP_TIMEOUT)
+    return member
+
+
+def can_access(user, community_id):
+    """Admins read and post in every community, everyone else needs membership"""
+    return user.user_type == 'admin' or is_member(community_id, user.id)
+
+
+def membership_changed(community_id, user_id, member):
+    """Record a join or leave in the cache and tell the user's open sockets once it commits"""
+    def publish():
+        cache.set(MEMBERSHIP_KEY.format(community_id, user_id), member, timeout=MEMBERSHIP_TIMEOUT)
+        try:
+            channel_layer = get_channel_layer()
+            if channel_layer is not None:
+                async_to_sync(channel_layer.group_send)(user_group_name(user_id), {
+                    'type': 'membership_changed',
+                    'community_id': community_id,
+                    'is_member': member,
+                })
+        except Exception as e:
+            logger.error("Could not push membership change of user %s in community %s: %s", user_id, community_id, str(e))
+    transaction.on_commit(publish)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:22
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('community_app', '0003_alter_communitymessage_attachment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='communitymessage',
+            index=models.Index(fields=['community', 'id'], name='community_message_seq_idx'),
+        ),
+    ]
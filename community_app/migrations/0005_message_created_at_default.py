@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community_app', '0004_message_seq_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='communitymessage',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from auth_app.models import User, JobSeeker, JobProvider
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
 from .storage import CommunityAttachmentStorage
 
@@ -56,7 +57,9 @@ class CommunityMessage(models.Model):
         null=True,
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'pdf', 'doc', 'docx'])]
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: batched chat messages are stamped when received, before the insert
+    created_at = models.DateTimeField(default=timezone.now)
+    client_id = models.CharField(max_length=64, null=True, blank=True, editable=False)  # Sender's id for the chat frame, makes resends idempotent
 
     def __str__(self):
         return f"Message by {self.sender.username} in {self.community.name}"
@@ -64,6 +67,15 @@ class CommunityMessage(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['community', 'created_at']),
+            # Unread counts compare ids, which only grow, per community
+            models.Index(fields=['community', 'id'], name='community_message_seq_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sender', 'client_id'],
+                condition=models.Q(client_id__isnull=False),
+                name='community_message_client_id_uniq',
+            ),
         ]
 
 class UserReadStatus(models.Model):
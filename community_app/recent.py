@@ -0,0 +1,125 @@
+"""
+Per-community buffer of the newest serialized messages.
+
+Most history requests are for the newest page, so each community keeps its
+last RECENT_MESSAGES_SIZE messages, already serialized, in the shared cache.
+Writers append to it after their insert commits and the newest page is read
+from it without touching Postgres; older pages still go to the database.
+
+Appends are a read-modify-write under a short cache lock. A writer that
+cannot get the lock marks the buffer stale instead, and the next reader
+rebuilds it from the database, so a busy lock never loses a message.
+"""
+from bisect import insort
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .history import MAX_PAGE_SIZE
+from .models import CommunityMessage
+from .serializer import CommunityMessageSerializer
+
+logger = logging.getLogger(__name__)
+
+RECENT_MESSAGES_KEY = 'community:recent:{}'
+RECENT_STALE_KEY = 'community:recent_stale:{}'
+RECENT_LOCK_KEY = 'community:recent_lock:{}'
+RECENT_MESSAGES_SIZE = MAX_PAGE_SIZE
+RECENT_MESSAGES_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 5
+LOCK_ATTEMPTS = 10
+LOCK_WAIT_SECONDS = 0.005
+
+
+def _acquire(community_id):
+    for attempt in range(LOCK_ATTEMPTS):
+        if cache.add(RECENT_LOCK_KEY.format(community_id), 1, timeout=LOCK_TIMEOUT):
+            return True
+        time.sleep(LOCK_WAIT_SECONDS)
+    return False
+
+
+def _release(community_id):
+    cache.delete(RECENT_LOCK_KEY.format(community_id))
+
+
+def serialize_message(message):
+    return dict(CommunityMessageSerializer(message).data)
+
+
+def _append(community_id, data):
+    if not _acquire(community_id):
+        cache.set(RECENT_STALE_KEY.format(community_id), 1, timeout=RECENT_MESSAGES_TIMEOUT)
+        logger.debug("Recent message buffer of community %s busy, marked stale", community_id)
+        return
+    try:
+        buffer = cache.get(RECENT_MESSAGES_KEY.format(community_id))
+        if buffer is None:
+            # Nothing cached, the next reader builds the buffer from the database
+            return
+        messages = buffer['messages']
+        if all(message['id'] != data['id'] for message in messages):
+            # Concurrent inserts can commit out of id order
+            insort(messages, data, key=lambda message: message['id'])
+        if len(messages) > RECENT_MESSAGES_SIZE:
+            del messages[:len(messages) - RECENT_MESSAGES_SIZE]
+            buffer['has_older'] = True
+        cache.set(RECENT_MESSAGES_KEY.format(community_id), buffer, timeout=RECENT_MESSAGES_TIMEOUT)
+    finally:
+        _release(community_id)
+
+
+def append_recent_message(message):
+    """Add a newly created message to its community's buffer once it commits"""
+    data = serialize_message(message)
+    transaction.on_commit(lambda: _append(message.community_id, data))
+
+
+def _load(community_id):
+    rows = list(
+        CommunityMessage.objects.filter(community_id=community_id).select_related('sender').order_by('-id')[
+            :RECENT_MESSAGES_SIZE + 1
+        ]
+    )
+    return {
+        'messages': [serialize_message(message) for message in reversed(rows[:RECENT_MESSAGES_SIZE])],
+        'has_older': len(rows) > RECENT_MESSAGES_SIZE,
+    }
+
+
+def _get_buffer(community_id):
+    keys = [RECENT_MESSAGES_KEY.format(community_id), RECENT_STALE_KEY.format(community_id)]
+    cached = cache.get_many(keys)
+    if keys[0] in cached and keys[1] not in cached:
+        return cached[keys[0]]
+
+    if not _acquire(community_id):
+        return _load(community_id)
+    try:
+        # Clear the mark first so an append that fails to lock meanwhile marks it again
+        cache.delete(keys[1])
+        buffer = _load(community_id)
+        cache.set(keys[0], buffer, timeout=RECENT_MESSAGES_TIMEOUT)
+        return buffer
+    finally:
+        _release(community_id)
+
+
+def get_newest_page(community_id, limit):
+    """
+    Newest page of a community's history, serialized and shaped like
+    history.get_message_page; reads only the cache when the buffer is warm.
+    """
+    buffer = _get_buffer(community_id)
+    messages = buffer['messages']
+    return {
+        'messages': messages[-limit:],
+        'has_older': len(messages) > limit or buffer['has_older'],
+        'has_newer': False,
+    }
+
+
+def invalidate_recent_messages(community_id):
+    cache.delete(RECENT_MESSAGES_KEY.format(community_id))
@@ -28,7 +28,7 @@ class CommunityMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = CommunityMessage
         fields = ['id', 'community', 'sender', 'sender_id', 'content', 'attachment', 'created_at']
-        read_only_fields = ['sender']
+        read_only_fields = ['sender', 'created_at']
     
     def create(self, validated_data):
         # Remove sender_id if present since it's only for validation
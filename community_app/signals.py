@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import CommunityMember, CommunityMessage
+from .membership import membership_changed
+from .recent import invalidate_recent_messages
+
+
+@receiver(post_save, sender=CommunityMessage)
+@receiver(post_delete, sender=CommunityMessage)
+def refresh_recent_messages(sender, instance, created=False, raw=False, **kwargs):
+    """New messages are appended by their writers; edits and deletes drop the buffer"""
+    if raw or created:
+        return
+    invalidate_recent_messages(instance.community_id)
+
+
+@receiver(post_save, sender=CommunityMember)
+def remember_join(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    membership_changed(instance.community_id, instance.user_id, True)
+
+
+@receiver(post_delete, sender=CommunityMember)
+def remember_leave(sender, instance, **kwargs):
+    """Covers leaving, admin removals and deleted communities"""
+    membership_changed(instance.community_id, instance.user_id, False)
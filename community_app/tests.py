@@ -1,3 +1,173 @@
-from django.test import TestCase
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from auth_app.models import User
+from .models import Community, CommunityMember, CommunityMessage, UserReadStatus
+from .unread import get_unread_counts, read_position, with_unread_counts
+from .writer import MessageWriter, persist_messages
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+IN_MEMORY_CHANNELS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def create_user(name, user_type='job_seeker'):
+    return User.objects.create_user(username=name, email=f'{name}@example.com', password='x', user_type=user_type)
+
+
+@override_settings(CACHES=LOCAL_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS)
+class UnreadCountTests(TestCase):
+
+    def setUp(self):
+        self.member = create_user('member')
+        self.outsider = create_user('outsider')
+        self.admin = create_user('admin', user_type='admin')
+        self.community = Community.objects.create(name='Python')
+        CommunityMember.objects.create(community=self.community, user=self.member)
+        self.messages = [
+            CommunityMessage.objects.create(community=self.community, sender=self.admin, content=f'message {index}')
+            for index in range(3)
+        ]
+
+    def unread(self, user):
+        return with_unread_counts(Community.objects.all(), user).get(pk=self.community.pk).unread_count
+
+    def test_members_and_admins_see_counts_and_outsiders_see_zero(self):
+        self.assertEqual(self.unread(self.member), 3)
+        self.assertEqual(self.unread(self.outsider), 0)
+        # The admin sent every message, and a user's own messages are never unread
+        CommunityMessage.objects.create(community=self.community, sender=self.member, content='hello')
+        self.assertEqual(self.unread(self.admin), 1)
+
+    def test_own_messages_do_not_count(self):
+        CommunityMessage.objects.create(community=self.community, sender=self.member, content='hello')
+        self.assertEqual(self.unread(self.member), 3)
+
+    def test_count_starts_after_the_last_read_message(self):
+        UserReadStatus.objects.create(user=self.member, community=self.community, last_read_message=self.messages[1])
+        self.assertEqual(self.unread(self.member), 1)
+        self.assertEqual(get_unread_counts(self.member), {self.community.id: ('Python', 1)})
+        self.assertEqual(get_unread_counts(self.outsider), {})
+
+    def test_community_list_reports_membership_and_counts(self):
+        client = APIClient()
+        for user, expected in ((self.member, (True, 3)), (self.outsider, (False, 0))):
+            client.force_authenticate(user)
+            response = client.get(reverse('community-list'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data[0]['is_member'], response.data[0]['unread_count']), expected)
+
+
+@override_settings(CACHES=LOCAL_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS)
+class MessageHistoryTests(TestCase):
+
+    def setUp(self):
+        self.member = create_user('member')
+        self.community = Community.objects.create(name='Python')
+        CommunityMember.objects.create(community=self.community, user=self.member)
+        self.ids = [
+            CommunityMessage.objects.create(community=self.community, sender=self.member, content=str(index)).id
+            for index in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def get(self, **params):
+        response = self.client.get(reverse('message-list'), {'community': self.community.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_request_without_paging_params_gets_the_full_list(self):
+        self.assertEqual([message['id'] for message in self.get()], self.ids)
+
+    def test_pages_walk_back_through_the_history(self):
+        newest = self.get(limit=2)
+        self.assertEqual([message['id'] for message in newest['messages']], self.ids[3:])
+        self.assertTrue(newest['has_older'])
+
+        older = self.get(before=self.ids[3], limit=2)
+        self.assertEqual([message['id'] for message in older['messages']], self.ids[1:3])
+        self.assertEqual((older['has_older'], older['has_newer']), (True, True))
+
+        around = self.get(around=self.ids[2], limit=2)
+        self.assertEqual([message['id'] for message in around['messages']], self.ids[1:3])
+
+    def test_conflicting_modes_are_rejected(self):
+        response = self.client.get(
+            reverse('message-list'), {'community': self.community.id, 'before': self.ids[1], 'after': self.ids[0]}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCAL_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS)
+class ReadPositionTests(TestCase):
+
+    def setUp(self):
+        self.member = create_user('member')
+        self.community = Community.objects.create(name='Python')
+        CommunityMember.objects.create(community=self.community, user=self.member)
+        self.messages = [
+            CommunityMessage.objects.create(community=self.community, sender=self.member, content=str(index))
+            for index in range(3)
+        ]
+
+    def test_missing_id_resolves_to_the_newest_message_below_it(self):
+        deleted_id = self.messages[1].id
+        self.messages[1].delete()
+        self.assertEqual(read_position(self.community.id, deleted_id), self.messages[0])
+        self.assertEqual(read_position(self.community.id, self.messages[2].id + 100), self.messages[2])
+        self.assertEqual(read_position(self.community.id, 'latest'), self.messages[2])
+        self.assertIsNone(read_position(self.community.id, self.messages[0].id - 1))
+
+    def test_mark_read_with_a_missing_id_moves_the_read_position(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        response = client.post(
+            reverse('read-status'), {'community': self.community.id, 'message_id': self.messages[2].id + 100}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            UserReadStatus.objects.get(user=self.member, community=self.community).last_read_message,
+            self.messages[2]
+        )
+
+
+@override_settings(CACHES=LOCAL_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS)
+class MessageWriterTests(TransactionTestCase):
+
+    def setUp(self):
+        self.member = create_user('member')
+        self.community = Community.objects.create(name='Python')
+        CommunityMember.objects.create(community=self.community, user=self.member)
+
+    def message(self, content, client_id=None):
+        return CommunityMessage(community=self.community, sender=self.member, content=content, client_id=client_id)
+
+    def test_resend_returns_the_stored_message(self):
+        first, = persist_messages([self.message('hello', client_id='a')])
+        again, duplicate = persist_messages([self.message('hello', client_id='a'), self.message('hello', client_id='a')])
+        self.assertEqual((again.id, duplicate.id), (first.id, first.id))
+        self.assertEqual(CommunityMessage.objects.count(), 1)
+
+    def test_messages_are_broadcast_and_acknowledged_after_they_are_stored(self):
+        async def run():
+            channel_layer = get_channel_layer()
+            reply_channel = await channel_layer.new_channel()
+            await channel_layer.group_add(f'community_{self.community.id}', 'listener')
+            writer = MessageWriter()
+            writer.submit(self.message('first', client_id='a'), reply_channel)
+            writer.submit(self.message('second', client_id='b'), reply_channel)
+            broadcasts = [await channel_layer.receive('listener') for _ in range(2)]
+            acks = [await channel_layer.receive(reply_channel) for _ in range(2)]
+            writer._task.cancel()
+            return broadcasts, acks
+
+        broadcasts, acks = async_to_sync(run)()
+        stored = list(CommunityMessage.objects.order_by('id').values_list('id', 'content', 'client_id'))
+        self.assertEqual([(event['id'], event['message']) for event in broadcasts], [row[:2] for row in stored])
+        self.assertEqual(
+            [(event['type'], event['id'], event['client_id']) for event in acks],
+            [('message_persisted', row[0], row[2]) for row in stored]
+        )
@@ -0,0 +1,83 @@
+"""
+Unread message counts for community chat.
+
+Message ids only grow, so they double as a per-community sequence: a user's
+unread messages in a community are the messages from others with an id
+above their last read message. A user's own messages never count as unread,
+in the community list as well as over the chat socket. Every count is a
+correlated subquery on the (community, id) index, which lets one query
+return the counts for all of a user's communities.
+"""
+from django.db.models import Case, Count, Exists, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Community, CommunityMember, CommunityMessage, UserReadStatus
+
+
+def unread_count_subquery(user, community_ref='pk', last_read_ref='last_read_message_id'):
+    """
+    Number of messages from others after the last read one, for use in
+    ``annotate``; ``community_ref`` and ``last_read_ref`` name the outer
+    query's community id and last read message id.
+    """
+    unread = CommunityMessage.objects.filter(
+        community_id=OuterRef(community_ref),
+        id__gt=Coalesce(OuterRef(last_read_ref), Value(0)),
+    ).exclude(sender=user).order_by().values('community_id').annotate(
+        count=Count('id')
+    ).values('count')
+    return Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+
+
+def with_unread_counts(communities, user):
+    """
+    Annotate a Community queryset with ``is_member``, ``last_read_message_id``
+    and ``unread_count`` for one user. Communities the user cannot read (not a
+    member and not an admin) get an unread count of 0 without counting.
+    """
+    communities = communities.annotate(
+        is_member=Exists(CommunityMember.objects.filter(community=OuterRef('pk'), user=user)),
+        last_read_message_id=Subquery(
+            UserReadStatus.objects.filter(community=OuterRef('pk'), user=user).values('last_read_message_id')[:1]
+        ),
+    )
+    if user.user_type == 'admin':
+        return communities.annotate(unread_count=unread_count_subquery(user))
+    return communities.annotate(unread_count=Case(
+        When(is_member=True, then=unread_count_subquery(user)),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+
+def user_communities(user):
+    """Communities whose chat the user can read: all of them for admins"""
+    if user.user_type == 'admin':
+        return Community.objects.all()
+    return Community.objects.filter(members__user=user)
+
+
+def get_unread_counts(user):
+    """Return {community_id: (community_name, unread_count)} in one query"""
+    return {
+        community_id: (name, unread_count)
+        for community_id, name, unread_count in with_unread_counts(user_communities(user), user).values_list(
+            'id', 'name', 'unread_count'
+        )
+    }
+
+
+def read_position(community_id, message_id=None):
+    """
+    The message a "read up to ``message_id``" request resolves to: the newest
+    stored message of the community at or below that id, or the newest one
+    when no usable id is given. Ids of messages that are gone (or not stored
+    yet) therefore still move the read position instead of failing.
+    """
+    messages = CommunityMessage.objects.filter(community_id=community_id)
+    if message_id not in (None, ''):
+        try:
+            messages = messages.filter(id__lte=int(message_id))
+        except (TypeError, ValueError):
+            pass
+    return messages.order_by('-id').first()
@@ -7,7 +7,11 @@ from django.db.models import Q
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 import logging
-from .utils import get_attachment_type
+from .membership import can_access
+from .history import get_message_page, is_page_request, parse_page_params
+from .recent import append_recent_message, get_newest_page
+from .unread import get_unread_counts, read_position, unread_count_subquery, with_unread_counts
+from .writer import chat_message_event, lock_message_order
 from django.db import transaction
 
 
@@ -23,36 +27,14 @@ class CommunityListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        communities = Community.objects.all()
+        # Membership and unread counts come back in the same query
+        communities = with_unread_counts(Community.objects.all(), request.user)
         result = []
         
         for community in communities:
             data = CommunitySerializer(community).data
-            
-            # Check if user is a member
-            is_member = False
-            unread_count = 0
-            
-            if request.user.is_authenticated:
-                is_member = CommunityMember.objects.filter(
-                    community=community, 
-                    user=request.user
-                ).exists()
-                
-                # Get unread count
-                if is_member or request.user.user_type == 'admin':
-                    read_status, created = UserReadStatus.objects.get_or_create(
-                        user=request.user,
-                        community=community
-                    )
-                    
-                    unread_query = CommunityMessage.objects.filter(community=community)
-                    if read_status.last_read_message:
-                        unread_query = unread_query.filter(created_at__gt=read_status.last_read_message.created_at)
-                    unread_count = unread_query.count()
-                    
-            data['is_member'] = is_member
-            data['unread_count'] = unread_count
+            data['is_member'] = community.is_member
+            data['unread_count'] = community.unread_count
             result.append(data)
         
         return Response(result)
@@ -74,34 +56,12 @@ class CommunityDetailView(APIView):
 
     def get(self, request, pk):
         try:
-            community = Community.objects.get(pk=pk)
+            community = with_unread_counts(Community.objects.all(), request.user).get(pk=pk)
             serializer = CommunitySerializer(community)
             
-            # Check if user is a member
-            is_member = False
-            unread_count = 0
-            
-            if request.user.is_authenticated:
-                is_member = CommunityMember.objects.filter(
-                    community=community, 
-                    user=request.user
-                ).exists()
-                
-                # Get unread count
-                if is_member or request.user.user_type == 'admin':
-                    read_status, created = UserReadStatus.objects.get_or_create(
-                        user=request.user,
-                        community=community
-                    )
-                    
-                    unread_query = CommunityMessage.objects.filter(community=community)
-                    if read_status.last_read_message:
-                        unread_query = unread_query.filter(created_at__gt=read_status.last_read_message.created_at)
-                    unread_count = unread_query.count()
-            
             data = serializer.data
-            data['is_member'] = is_member
-            data['unread_count'] = unread_count
+            data['is_member'] = community.is_member
+            data['unread_count'] = community.unread_count
             logger.info("Successfully retrieved community details for ID %s", pk)
             return Response(data)
         except Community.DoesNotExist:
@@ -197,28 +157,43 @@ class CommunityMessageListView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
                 
+            paged = is_page_request(request.query_params)
+            if paged:
+                try:
+                    mode, message_id, limit = parse_page_params(request.query_params)
+                except ValueError as e:
+                    return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
             logger.debug("Fetching messages for community %s, user %s", community_id, user.username)
-            queryset = CommunityMessage.objects.filter(community_id=community_id)
             
             # If not admin, verify membership
-            if user.user_type != 'admin':
-                is_member = CommunityMember.objects.filter(
-                    community_id=community_id, 
-                    user=user
-                ).exists()
-                
-                if not is_member:
-                    logger.warning("User %s attempted to access messages for community %s without membership",
-                                  user.username, community_id)
-                    return Response(
-                        {'error': 'You are not a member of this community'}, 
-                        status=status.HTTP_403_FORBIDDEN
-                    )
+            if not can_access(user, community_id):
+                logger.warning("User %s attempted to access messages for community %s without membership",
+                              user.username, community_id)
+                return Response(
+                    {'error': 'You are not a member of this community'}, 
+                    status=status.HTTP_403_FORBIDDEN
+                )
                 
-            serializer = CommunityMessageSerializer(queryset, many=True)
+            if not paged:
+                # Clients that predate paging get the whole history as a bare list
+                messages = CommunityMessage.objects.filter(community_id=community_id).select_related(
+                    'sender'
+                ).order_by('id')
+                serializer = CommunityMessageSerializer(messages, many=True)
+                logger.info("Successfully returned %d messages for community %s",
+                           len(serializer.data), community_id)
+                return Response(serializer.data)
+            
+            if mode is None:
+                # The newest page is served from the community's recent message buffer
+                page = get_newest_page(community_id, limit)
+            else:
+                page = get_message_page(community_id, mode, message_id, limit)
+                page['messages'] = CommunityMessageSerializer(page['messages'], many=True).data
             logger.info("Successfully returned %d messages for community %s", 
-                       len(serializer.data), community_id)
-            return Response(serializer.data)
+                       len(page['messages']), community_id)
+            return Response(page)
         except Exception as e:
             logger.error("Error fetching community messages: %s", str(e), exc_info=True)
             return Response({'error': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -239,12 +214,7 @@ class CommunityMessageListView(APIView):
             logger.debug("User %s attempting to post message to community %s", 
                         request.user.username, community_id)
                 
-            is_member = CommunityMember.objects.filter(
-                community_id=community_id, 
-                user=request.user
-            ).exists()
-            
-            if not is_member and request.user.user_type != 'admin':
+            if not can_access(request.user, community_id):
                 logger.warning("User %s not authorized to post in community %s", 
                               request.user.username, community_id)
                 return Response(
@@ -254,7 +224,10 @@ class CommunityMessageListView(APIView):
                 
             serializer = CommunityMessageSerializer(data=data)
             if serializer.is_valid():
-                message = serializer.save(sender=request.user)
+                with transaction.atomic():
+                    lock_message_order([serializer.validated_data['community'].id])
+                    message = serializer.save(sender=request.user)
+                    append_recent_message(message)
                 logger.info("Message saved successfully: id=%s, community=%s, sender=%s", 
                            message.id, community_id, request.user.username)
                 
@@ -263,22 +236,7 @@ class CommunityMessageListView(APIView):
                     logger.debug("Attempting to broadcast message via WebSocket")
                     channel_layer = get_channel_layer()
                     group_name = f'community_{message.community.id}'
-                    attachment_url = message.attachment.url if message.attachment else None
-                    attachment_type = get_attachment_type(message.attachment) if message.attachment else None
-                    async_to_sync(channel_layer.group_send)(
-                        group_name,
-                        {
-                            'type': 'chat_message',
-                            'community_id': message.community.id,
-                            'message': message.content,
-                            'attachment': attachment_url,
-                            'attachment_type': attachment_type,
-                            'sender': message.sender.username,
-                            'sender_id': message.sender.id,
-                            'timestamp': message.created_at.isoformat(),
-                            'id': message.id
-                        }
-                    )
+                    async_to_sync(channel_layer.group_send)(group_name, chat_message_event(message))
                     logger.debug("Broadcasted message to group: %s", group_name)
                 except Exception as e:
                     logger.error("Failed to broadcast message to WebSocket: %s", str(e), exc_info=True)
@@ -313,28 +271,19 @@ class MarkMessagesReadView(APIView):
         try:
             community = Community.objects.get(id=community_id)
             
-            is_member = CommunityMember.objects.filter(
-                community=community, 
-                user=request.user
-            ).exists()
-            
-            if not is_member and request.user.user_type != 'admin':
+            if not can_access(request.user, community.id):
                 return Response(
                     {'error': 'You are not a member of this community'}, 
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            if message_id:
-                try:
-                    message = CommunityMessage.objects.get(id=message_id, community=community)
-                except CommunityMessage.DoesNotExist:
-                    return Response(
-                        {'error': 'Message not found'}, 
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-            else:
-                # Otherwise, get the latest message
-                message = CommunityMessage.objects.filter(community=community).order_by('-created_at').first()
+            # The newest message at or below message_id, or the latest one
+            message = read_position(community.id, message_id)
+            if message_id and message is None:
+                return Response(
+                    {'error': 'Message not found'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
             
             # Update or create read status
             if message:
@@ -354,35 +303,13 @@ class UnreadCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        result = {}
-        
-        if user.user_type == 'admin':
-            communities = Community.objects.all()
-        else:
-            communities = Community.objects.filter(members__user=user)
-        
-        for community in communities:
-            read_status = UserReadStatus.objects.filter(
-                user=user,
-                community=community
-            ).first()
-            
-            if read_status and read_status.last_read_message:
-                unread_count = CommunityMessage.objects.filter(
-                    community=community,
-                    created_at__gt=read_status.last_read_message.created_at
-                ).exclude(sender=user).count() 
-            else:
-                unread_count = CommunityMessage.objects.filter(
-                    community=community
-                ).exclude(sender=user).count()
-            
-            result[community.id] = {
-                'community_name': community.name,
+        result = {
+            community_id: {
+                'community_name': community_name,
                 'unread_count': unread_count
             }
-            
+            for community_id, (community_name, unread_count) in get_unread_counts(request.user).items()
+        }
         return Response(result)
 
 class FirstUnreadMessageView(APIView):
@@ -400,51 +327,39 @@ class FirstUnreadMessageView(APIView):
         try:
             community = Community.objects.get(id=community_id)
             
-            is_member = CommunityMember.objects.filter(
-                community=community, 
-                user=request.user
-            ).exists()
-            
-            if not is_member and request.user.user_type != 'admin':
+            if not can_access(request.user, community.id):
                 return Response(
                     {'error': 'You are not a member of this community'}, 
                     status=status.HTTP_403_FORBIDDEN
                 )
                 
-            read_status = UserReadStatus.objects.filter(
+            try:
+                _, _, limit = parse_page_params(request.query_params)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            last_read_message_id = UserReadStatus.objects.filter(
                 user=request.user,
                 community=community
-            ).first()
-            
-            if read_status and read_status.last_read_message:
-                # Find first message after the last read
-                first_unread = CommunityMessage.objects.filter(
-                    community=community,
-                    created_at__gt=read_status.last_read_message.created_at
-                ).order_by('created_at').first()
-                
-                if first_unread:
-                    serializer = CommunityMessageSerializer(first_unread)
-                    return Response({
-                        'first_unread_message': serializer.data,
-                        'has_unread': True
-                    })
-                else:
-                    return Response({'has_unread': False})
-            else:
-                # If no read status, the first message is the first unread
-                first_message = CommunityMessage.objects.filter(
-                    community=community
-                ).order_by('created_at').first()
-                
-                if first_message:
-                    serializer = CommunityMessageSerializer(first_message)
-                    return Response({
-                        'first_unread_message': serializer.data,
-                        'has_unread': True
-                    })
-                else:
-                    return Response({'has_unread': False})
+            ).values_list('last_read_message_id', flat=True).first()
+            
+            # Own messages never count as unread
+            first_unread = CommunityMessage.objects.filter(
+                community=community,
+                id__gt=last_read_message_id or 0
+            ).exclude(sender=request.user).select_related('sender').order_by('id').first()
+            
+            if first_unread is None:
+                return Response({'has_unread': False})
+            
+            # A ready to render window with the first unread message in the middle
+            page = get_message_page(community.id, 'around', first_unread.id, limit)
+            page['messages'] = CommunityMessageSerializer(page['messages'], many=True).data
+            return Response({
+                'first_unread_message': CommunityMessageSerializer(first_unread).data,
+                'has_unread': True,
+                'page': page
+            })
                 
         except Community.DoesNotExist:
             logger.warning("Community not found: %s", community_id)
@@ -457,38 +372,37 @@ class UserReadStatusView(APIView):
         """Get read status for all communities the user is a member of"""
         user = request.user
         
-        # Get all communities the user is a member of
-        user_communities = Community.objects.filter(members__user=user)
-        
-        # Initialize result list
-        result = []
+        read_statuses = UserReadStatus.objects.filter(
+            user=user,
+            community__members__user=user
+        ).select_related('community').annotate(
+            unread_count=unread_count_subquery(user, community_ref='community_id')
+        ).order_by('community_id')
+        statuses = list(read_statuses)
         
-        for community in user_communities:
-            # Get or create read status
-            read_status, created = UserReadStatus.objects.get_or_create(
-                user=user,
-                community=community
+        # Communities joined without ever opening the chat get their read status now
+        member_community_ids = set(
+            CommunityMember.objects.filter(user=user).values_list('community_id', flat=True)
+        )
+        missing = member_community_ids - {read_status.community_id for read_status in statuses}
+        if missing:
+            UserReadStatus.objects.bulk_create(
+                [UserReadStatus(user=user, community_id=community_id) for community_id in missing],
+                ignore_conflicts=True
             )
-            
-            # Count unread messages
-            last_read_msg = read_status.last_read_message
-            unread_query = CommunityMessage.objects.filter(community=community)
-            
-            if last_read_msg:
-                unread_query = unread_query.filter(created_at__gt=last_read_msg.created_at)
-            
-            unread_count = unread_query.count()
-            
-            # Add to result
-            result.append({
+            statuses = list(read_statuses.all())
+        
+        result = [
+            {
                 'id': read_status.id,
-                'community': community.id,
-                'community_name': community.name,
-                'last_read_message': read_status.last_read_message.id if read_status.last_read_message else None,
+                'community': read_status.community_id,
+                'community_name': read_status.community.name,
+                'last_read_message': read_status.last_read_message_id,
                 'last_read_time': read_status.last_read_time,
-                'unread_count': unread_count
-            })
-        
+                'unread_count': read_status.unread_count
+            }
+            for read_status in statuses
+        ]
         return Response(result)
     
     def post(self, request):
@@ -504,32 +418,19 @@ class UserReadStatusView(APIView):
             community = Community.objects.get(id=community_id)
             
             # Verify user is a member of the community
-            is_member = CommunityMember.objects.filter(community=community, user=user).exists()
-            if not is_member and user.user_type != 'admin':
+            if not can_access(user, community.id):
                 return Response(
                     {'error': 'You are not a member of this community'}, 
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            # If message_id is provided, use that message
-            if message_id:
-                try:
-                    # Validate message_id is an integer
-                    try:
-                        message_id = int(message_id)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid message_id format: {message_id}, using latest message instead")
-                        message = CommunityMessage.objects.filter(community=community).order_by('-created_at').first()
-                    else:
-                        message = CommunityMessage.objects.get(id=message_id, community=community)
-                except CommunityMessage.DoesNotExist:
-                    return Response(
-                        {'error': 'Message not found'}, 
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-            else:
-                # Otherwise, use the latest message
-                message = CommunityMessage.objects.filter(community=community).order_by('-created_at').first()
+            # The newest message at or below message_id; invalid or missing ids use the latest message
+            message = read_position(community.id, message_id)
+            if message_id and message is None:
+                return Response(
+                    {'error': 'Message not found'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
                     
             if message:
                 with transaction.atomic():
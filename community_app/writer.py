@@ -0,0 +1,210 @@
+"""
+Batched persistence for community chat messages.
+
+With COMMUNITY_CHAT_BATCH_WRITES enabled the chat consumer stamps a text
+message with its receive time and hands it to the process wide
+MessageWriter. The writer collects messages for FLUSH_INTERVAL seconds or
+FLUSH_BATCH_SIZE messages, inserts them with one bulk_create and only then
+broadcasts them to their communities and acknowledges them to their senders.
+Only the INSERT and the fan-out are batched; nothing is shown to anyone
+before it is committed.
+
+Guarantees:
+- A broadcast message is always in the history, and its id is the one the
+  database assigned, so read positions and ``after`` pages can use it.
+- Every insert of a message takes a per-community transaction lock first
+  (see ``lock_message_order``), so within a community ids are committed in
+  increasing order across workers and a client that has seen id N never
+  misses a message below N committed later.
+- The sender gets a 'message_ack' once its message is committed and a
+  'message_failed' if it could not be stored. A message lost with a dying
+  worker is never acknowledged; the client resends it with the same
+  client_id, and a resend of a message that did commit is answered with
+  the stored row instead of a duplicate.
+"""
+import asyncio
+import logging
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.db import IntegrityError, connection, transaction
+
+from .models import CommunityMessage
+from .recent import append_recent_message
+from .utils import get_attachment_type
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.005
+FLUSH_BATCH_SIZE = 100
+FLUSH_ATTEMPTS = 3
+RETRY_DELAY = 0.05
+# First key of the two-key advisory locks, keeps them apart from other lock users
+MESSAGE_ORDER_LOCK_NAMESPACE = 0x636f6d6d  # "comm"
+
+
+def lock_message_order(community_ids):
+    """
+    Serialize message inserts per community until the transaction ends.
+
+    Must be called inside ``transaction.atomic`` before inserting. Locks are
+    taken in id order so two batches can never deadlock. Only Postgres has
+    advisory locks; elsewhere this is a no-op.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for community_id in sorted(set(community_ids)):
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)", [MESSAGE_ORDER_LOCK_NAMESPACE, int(community_id)]
+            )
+
+
+def chat_message_event(message):
+    """Channel layer event that shows a stored message in its community's chat"""
+    return {
+        'type': 'chat_message',
+        'community_id': message.community_id,
+        'message': message.content,
+        'attachment': message.attachment.url if message.attachment else None,
+        'attachment_type': get_attachment_type(message.attachment) if message.attachment else None,
+        'sender': message.sender.username,
+        'sender_id': message.sender_id,
+        'timestamp': message.created_at.isoformat(),
+        'id': message.id
+    }
+
+
+def find_resent_messages(messages):
+    """Already stored messages matching the (sender, client_id) of new ones, keyed by that pair"""
+    client_ids = {message.client_id for message in messages if message.client_id}
+    if not client_ids:
+        return {}
+    stored = CommunityMessage.objects.filter(
+        sender_id__in={message.sender_id for message in messages},
+        client_id__in=client_ids,
+    ).select_related('sender')
+    return {(message.sender_id, message.client_id): message for message in stored}
+
+
+def persist_messages(messages):
+    """
+    Insert messages in one transaction, in order.
+
+    Returns the stored row for each message: the new one, or the existing
+    one when the message is a resend.
+    """
+    with transaction.atomic():
+        lock_message_order(message.community_id for message in messages)
+        stored = find_resent_messages(messages)
+        new = []
+        for message in messages:
+            key = (message.sender_id, message.client_id)
+            if message.client_id and key in stored:
+                continue
+            new.append(message)
+            if message.client_id:
+                # A frame sent twice within one batch is stored once
+                stored[key] = message
+        CommunityMessage.objects.bulk_create(new)
+        for message in new:
+            append_recent_message(message)
+    return [
+        stored[(message.sender_id, message.client_id)] if message.client_id else message
+        for message in messages
+    ]
+
+
+def persist_messages_individually(messages):
+    """Fallback after a failed batch: store what can be stored, None for the ones that failed"""
+    stored = []
+    for message in messages:
+        try:
+            stored.extend(persist_messages([message]))
+        except IntegrityError as e:
+            # A concurrent resend with the same client_id won the race
+            resent = find_resent_messages([message]).get((message.sender_id, message.client_id))
+            if resent is None:
+                logger.error("Could not persist community message from %s: %s", message.sender_id, str(e))
+            stored.append(resent)
+        except Exception as e:
+            logger.error("Could not persist community message from %s: %s", message.sender_id, str(e))
+            stored.append(None)
+    return stored
+
+
+class MessageWriter:
+    """Per-process batching writer, started on first use in the running event loop"""
+
+    def __init__(self):
+        self._queue = None
+        self._task = None
+        self._loop = None
+
+    def submit(self, message, reply_channel):
+        """Queue an unsaved message; it is broadcast and acknowledged once stored"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        self._queue.put_nowait((message, reply_channel))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + FLUSH_INTERVAL
+            while len(batch) < FLUSH_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.exception("Community message writer failed on a batch of %d: %s", len(batch), str(e))
+
+    async def _flush(self, batch):
+        messages = [message for message, _ in batch]
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                stored = await database_sync_to_async(persist_messages)(messages)
+                break
+            except Exception as e:
+                logger.warning("Persisting %d community messages failed (attempt %d): %s", len(messages), attempt, str(e))
+                if attempt < FLUSH_ATTEMPTS:
+                    await asyncio.sleep(RETRY_DELAY * attempt)
+        else:
+            # One bad row (e.g. its community was just deleted) must not sink the batch
+            stored = await database_sync_to_async(persist_messages_individually)(messages)
+
+        channel_layer = get_channel_layer()
+        for (message, reply_channel), saved in zip(batch, stored):
+            try:
+                if saved is None:
+                    await channel_layer.send(reply_channel, {
+                        'type': 'message_failed',
+                        'community_id': message.community_id,
+                        'id': None,
+                        'client_id': message.client_id,
+                    })
+                    continue
+                # Resends are broadcast again too, clients drop ids they already show
+                await channel_layer.group_send(f'community_{saved.community_id}', chat_message_event(saved))
+                await channel_layer.send(reply_channel, {
+                    'type': 'message_persisted',
+                    'community_id': saved.community_id,
+                    'id': saved.id,
+                    'client_id': message.client_id,
+                })
+            except Exception as e:
+                logger.error("Could not deliver community message from %s: %s", message.sender_id, str(e))
+        failed = sum(saved is None for saved in stored)
+        logger.debug("Persisted %d community messages, %d failed", len(messages) - failed, failed)
+
+
+message_writer = MessageWriter()
@@ -361,12 +361,13 @@ class AdminApplicationAnalyticsView(APIView):
             ).order_by('-count')
             
             # Get applications per job post (top 10 most applied to)
-            top_job_posts = JobApplication.objects.values(
-                'jobpost'
-            ).annotate(
-                count=Count('id'),
-                job_title=F('jobpost__title')
-            ).order_by('-count')[:10]
+            top_job_posts = JobPost.objects.filter(
+                application_count__gt=0
+            ).order_by('-application_count').values(
+                jobpost=F('id'),
+                count=F('application_count'),
+                job_title=F('title')
+            )[:10]
             
             # Get conversion rates (applied -> hired)
             total_applications = JobApplication.objects.count()
@@ -661,14 +662,14 @@ class ApplicationAnalyticsView(APIView):
             job_provider = JobProvider.objects.get(user=request.user)
             
             # Get top performing job posts (most applications)
-            top_job_posts = JobApplication.objects.filter(
-                jobpost__job_provider=job_provider
-            ).values(
-                'jobpost'
-            ).annotate(
-                count=Count('id'),
-                job_title=F('jobpost__title')
-            ).order_by('-count')[:10]
+            top_job_posts = JobPost.objects.filter(
+                job_provider=job_provider,
+                application_count__gt=0
+            ).order_by('-application_count').values(
+                jobpost=F('id'),
+                count=F('application_count'),
+                job_title=F('title')
+            )[:10]
             
             # Get conversion rates (applied -> hired)
             total_applications = JobApplication.objects.filter(
@@ -3,10 +3,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Count
 from auth_app.models import User, JobSeeker, JobProvider
 from jobpost_app.models import JobPost, JobApplication, Skills
-from profile_app.models import JobSeekerSkill
+from jobpost_app.matching import score_jobs_for_seeker
 from datetime import datetime, timedelta
 from django.utils import timezone
 
@@ -57,9 +56,7 @@ class PopularJobsView(APIView):
                 status='PUBLISHED', 
                 is_deleted=False,
                 application_deadline__gte=timezone.now()
-            ).annotate(
-                application_count=Count('applications')
-            ).order_by('-application_count')[:6]
+            ).select_related('job_provider').order_by('-application_count')[:6]
             
             # Serialize the data
             jobs_data = []
@@ -121,22 +118,24 @@ class FeaturedJobsView(APIView):
                     'error': 'JobSeeker profile not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            job_seeker_skills = JobSeekerSkill.objects.filter(job_seeker=job_seeker)
-            skill_ids = [js_skill.skill.id for js_skill in job_seeker_skills]
+            # Score the seeker against every live job in one pass and keep
+            # the best matches, newest first among equal scores
+            matches = score_jobs_for_seeker(job_seeker.id)
+            top_job_ids = sorted(
+                (job_id for job_id, match in matches.items() if match['matching_skills'] > 0),
+                key=lambda job_id: (matches[job_id]['matching_skills'], matches[job_id]['match_percentage'], job_id),
+                reverse=True
+            )[:6]
             
-            if not skill_ids:
+            if not top_job_ids:
                 featured_jobs = JobPost.objects.filter(
                     status='PUBLISHED', 
                     is_deleted=False,
                     application_deadline__gte=timezone.now()
-                ).order_by('-created_at')[:6]
+                ).select_related('job_provider').order_by('-created_at')[:6]
             else:
-                featured_jobs = JobPost.objects.filter(
-                    status='PUBLISHED', 
-                    is_deleted=False,
-                    application_deadline__gte=timezone.now(),
-                    skills__id__in=skill_ids
-                ).distinct().order_by('-created_at')[:6]
+                jobs_by_id = JobPost.objects.select_related('job_provider').in_bulk(top_job_ids)
+                featured_jobs = [jobs_by_id[job_id] for job_id in top_job_ids if job_id in jobs_by_id]
             
             jobs_data = []
             for job in featured_jobs:
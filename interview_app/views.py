@@ -7,11 +7,12 @@ from rest_framework.permissions import IsAuthenticated
 from .models import JobApplication, InterviewSchedule
 from .serializer import InterviewScheduleSerializer
 from jobpost_app.serializer import JobApplicationDetailSerializer
+from jobpost_app.matching import score_applicants_for_job
 from jobpost_app.models import JobPost
 from auth_app.models import JobProvider
 from django.utils import timezone
 import logging
-from django.core.mail import send_mail
+from notification_app.email import queue_email
 from auth_app.models import JobSeeker
 from notification_app.utils import *
 from django.db.models import Q
@@ -32,12 +33,22 @@ class ShortlistedApplicantsView(APIView):
                 is_deleted=False
             )
            
-            applications = JobApplication.objects.filter(
-                jobpost=job_post,
-                status__in=['SHORTLISTED', 'HIRED']
+            applications = list(JobApplicationDetailSerializer.setup_eager_loading(
+                JobApplication.objects.filter(
+                    jobpost=job_post,
+                    status__in=['SHORTLISTED', 'HIRED']
+                )
+            ))
+            skill_matches = score_applicants_for_job(
+                job_post.id,
+                [application.job_seeker_id for application in applications]
             )
 
-            serializer = JobApplicationDetailSerializer(applications, many=True)
+            serializer = JobApplicationDetailSerializer(
+                applications,
+                many=True,
+                context={'skill_matches': skill_matches}
+            )
             logger.info("Successfully returned %d shortlisted applications for job %s", len(serializer.data), pk)
             return Response(serializer.data)
         except JobProvider.DoesNotExist:
@@ -98,34 +109,17 @@ class InterviewScheduleCreateView(APIView):
                     # Get meeting ID
                     meeting_id = interview.meeting_id
                     
-                    # Send the email with detailed information
-                    send_mail(
-                        subject=f'Interview Scheduled: {job_title} at {company_name}',
-                        message=f'''Dear {job_seeker_name},
-
-We are pleased to inform you that your application for the position of "{job_title}" at {company_name} has moved forward, and an interview has been scheduled.
-
-Interview Details:
-- Date: {formatted_date}
-- Time: {formatted_time}
-- Type: {interview_type_display}
-- Meeting ID: {meeting_id}
-
-Additional Notes:
-{notes}
-
-
-We look forward to meeting you!
-
-Regards,
-{company_name} Hiring Team
-via Seekerspot
-                        ''',
-                        from_email=None,
-                        recipient_list=[job_seeker_email],
-                        fail_silently=True,
-                    )
-                    logger.info(f"Interview confirmation email sent to {job_seeker_email}")
+                    queue_email('interview_scheduled', job_seeker_email, {
+                        'job_seeker_name': job_seeker_name,
+                        'job_title': job_title,
+                        'company_name': company_name,
+                        'interview_date': formatted_date,
+                        'interview_time': formatted_time,
+                        'interview_type': interview_type_display,
+                        'meeting_id': str(meeting_id),
+                        'notes': notes,
+                    })
+                    logger.info(f"Interview confirmation email queued for {job_seeker_email}")
                 except Exception as e:
                     # Log the error but don't stop the process
                     logger.error(f"Failed to send interview email notification: {str(e)}")
@@ -198,34 +192,17 @@ class InterviewScheduleUpdateView(APIView):
                         # Get meeting ID
                         meeting_id = updated_interview.meeting_id
                         
-                        # Send the email with updated information
-                        send_mail(
-                            subject=f'RESCHEDULED: Interview for {job_title} at {company_name}',
-                            message=f'''Dear {job_seeker_name},
-
-Your interview for the position of "{job_title}" at {company_name} has been rescheduled. Please note the updated details below:
-
-UPDATED Interview Details:
-- Date: {formatted_date}
-- Time: {formatted_time}
-- Type: {interview_type_display}
-- Meeting ID: {meeting_id}
-
-Additional Notes:
-{notes}
-
-
-We apologize for any inconvenience and look forward to meeting you at the rescheduled time.
-
-Regards,
-{company_name} Hiring Team
-via Seekerspot
-                            ''',
-                            from_email=None,
-                            recipient_list=[job_seeker_email],
-                            fail_silently=True,
-                        )
-                        logger.info(f"Interview reschedule notification sent to {job_seeker_email}")
+                        queue_email('interview_rescheduled', job_seeker_email, {
+                            'job_seeker_name': job_seeker_name,
+                            'job_title': job_title,
+                            'company_name': company_name,
+                            'interview_date': formatted_date,
+                            'interview_time': formatted_time,
+                            'interview_type': interview_type_display,
+                            'meeting_id': str(meeting_id),
+                            'notes': notes,
+                        })
+                        logger.info(f"Interview reschedule email queued for {job_seeker_email}")
                 except Exception as e:
                     # Log the error but don't stop the process
                     logger.error(f"Failed to send interview reschedule notification: {str(e)}")
@@ -284,28 +261,14 @@ class InterviewScheduleCancelView(APIView):
                 formatted_date = interview.interview_date.strftime("%A, %B %d, %Y")
                 formatted_time = interview.interview_time.strftime("%I:%M %p")
                 
-                # Send the cancellation email
-                send_mail(
-                    subject=f'CANCELLED: Interview for {job_title} at {company_name}',
-                    message=f'''Dear {job_seeker_name},
-
-We regret to inform you that your interview for the position of "{job_title}" at {company_name} scheduled for {formatted_date} at {formatted_time} has been cancelled.
-
-
-
-Your application is still under consideration, and we will contact you if we wish to reschedule the interview. Thank you for your understanding.
-
-If you have any questions, please don't hesitate to contact us.
-
-Regards,
-{company_name} Hiring Team
-via Seekerspot
-                    ''',
-                    from_email=None,
-                    recipient_list=[job_seeker_email],
-                    fail_silently=True,
-                )
-                logger.info(f"Interview cancellation notification sent to {job_seeker_email}")
+                queue_email('interview_cancelled', job_seeker_email, {
+                    'job_seeker_name': job_seeker_name,
+                    'job_title': job_title,
+                    'company_name': company_name,
+                    'interview_date': formatted_date,
+                    'interview_time': formatted_time,
+                })
+                logger.info(f"Interview cancellation email queued for {job_seeker_email}")
             except Exception as e:
                 # Log the error but don't stop the process
                 logger.error(f"Failed to send interview cancellation notification: {str(e)}")
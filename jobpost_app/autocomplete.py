@@ -0,0 +1,199 @@
+"""
+In-memory skill autocomplete.
+
+Each worker loads the Skills table once into a sorted word-prefix index and
+a trigram index, so suggestions never run a leading-wildcard scan. Matches
+that start the skill name rank first, then matches at the start of any word
+in the name, then matches anywhere in the name; ties go to the most popular
+skill (seekers who list it plus job posts that require it).
+
+Adding, renaming or deleting a skill bumps a shared generation number and
+every worker reloads on its next lookup. Popularity is refreshed on a timer.
+"""
+from bisect import bisect_left
+import heapq
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+import logging
+import threading
+import time
+
+from profile_app.models import JobSeekerSkill
+from .models import JobPost, Skills
+
+logger = logging.getLogger(__name__)
+
+SKILLS_GENERATION_KEY = 'skill_autocomplete:generation'
+POPULARITY_REFRESH_SECONDS = 60 * 10
+DEFAULT_LIMIT = 10
+# Ranked results are memoized per query; broad prefixes like "s" are the
+# expensive ones and also the most repeated
+MEMO_SIZE = 5000
+MEMO_DEPTH = 50
+
+
+def _words(lowered):
+    return lowered.replace('-', ' ').replace('/', ' ').split()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SkillAutocompleteIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._loaded_at = 0
+        self._skills = {}
+        self._words = []
+        self._trigrams = {}
+        self._by_popularity = []
+        self._memo = {}
+
+    def _load(self):
+        popularity = {}
+        for skill_id, count in JobSeekerSkill.objects.values('skill_id').annotate(
+            count=Count('id')
+        ).values_list('skill_id', 'count'):
+            popularity[skill_id] = popularity.get(skill_id, 0) + count
+        for skill_id, count in JobPost.skills.through.objects.values('skills_id').annotate(
+            count=Count('id')
+        ).values_list('skills_id', 'count'):
+            popularity[skill_id] = popularity.get(skill_id, 0) + count
+
+        skills = {}
+        words = []
+        trigrams = {}
+        for skill_id, name, category in Skills.objects.values_list('id', 'name', 'category'):
+            lowered = name.lower()
+            skills[skill_id] = {
+                'id': skill_id,
+                'name': name,
+                'category': category,
+                'lowered': lowered,
+                'words': _words(lowered),
+                'popularity': popularity.get(skill_id, 0),
+            }
+            for word in skills[skill_id]['words']:
+                words.append((word, skill_id))
+            for trigram in _trigrams(lowered):
+                trigrams.setdefault(trigram, set()).add(skill_id)
+        words.sort()
+        by_popularity = sorted(skills, key=lambda skill_id: (-skills[skill_id]['popularity'], skills[skill_id]['lowered']))
+
+        self._skills, self._words, self._trigrams = skills, words, trigrams
+        self._by_popularity = by_popularity
+        self._memo = {}
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(skills)} skills into the autocomplete index")
+
+    def _is_current(self, generation):
+        fresh = time.monotonic() - self._loaded_at <= POPULARITY_REFRESH_SECONDS
+        return generation == self._generation and fresh
+
+    def _sync(self):
+        generation = cache.get(SKILLS_GENERATION_KEY, 0)
+        if self._is_current(generation):
+            return
+        with self._lock:
+            if not self._is_current(generation):
+                self._load()
+                self._generation = generation
+
+    def _word_prefix_matches(self, query):
+        matches = set()
+        index = bisect_left(self._words, (query,))
+        while index < len(self._words) and self._words[index][0].startswith(query):
+            matches.add(self._words[index][1])
+            index += 1
+        return matches
+
+    def _substring_matches(self, query):
+        if len(query) < 3:
+            # Too short for a trigram; "js" or "c#" still has to match inside names
+            return {skill_id for skill_id, skill in self._skills.items() if query in skill['lowered']}
+        candidates = None
+        for trigram in _trigrams(query):
+            ids = self._trigrams.get(trigram, set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return {skill_id for skill_id in candidates if query in self._skills[skill_id]['lowered']}
+
+    def search(self, query, limit=DEFAULT_LIMIT, exclude_ids=()):
+        """
+        Return up to ``limit`` skills matching ``query`` as
+        ``{'id', 'name', 'category'}`` dicts, best match first.
+        """
+        self._sync()
+        query = query.strip().lower()
+        exclude_ids = set(exclude_ids)
+
+        if not query:
+            ranked = [skill_id for skill_id in self._by_popularity if skill_id not in exclude_ids][:limit]
+            return [self._public(skill_id) for skill_id in ranked]
+
+        ranked = self._memo.get(query)
+        if ranked is None:
+            ranked = self._rank(query, MEMO_DEPTH)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo = {}
+            self._memo[query] = ranked
+
+        results = [skill_id for skill_id in ranked if skill_id not in exclude_ids][:limit]
+        if len(results) < limit and len(ranked) == MEMO_DEPTH:
+            # Exclusions ate into the memoized window, rank the full match set
+            results = self._rank(query, limit, exclude_ids)
+        return [self._public(skill_id) for skill_id in results]
+
+    def _rank(self, query, limit, exclude_ids=()):
+        skills = self._skills
+        candidates = self._word_prefix_matches(query) | self._substring_matches(query)
+        candidates -= set(exclude_ids)
+
+        def rank(skill_id):
+            skill = skills[skill_id]
+            if skill['lowered'].startswith(query):
+                tier = 0
+            elif any(word.startswith(query) for word in skill['words']):
+                tier = 1
+            else:
+                tier = 2
+            return (tier, -skill['popularity'], skill['lowered'])
+
+        return heapq.nsmallest(limit, candidates, key=rank)
+
+    def _public(self, skill_id):
+        skill = self._skills[skill_id]
+        return {'id': skill['id'], 'name': skill['name'], 'category': skill['category']}
+
+    def existing_ids(self, skill_ids):
+        """Return the subset of ``skill_ids`` that exist in the Skills table"""
+        self._sync()
+        existing = {skill_id for skill_id in skill_ids if skill_id in self._skills}
+        unknown = set(skill_ids) - existing
+        if unknown:
+            # Skills created since this worker's last reload are only in the database
+            existing |= set(Skills.objects.filter(id__in=unknown).values_list('id', flat=True))
+        return existing
+
+
+skill_index = SkillAutocompleteIndex()
+
+
+def _bump_generation():
+    try:
+        cache.incr(SKILLS_GENERATION_KEY)
+    except ValueError:
+        cache.add(SKILLS_GENERATION_KEY, 1, timeout=None)
+
+
+def invalidate_skill_index():
+    """
+    Make every worker reload the index on its next lookup. The bump waits
+    for the commit, otherwise a worker could reload the old skills first.
+    """
+    transaction.on_commit(_bump_generation)
@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.utils import timezone
+import hashlib
+import json
+import logging
+
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_JOB_DETAIL_KEY = 'public_job_detail:{}'
+PUBLIC_JOB_DETAIL_TIMEOUT = 60 * 60
+
+
+def compute_etag(data):
+    """Strong ETag over the serialized representation"""
+    payload = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()
+    return f'"{hashlib.md5(payload).hexdigest()}"'
+
+
+def get_cached_job_detail(job_id):
+    """Return the cached (data, etag) pair for a public job, or None"""
+    return cache.get(PUBLIC_JOB_DETAIL_KEY.format(job_id))
+
+
+def cache_job_detail(job, data):
+    """
+    Cache the rendered public detail of a job and return its ETag.
+
+    The entry never outlives the application deadline, after which the job
+    stops being public.
+    """
+    etag = compute_etag(data)
+    seconds_left = int((job.application_deadline - timezone.now()).total_seconds())
+    timeout = min(PUBLIC_JOB_DETAIL_TIMEOUT, seconds_left)
+    if timeout > 0:
+        cache.set(PUBLIC_JOB_DETAIL_KEY.format(job.id), (data, etag), timeout=timeout)
+    return etag
+
+
+def invalidate_job_detail(job_ids):
+    """Drop the cached public detail of the given job posts"""
+    keys = [PUBLIC_JOB_DETAIL_KEY.format(job_id) for job_id in job_ids]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends whose entries are only visible to the process that wrote them
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Facet counts, the skill match and autocomplete generations and the job
+    detail cache are invalidated through the default cache, which therefore
+    has to be shared by every worker.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            f"The default cache ({backend}) is not shared between processes.",
+            hint="Cached facets, job details and skill indexes will not be invalidated across workers; "
+                 "configure a shared backend such as RedisCache.",
+            id='jobpost_app.W001',
+        )]
+    return []
@@ -0,0 +1,128 @@
+"""
+Denormalized application counters on JobPost.
+
+Every counter is adjusted with a single ``UPDATE ... SET x = x + 1`` when an
+application is created, changes status or is deleted and when a job is saved
+or unsaved, so listings and reports read plain columns instead of grouping
+the JobApplication table. Decrements stop at zero instead of failing the
+unsigned columns. ``JobPost.save`` never writes the counters back unless
+they are named in ``update_fields``, so a stale instance cannot undo these
+updates. ``reconcile_job_counters`` recomputes the counters from scratch to
+repair any drift (bulk updates and raw SQL bypass the signals).
+"""
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+import logging
+
+from .models import JobPost
+
+logger = logging.getLogger(__name__)
+
+STATUS_COUNTER_FIELDS = {
+    'APPLIED': 'applied_count',
+    'REVIEWING': 'reviewing_count',
+    'SHORTLISTED': 'shortlisted_count',
+    'REJECTED': 'rejected_count',
+    'HIRED': 'hired_count',
+    'WITHDRAWN': 'withdrawn_count',
+}
+COUNTER_FIELDS = JobPost.COUNTER_FIELDS
+
+
+def _adjust(job_post_id, deltas):
+    changes = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items() if delta
+    }
+    if changes:
+        JobPost.objects.filter(id=job_post_id).update(**changes)
+
+
+def record_application_change(job_post_id, old_status=None, new_status=None):
+    """
+    Move one application between status counters.
+
+    ``old_status`` is None for a new application and ``new_status`` is None
+    for a deleted one.
+    """
+    if old_status == new_status:
+        return
+    deltas = {}
+    if old_status is None:
+        deltas['application_count'] = 1
+    if new_status is None:
+        deltas['application_count'] = -1
+    if old_status in STATUS_COUNTER_FIELDS:
+        deltas[STATUS_COUNTER_FIELDS[old_status]] = -1
+    if new_status in STATUS_COUNTER_FIELDS:
+        deltas[STATUS_COUNTER_FIELDS[new_status]] = 1
+    _adjust(job_post_id, deltas)
+
+
+def record_bulk_status_change(job_post_id, old_statuses, new_status):
+    """Move several applications of one job post to ``new_status`` in one UPDATE"""
+    deltas = {}
+    for old_status in old_statuses:
+        if old_status == new_status:
+            continue
+        for status, delta in ((old_status, -1), (new_status, 1)):
+            field = STATUS_COUNTER_FIELDS.get(status)
+            if field:
+                deltas[field] = deltas.get(field, 0) + delta
+    _adjust(job_post_id, deltas)
+
+
+def record_saved_change(job_post_id, delta):
+    _adjust(job_post_id, {'saved_count': delta})
+
+
+def compute_job_counters(job_post_ids=None):
+    """Return {job_post_id: {counter: value}} computed from the source tables"""
+    job_posts = JobPost.objects.all()
+    if job_post_ids is not None:
+        job_posts = job_posts.filter(id__in=list(job_post_ids))
+
+    aggregates = {'application_count': Count('applications')}
+    for status, field in STATUS_COUNTER_FIELDS.items():
+        aggregates[field] = Count('applications', filter=Q(applications__status=status))
+
+    counters = {
+        row.pop('id'): row
+        for row in job_posts.order_by().values('id').annotate(**aggregates)
+    }
+    for job_post_id, saved_count in job_posts.order_by().values('id').annotate(
+        saved=Count('saved_by')
+    ).values_list('id', 'saved'):
+        counters[job_post_id]['saved_count'] = saved_count
+    return counters
+
+
+def reconcile_job_counters(job_post_ids=None, dry_run=False):
+    """
+    Compare stored counters with freshly computed ones and rewrite the job
+    posts that drifted.
+
+    Returns a list of (job_post_id, {counter: (stored, actual)}) for every
+    job post that was out of date.
+    """
+    expected = compute_job_counters(job_post_ids)
+    stored = JobPost.objects.filter(id__in=list(expected)).values('id', *COUNTER_FIELDS)
+
+    drifted = []
+    for row in stored:
+        job_post_id = row['id']
+        diff = {
+            field: (row[field], expected[job_post_id][field])
+            for field in COUNTER_FIELDS
+            if row[field] != expected[job_post_id][field]
+        }
+        if not diff:
+            continue
+        drifted.append((job_post_id, diff))
+        if not dry_run:
+            JobPost.objects.filter(id=job_post_id).update(
+                **{field: actual for field, (_, actual) in diff.items()}
+            )
+    if drifted:
+        logger.warning(f"{'Found' if dry_run else 'Repaired'} counter drift on {len(drifted)} job posts")
+    return drifted
@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Q, Value
+from django.db.models.functions import Least
+import hashlib
+import json
+import logging
+
+from .models import JobPost
+
+logger = logging.getLogger(__name__)
+
+FACETS_CACHE_TIMEOUT = 60 * 15
+FACETS_VERSION_KEY = 'job_facets_version'
+
+# (label, lower bound, upper bound) - bounds are inclusive, None means open-ended
+EXPERIENCE_BANDS = [
+    ('0-1', 0, 1),
+    ('2-4', 2, 4),
+    ('5-9', 5, 9),
+    ('10+', 10, None),
+]
+
+# Buckets on the advertised minimum salary, in rupees per annum
+SALARY_BUCKETS = [
+    ('0-3L', 0, 299999),
+    ('3L-6L', 300000, 599999),
+    ('6L-10L', 600000, 999999),
+    ('10L-20L', 1000000, 1999999),
+    ('20L+', 2000000, None),
+]
+
+SALARY_HISTOGRAM_FIELDS = ('min_salary', 'max_salary')
+DEFAULT_SALARY_BUCKET_WIDTH = 100000
+MIN_SALARY_BUCKET_WIDTH = 10000
+# Everything past the last bucket is folded into it (open-ended "N+" bucket)
+MAX_SALARY_BUCKETS = 100
+
+
+def _range_q(field, low, high):
+    q = Q(**{f'{field}__gte': low})
+    if high is not None:
+        q &= Q(**{f'{field}__lte': high})
+    return q
+
+
+def _facet_definitions():
+    """Map every facet to a list of (value, Q) pairs"""
+    return {
+        'job_type': [(value, Q(job_type=value)) for value, _ in JobPost.JOB_TYPE_CHOICES],
+        'employment_type': [(value, Q(employment_type=value)) for value, _ in JobPost.EMPLOYMENT_TYPE_CHOICES],
+        'domain': [(value, Q(domain=value)) for value, _ in JobPost.DOMAIN_CHOICES],
+        'experience': [(label, _range_q('experience_level', low, high)) for label, low, high in EXPERIENCE_BANDS],
+        'salary': [(label, _range_q('min_salary', low, high)) for label, low, high in SALARY_BUCKETS],
+    }
+
+
+def compute_facets(queryset):
+    """
+    Count every facet value for a queryset in a single aggregate query.
+
+    Each facet value becomes one filtered COUNT over the same scan, so the
+    whole facet panel costs one round-trip no matter how many values exist.
+    """
+    definitions = _facet_definitions()
+    aggregates = {'total': Count('id')}
+    for facet, values in definitions.items():
+        for index, (value, condition) in enumerate(values):
+            aggregates[f'{facet}_{index}'] = Count('id', filter=condition)
+
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    facets = {'total': counts['total']}
+    for facet, values in definitions.items():
+        facets[facet] = [
+            {'value': value, 'count': counts[f'{facet}_{index}']}
+            for index, (value, _) in enumerate(values)
+        ]
+    return facets
+
+
+def get_facets_version():
+    version = cache.get(FACETS_VERSION_KEY)
+    if version is None:
+        cache.add(FACETS_VERSION_KEY, 1, timeout=None)
+        version = cache.get(FACETS_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_facets():
+    """Invalidate every cached facet result after a job post changes"""
+    try:
+        cache.incr(FACETS_VERSION_KEY)
+    except ValueError:
+        cache.add(FACETS_VERSION_KEY, 1, timeout=None)
+
+
+def _filters_cache_key(prefix, filters):
+    normalized = json.dumps(
+        {key: value for key, value in filters.items() if value not in (None, '')},
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.md5(normalized.lower().encode()).hexdigest()
+    return f'{prefix}:{get_facets_version()}:{digest}'
+
+
+def get_cached_facets(queryset, filters):
+    """
+    Return facet counts for a filtered queryset, cached per normalized
+    filter set until any job post changes.
+
+    Args:
+        queryset: JobPost queryset with every filter applied
+        filters: Dict of the normalized filter values that built the queryset
+    """
+    cache_key = _filters_cache_key('job_facets', filters)
+
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(cache_key, facets, timeout=FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def compute_salary_histogram(queryset, bucket_width, field='max_salary'):
+    """
+    Count job posts per fixed-width salary bucket in one GROUP BY query.
+
+    Buckets run from 0 up to the highest non-empty one with empty buckets
+    filled in, so the result can be drawn as-is; the last possible bucket
+    (``MAX_SALARY_BUCKETS``) is open-ended.
+    """
+    bucket = Least(
+        ExpressionWrapper(F(field) / Value(bucket_width), output_field=IntegerField()),
+        Value(MAX_SALARY_BUCKETS - 1),
+    )
+    rows = queryset.order_by().annotate(bucket=bucket).values('bucket').annotate(count=Count('id'))
+    counts = {row['bucket']: row['count'] for row in rows}
+
+    buckets = []
+    for index in range(max(counts) + 1 if counts else 0):
+        is_last = index == MAX_SALARY_BUCKETS - 1
+        buckets.append({
+            'min': index * bucket_width,
+            'max': None if is_last else (index + 1) * bucket_width - 1,
+            'count': counts.get(index, 0),
+        })
+    return {
+        'field': field,
+        'bucket_width': bucket_width,
+        'total': sum(counts.values()),
+        'buckets': buckets,
+    }
+
+
+def get_cached_salary_histogram(queryset, filters, bucket_width, field='max_salary'):
+    """
+    Return the salary histogram for a filtered queryset, cached per filter
+    set, bucket width and field until any job post changes.
+    """
+    cache_key = _filters_cache_key(
+        'job_salary_histogram',
+        dict(filters, bucket_width=bucket_width, field=field),
+    )
+
+    histogram = cache.get(cache_key)
+    if histogram is None:
+        histogram = compute_salary_histogram(queryset, bucket_width, field)
+        cache.set(cache_key, histogram, timeout=FACETS_CACHE_TIMEOUT)
+    return histogram
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobpost_app.counters import reconcile_job_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized application and saved counters on job posts and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_post_ids', nargs='*', type=int, help='Only check these job posts')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        drifted = reconcile_job_counters(options['job_post_ids'] or None, dry_run=options['dry_run'])
+        for job_post_id, diff in drifted:
+            changes = ', '.join(f'{field} {stored} -> {actual}' for field, (stored, actual) in diff.items())
+            self.stdout.write(f'Job post {job_post_id}: {changes}')
+
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} drift on {len(drifted)} job posts'))
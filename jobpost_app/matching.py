@@ -0,0 +1,198 @@
+"""
+Skill match engine.
+
+Skill sets are stored as bitsets (plain Python ints with one bit per skill
+id), so the overlap between a seeker and a job is a single AND plus a
+popcount. Scoring one seeker against every live job, or one job against a
+page of applicants, is one pass over in-memory ints with no per-row queries.
+
+- Live job bitsets are held per worker and kept current incrementally: every
+  job skill change records the job id under a new shared generation number,
+  and each worker replays only the jobs changed since its own generation.
+- Seeker bitsets live in the shared cache, are dropped whenever a
+  JobSeekerSkill row changes and are rebuilt lazily in one bulk query.
+"""
+import logging
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from profile_app.models import JobSeekerSkill
+from .models import JobPost
+
+logger = logging.getLogger(__name__)
+
+SEEKER_BITS_KEY = 'skill_bits:seeker:{}'
+SEEKER_BITS_TIMEOUT = 60 * 60 * 24
+JOB_GENERATION_KEY = 'skill_match:job_generation'
+JOB_CHANGE_KEY = 'skill_match:job_change:{}'
+JOB_CHANGE_TIMEOUT = 60 * 60
+# Past this many missed changes a worker reloads the whole index instead
+MAX_REPLAYED_CHANGES = 200
+
+
+def to_bits(skill_ids):
+    bits = 0
+    for skill_id in skill_ids:
+        bits |= 1 << skill_id
+    return bits
+
+
+def skill_match(seeker_bits, job_bits):
+    """Overlap summary between a seeker's and a job's skill bitsets"""
+    total_job_skills = job_bits.bit_count()
+    matching_skills = (seeker_bits & job_bits).bit_count()
+    match_percentage = (matching_skills / total_job_skills * 100) if total_job_skills > 0 else 0
+    return {
+        "matching_skills": matching_skills,
+        "total_skills": total_job_skills,
+        "match_percentage": round(match_percentage, 1)
+    }
+
+
+def get_seeker_skill_bits(seeker_ids):
+    """
+    Return {seeker_id: bitset} for the given job seekers, reading the shared
+    cache first and filling every miss with one query.
+    """
+    seeker_ids = list(seeker_ids)
+    keys = {SEEKER_BITS_KEY.format(seeker_id): seeker_id for seeker_id in seeker_ids}
+    cached = cache.get_many(list(keys))
+    result = {keys[key]: bits for key, bits in cached.items()}
+
+    missing = [seeker_id for seeker_id in seeker_ids if seeker_id not in result]
+    if missing:
+        skill_ids = {seeker_id: [] for seeker_id in missing}
+        for seeker_id, skill_id in JobSeekerSkill.objects.filter(
+            job_seeker_id__in=missing
+        ).values_list('job_seeker_id', 'skill_id'):
+            skill_ids[seeker_id].append(skill_id)
+        fresh = {seeker_id: to_bits(ids) for seeker_id, ids in skill_ids.items()}
+        cache.set_many(
+            {SEEKER_BITS_KEY.format(seeker_id): bits for seeker_id, bits in fresh.items()},
+            timeout=SEEKER_BITS_TIMEOUT
+        )
+        result.update(fresh)
+    return result
+
+
+def invalidate_seeker_skills(seeker_id):
+    """Drop the cached bitset once the skill change commits"""
+    transaction.on_commit(lambda: cache.delete(SEEKER_BITS_KEY.format(seeker_id)))
+
+
+def _publish_job_change(job_post_id):
+    try:
+        generation = cache.incr(JOB_GENERATION_KEY)
+    except ValueError:
+        cache.add(JOB_GENERATION_KEY, 0, timeout=None)
+        generation = cache.incr(JOB_GENERATION_KEY)
+    cache.set(JOB_CHANGE_KEY.format(generation), job_post_id, timeout=JOB_CHANGE_TIMEOUT)
+
+
+def record_job_skills_change(job_post_id):
+    """
+    Publish a job skill change so every worker refreshes that job. The
+    bump waits for the commit, otherwise a worker could reload the old
+    skills and still record the new generation.
+    """
+    transaction.on_commit(lambda: _publish_job_change(job_post_id))
+
+
+def _live_jobs():
+    return JobPost.objects.filter(
+        status='PUBLISHED',
+        is_deleted=False,
+        application_deadline__gte=timezone.now(),
+    )
+
+
+def _load_job_bits(job_posts):
+    """Return {job_id: (bitset, application_deadline)} in two queries"""
+    entries = {
+        job_id: [0, deadline]
+        for job_id, deadline in job_posts.values_list('id', 'application_deadline')
+    }
+    for job_id, skill_id in JobPost.skills.through.objects.filter(
+        jobpost_id__in=list(entries)
+    ).values_list('jobpost_id', 'skills_id'):
+        entries[job_id][0] |= 1 << skill_id
+    return {job_id: tuple(entry) for job_id, entry in entries.items()}
+
+
+class LiveJobSkillIndex:
+    """Per-worker bitset index of every live job post's skills"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._generation = None
+
+    def _sync(self):
+        shared_generation = cache.get(JOB_GENERATION_KEY, 0)
+        if self._generation == shared_generation:
+            return
+
+        missed = None
+        if self._generation is not None and 0 < shared_generation - self._generation <= MAX_REPLAYED_CHANGES:
+            keys = [JOB_CHANGE_KEY.format(g) for g in range(self._generation + 1, shared_generation + 1)]
+            changes = cache.get_many(keys)
+            if len(changes) == len(keys):
+                missed = set(changes.values())
+
+        if missed is None:
+            self._jobs = _load_job_bits(_live_jobs())
+            logger.info(f"Loaded skill bitsets for {len(self._jobs)} live job posts")
+        else:
+            refreshed = _load_job_bits(_live_jobs().filter(id__in=missed))
+            for job_id in missed:
+                self._jobs.pop(job_id, None)
+            self._jobs.update(refreshed)
+        self._generation = shared_generation
+
+    def live_jobs(self):
+        """Return {job_id: bitset} for jobs that are still open"""
+        with self._lock:
+            self._sync()
+            jobs = self._jobs
+        now = timezone.now()
+        return {job_id: bits for job_id, (bits, deadline) in jobs.items() if deadline >= now}
+
+
+live_job_index = LiveJobSkillIndex()
+
+
+def get_job_skill_bits(job_post_id):
+    """Bitset for one job post, from the live index when it is open"""
+    bits = live_job_index.live_jobs().get(job_post_id)
+    if bits is None:
+        bits = to_bits(
+            JobPost.skills.through.objects.filter(jobpost_id=job_post_id).values_list('skills_id', flat=True)
+        )
+    return bits
+
+
+def score_jobs_for_seeker(seeker_id, job_ids=None):
+    """
+    Score one job seeker against every live job (or the given subset).
+
+    Returns {job_id: skill_match dict}.
+    """
+    seeker_bits = get_seeker_skill_bits([seeker_id])[seeker_id]
+    jobs = live_job_index.live_jobs()
+    if job_ids is not None:
+        jobs = {job_id: jobs[job_id] for job_id in job_ids if job_id in jobs}
+    return {job_id: skill_match(seeker_bits, bits) for job_id, bits in jobs.items()}
+
+
+def score_applicants_for_job(job_post_id, seeker_ids):
+    """
+    Score many job seekers against one job post.
+
+    Returns {seeker_id: skill_match dict}.
+    """
+    job_bits = get_job_skill_bits(job_post_id)
+    seeker_bits = get_seeker_skill_bits(seeker_ids)
+    return {seeker_id: skill_match(bits, job_bits) for seeker_id, bits in seeker_bits.items()}
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-17 05:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import F, Value
+
+
+def populate_search_vector(apps, schema_editor):
+    JobPost = apps.get_model('jobpost_app', 'JobPost')
+    for job_post in JobPost.objects.select_related('job_provider').prefetch_related('skills'):
+        skill_names = ' '.join(skill.name for skill in job_post.skills.all())
+        JobPost.objects.filter(id=job_post.id).update(
+            search_vector=(
+                SearchVector(F('title'), weight='A', config='english')
+                + SearchVector(Value(job_post.job_provider.company_name), weight='B', config='english')
+                + SearchVector(Value(skill_names), weight='C', config='english')
+                + SearchVector(F('description'), F('requirements'), F('location'), weight='D', config='english')
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0005_alter_jobseeker_resume'),
+        ('jobpost_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='jobpost_app_search__e08466_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:07
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of location_app.utils.normalize_location / resolve_location as
+# of this migration, so later edits to the live resolver do not change it
+def normalize_location(text):
+    if not text:
+        return ''
+    primary = str(text).split(',')[0]
+    primary = unicodedata.normalize('NFKD', primary).encode('ascii', 'ignore').decode('ascii')
+    primary = re.sub(r'[^\w\s-]', ' ', primary.lower())
+    return re.sub(r'\s+', ' ', primary).strip()
+
+
+def resolve_location(text, Location, LocationAlias):
+    key = normalize_location(text)
+    if not key:
+        return None
+    alias = LocationAlias.objects.select_related('location').filter(alias=key).first()
+    if alias:
+        return alias.location
+    location, _ = Location.objects.get_or_create(
+        normalized_name=key,
+        defaults={'name': str(text).split(',')[0].strip()[:255]}
+    )
+    LocationAlias.objects.get_or_create(alias=key, defaults={'location': location})
+    return location
+
+
+def populate_jobpost_canonical_location(apps, schema_editor):
+    JobPost = apps.get_model('jobpost_app', 'JobPost')
+    Location = apps.get_model('location_app', 'Location')
+    LocationAlias = apps.get_model('location_app', 'LocationAlias')
+    resolved = {}
+    for row_id, location in JobPost.objects.values_list('id', 'location'):
+        if location not in resolved:
+            canonical = resolve_location(location, Location, LocationAlias)
+            resolved[location] = canonical.id if canonical else None
+        JobPost.objects.filter(id=row_id).update(canonical_location_id=resolved[location])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobpost_app', '0002_jobpost_search_vector'),
+        ('location_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='canonical_location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_posts', to='location_app.location'),
+        ),
+        migrations.RunPython(populate_jobpost_canonical_location, migrations.RunPython.noop),
+    ]
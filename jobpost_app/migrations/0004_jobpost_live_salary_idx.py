@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobpost_app', '0003_jobpost_canonical_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'PUBLISHED')), fields=['max_salary', 'min_salary'], name='jobpost_live_salary_idx'),
+        ),
+    ]
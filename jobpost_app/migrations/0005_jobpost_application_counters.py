@@ -0,0 +1,83 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:10
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+STATUS_COUNTER_FIELDS = {
+    'APPLIED': 'applied_count',
+    'REVIEWING': 'reviewing_count',
+    'SHORTLISTED': 'shortlisted_count',
+    'REJECTED': 'rejected_count',
+    'HIRED': 'hired_count',
+    'WITHDRAWN': 'withdrawn_count',
+}
+
+
+def populate_counters(apps, schema_editor):
+    JobPost = apps.get_model('jobpost_app', 'JobPost')
+    aggregates = {'application_count': Count('applications')}
+    for status, field in STATUS_COUNTER_FIELDS.items():
+        aggregates[field] = Count('applications', filter=Q(applications__status=status))
+    for row in JobPost.objects.order_by().values('id').annotate(**aggregates):
+        JobPost.objects.filter(id=row.pop('id')).update(**row)
+    for job_post_id, saved_count in JobPost.objects.order_by().values('id').annotate(
+        saved=Count('saved_by')
+    ).values_list('id', 'saved'):
+        JobPost.objects.filter(id=job_post_id).update(saved_count=saved_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0006_jobprovider_canonical_location'),
+        ('jobpost_app', '0004_jobpost_live_salary_idx'),
+        ('location_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='applied_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='hired_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='reviewing_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='saved_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='shortlisted_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='withdrawn_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(fields=['-application_count'], name='jobpost_application_count_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
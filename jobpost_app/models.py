@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from auth_app.models import JobProvider, JobSeeker
 
 # Create your models here.
@@ -44,6 +47,11 @@ class JobPost(models.Model):
         ('PUBLISHED', 'Published'),
         ('CLOSED', 'Closed'),
     )
+    # Only ever written with F() updates, see jobpost_app.counters
+    COUNTER_FIELDS = (
+        'application_count', 'applied_count', 'reviewing_count', 'shortlisted_count',
+        'rejected_count', 'hired_count', 'withdrawn_count', 'saved_count',
+    )
 
     job_provider = models.ForeignKey(JobProvider, on_delete=models.CASCADE, related_name='job_posts')
     title = models.CharField(max_length=255)
@@ -51,6 +59,7 @@ class JobPost(models.Model):
     requirements = models.TextField()
     responsibilities = models.TextField()
     location = models.CharField(max_length=255)
+    canonical_location = models.ForeignKey('location_app.Location', on_delete=models.SET_NULL, null=True, blank=True, related_name='job_posts')
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     employment_type = models.CharField(max_length=20, choices=EMPLOYMENT_TYPE_CHOICES)
     skills = models.ManyToManyField(Skills, related_name='job_posts')
@@ -63,8 +72,19 @@ class JobPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)  # Weighted full-text document, see jobpost_app.search
+    # Denormalized counters, maintained by jobpost_app.counters
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    applied_count = models.PositiveIntegerField(default=0, editable=False)
+    reviewing_count = models.PositiveIntegerField(default=0, editable=False)
+    shortlisted_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
+    hired_count = models.PositiveIntegerField(default=0, editable=False)
+    withdrawn_count = models.PositiveIntegerField(default=0, editable=False)
+    saved_count = models.PositiveIntegerField(default=0, editable=False)
     class Meta:
         indexes = [
+            GinIndex(fields=['search_vector']),
             models.Index(fields=['location']),
             models.Index(fields=['job_type']),
             models.Index(fields=['employment_type']),
@@ -73,8 +93,25 @@ class JobPost(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['is_deleted']),
+            models.Index(fields=['-application_count'], name='jobpost_application_count_idx'),
+            # "Paying at least X" seeks on max_salary among live posts only
+            models.Index(
+                fields=['max_salary', 'min_salary'],
+                name='jobpost_live_salary_idx',
+                condition=Q(status='PUBLISHED', is_deleted=False),
+            ),
         ]
 
+    def save(self, *args, **kwargs):
+        # A plain save of a loaded instance leaves the counters alone, its copies may be stale
+        if not self._state.adding and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
         self.is_deleted = True
         self.save()
@@ -100,6 +137,7 @@ class JobApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='APPLIED')
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, editable=False)  # Client key of the apply request
 
     class Meta:
         unique_together = ('jobpost', 'job_seeker')
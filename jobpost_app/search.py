@@ -0,0 +1,76 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db.models import F, Value
+import logging
+
+from .models import JobPost
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+
+
+def build_search_document(job_post):
+    """
+    Build the weighted search document for a job post.
+
+    Title ranks highest, then company name, then skills, then the long
+    free-text fields (description, requirements and location).
+    """
+    skill_names = ' '.join(skill.name for skill in job_post.skills.all())
+    return (
+        SearchVector(F('title'), weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Value(job_post.job_provider.company_name), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Value(skill_names), weight='C', config=SEARCH_CONFIG)
+        + SearchVector(F('description'), F('requirements'), F('location'), weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(job_post_ids):
+    """
+    Recompute the stored search document for the given job posts.
+
+    Args:
+        job_post_ids: Iterable of JobPost primary keys
+    """
+    job_posts = JobPost.objects.filter(id__in=list(job_post_ids)).select_related(
+        'job_provider'
+    ).prefetch_related('skills')
+
+    for job_post in job_posts:
+        try:
+            JobPost.objects.filter(id=job_post.id).update(
+                search_vector=build_search_document(job_post)
+            )
+        except Exception as e:
+            logger.exception(f"Failed to update search vector for job post {job_post.id}: {str(e)}")
+
+
+def build_search_query(search):
+    return SearchQuery(search, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def match_job_posts(queryset, search):
+    """Filter a JobPost queryset by a full-text query without ranking it"""
+    return queryset.filter(search_vector=build_search_query(search))
+
+
+def search_job_posts(queryset, search):
+    """
+    Filter a JobPost queryset by a full-text query and rank it by relevance.
+
+    Each result is annotated with ``search_rank`` and a ``search_highlight``
+    snippet of the description with matched terms wrapped in <mark> tags.
+    """
+    query = build_search_query(search)
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query),
+        search_highlight=SearchHeadline(
+            'description',
+            query,
+            config=SEARCH_CONFIG,
+            start_sel='<mark>',
+            stop_sel='</mark>',
+            max_words=35,
+            min_words=15,
+        ),
+    ).order_by('-search_rank', '-created_at')
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
 
 from auth_app import serializer
 from .models import *
@@ -7,6 +8,7 @@ from profile_app.models import Education, WorkExperience, JobSeekerSkill
 from jobpost_app.models import JobPost
 from interview_app.serializer import InterviewScheduleSerializer
 from interview_app.models import InterviewSchedule
+from .matching import score_applicants_for_job
 
 class SkillSerializer(serializers.ModelSerializer):
     class Meta:
@@ -48,8 +50,8 @@ class JobPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = JobPost
-        fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at', 'id', 'job_provider', 'is_deleted']
+        exclude = ['search_vector']
+        read_only_fields = ['created_at', 'updated_at', 'id', 'job_provider', 'is_deleted', 'canonical_location']
 
     def get_requirements_display(self, obj):
         return obj.requirements.split('\n') if obj.requirements else []
@@ -149,9 +151,23 @@ class PublicJobPostSerializer(serializers.ModelSerializer):
         return obj.responsibilities.split("\n") if obj.responsibilities else []
         
     def get_questions(self, obj):
-        questions = JobQuestion.objects.filter(job_post=obj)
-        return JobQuestionSerializer(questions, many=True).data
-    
+        return JobQuestionSerializer(obj.questions.all(), many=True).data
+
+
+class PublicJobPostSearchSerializer(PublicJobPostSerializer):
+    """Public job post with full-text relevance and a highlighted snippet"""
+    search_rank = serializers.FloatField(read_only=True)
+    search_highlight = serializers.CharField(read_only=True)
+
+    class Meta(PublicJobPostSerializer.Meta):
+        fields = PublicJobPostSerializer.Meta.fields + ["search_rank", "search_highlight"]
+
+
+class JobPostSearchSerializer(JobPostSerializer):
+    """Provider job post with full-text relevance and a highlighted snippet"""
+    search_rank = serializers.FloatField(read_only=True)
+    search_highlight = serializers.CharField(read_only=True)
+
 class JobApplicationSerializer(serializers.ModelSerializer):
     job_title = serializers.SerializerMethodField()
     company_name = serializers.SerializerMethodField()
@@ -238,7 +254,7 @@ class JobSeekerSerializer(serializers.ModelSerializer):
 
 class JobPostListSerializer(serializers.ModelSerializer):
     company_name = serializers.CharField(source='job_provider.company_name')
-    applicants_count = serializers.SerializerMethodField()
+    applicants_count = serializers.IntegerField(source='application_count', read_only=True)
     
     class Meta:
         model = JobPost
@@ -246,9 +262,6 @@ class JobPostListSerializer(serializers.ModelSerializer):
             'id', 'title', 'company_name', 'location', 'job_type', 
             'employment_type', 'status', 'application_deadline', 'applicants_count'
         ]
-    
-    def get_applicants_count(self, obj):
-        return obj.applications.count()
 
 
 class JobApplicationDetailSerializer(serializers.ModelSerializer):
@@ -268,66 +281,52 @@ class JobApplicationDetailSerializer(serializers.ModelSerializer):
             'question_answers'  # Add this line
         ]
     
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Load every related collection the serializer needs in one bulk query
+        per collection, so listing N applications costs a constant number of
+        queries instead of several per applicant.
+        """
+        return queryset.select_related(
+            'job_seeker__user'
+        ).prefetch_related(
+            Prefetch('job_seeker__skills', queryset=JobSeekerSkill.objects.select_related('skill')),
+            'job_seeker__educations',
+            'job_seeker__work_experiences',
+            'interviews',
+            Prefetch('question_answers', queryset=JobQuestionAnswer.objects.select_related('question')),
+        )
+    
     def get_skills(self, obj):
-        job_seeker_skills = JobSeekerSkill.objects.filter(job_seeker=obj.job_seeker)
-        return JobSeekerSkillSerializer(job_seeker_skills, many=True).data
+        return JobSeekerSkillSerializer(obj.job_seeker.skills.all(), many=True).data
     
     def get_education(self, obj):
-        education = Education.objects.filter(job_seeker=obj.job_seeker)
-        return EducationSerializer(education, many=True).data
+        return EducationSerializer(obj.job_seeker.educations.all(), many=True).data
     
     def get_work_experience(self, obj):
-        work_experience = WorkExperience.objects.filter(job_seeker=obj.job_seeker)
-        return WorkExperienceSerializer(work_experience, many=True).data
+        return WorkExperienceSerializer(obj.job_seeker.work_experiences.all(), many=True).data
     
     def get_skill_match(self, obj):
-        job_seeker = obj.job_seeker
-        jobpost = obj.jobpost
-        
-        # Get user skills and job skills
-        user_skill_ids = set(js_skill.skill.id for js_skill in JobSeekerSkill.objects.filter(job_seeker=job_seeker))
-        job_skill_ids = set(skill.id for skill in jobpost.skills.all())
-        
-        # Calculate matching skills percentage
-        total_job_skills = len(job_skill_ids)
-        matching_skills = len(user_skill_ids.intersection(job_skill_ids))
-        match_percentage = (matching_skills / total_job_skills * 100) if total_job_skills > 0 else 0
-        
-        return {
-            "matching_skills": matching_skills,
-            "total_skills": total_job_skills,
-            "match_percentage": round(match_percentage, 1)
-        }
+        # Views listing many applicants pre-score them in one pass
+        skill_matches = self.context.get('skill_matches')
+        if skill_matches is not None and obj.job_seeker_id in skill_matches:
+            return skill_matches[obj.job_seeker_id]
+        return score_applicants_for_job(obj.jobpost_id, [obj.job_seeker_id])[obj.job_seeker_id]
         
     def get_interviews(self, obj):
         """Get all interviews for this application"""
-        interviews = InterviewSchedule.objects.filter(application=obj.id)
-        return InterviewScheduleSerializer(interviews, many=True).data
+        return InterviewScheduleSerializer(obj.interviews.all(), many=True).data
     
     def get_question_answers(self, obj):
         """Get all question answers for this application"""
-        answers = JobQuestionAnswer.objects.filter(application=obj).select_related('question')
-        return [{
-            'question_id': answer.question.id,
-            'question_text': answer.question.question_text,
-            'question_type': answer.question.question_type,
-            'answer_text': answer.answer_text,
-            'answered_at': answer.created_at
-        } for answer in answers]
-        
-    def get_interviews(self, obj):
-        interviews = InterviewSchedule.objects.filter(application=obj.id)
-        return InterviewScheduleSerializer(interviews, many=True).data
-    
-    def get_question_answers(self, obj):
-        answers = JobQuestionAnswer.objects.filter(application=obj).select_related('question')
         return [{
             'question_id': answer.question.id,
             'question_text': answer.question.question_text,
             'question_type': answer.question.question_type,
             'answer_text': answer.answer_text,
             'answered_at': answer.created_at
-        } for answer in answers]
+        } for answer in obj.question_answers.all()]
 class JobSeekerApplicationSerializer(serializers.ModelSerializer):
     job_title = serializers.CharField(source='jobpost.title')
     company_name = serializers.CharField(source='jobpost.job_provider.company_name')
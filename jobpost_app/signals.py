@@ -0,0 +1,134 @@
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from auth_app.models import JobProvider
+from profile_app.models import JobSeekerSkill
+from .models import JobApplication, JobPost, JobQuestion, SavedJob, Skills
+from .search import update_search_vector
+from .facets import invalidate_facets
+from .matching import invalidate_seeker_skills, record_job_skills_change
+from .caching import invalidate_job_detail
+from .autocomplete import invalidate_skill_index
+from .counters import record_application_change, record_saved_change
+
+
+@receiver(post_save, sender=JobPost)
+def refresh_job_post_search_vector(sender, instance, raw=False, **kwargs):
+    """Keep the search document current whenever a job post is saved"""
+    if raw:
+        return
+    update_search_vector([instance.id])
+    invalidate_facets()
+    invalidate_job_detail([instance.id])
+    # Status or deadline changes move the post in or out of the live match index
+    record_job_skills_change(instance.id)
+
+
+@receiver(m2m_changed, sender=JobPost.skills.through)
+def refresh_search_vector_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Skills feed both the search document and the live skill match index"""
+    if reverse and action == 'pre_clear':
+        # instance is a Skill; remember its job posts before the links are gone
+        instance._cleared_job_post_ids = list(instance.job_posts.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_job_post_ids', [])
+        job_post_ids = list(pk_set or [])
+    else:
+        job_post_ids = [instance.id]
+    update_search_vector(job_post_ids)
+    invalidate_facets()
+    invalidate_job_detail(job_post_ids)
+    for job_post_id in job_post_ids:
+        record_job_skills_change(job_post_id)
+
+
+@receiver(post_save, sender=JobProvider)
+def refresh_provider_job_posts(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Company name and logo are part of every job post the provider owns"""
+    if raw or created:
+        return
+    job_post_ids = list(instance.job_posts.values_list('id', flat=True))
+    invalidate_job_detail(job_post_ids)
+    if update_fields is not None and 'company_name' not in update_fields:
+        return
+    update_search_vector(job_post_ids)
+    invalidate_facets()
+
+
+@receiver(post_save, sender=JobQuestion)
+@receiver(post_delete, sender=JobQuestion)
+def refresh_job_detail_on_question_change(sender, instance, raw=False, **kwargs):
+    """Questions are rendered in the public job detail"""
+    if raw:
+        return
+    invalidate_job_detail([instance.job_post_id])
+
+
+@receiver(post_save, sender=JobSeekerSkill)
+@receiver(post_delete, sender=JobSeekerSkill)
+def refresh_seeker_skill_bits(sender, instance, raw=False, **kwargs):
+    """Drop the cached skill bitset so the match engine rebuilds it"""
+    if raw:
+        return
+    invalidate_seeker_skills(instance.job_seeker_id)
+
+
+@receiver(post_save, sender=Skills)
+@receiver(post_delete, sender=Skills)
+def refresh_skill_index(sender, instance, raw=False, **kwargs):
+    """New, renamed or removed skills must show up in autocomplete"""
+    if raw:
+        return
+    invalidate_skill_index()
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_application_status(sender, instance, **kwargs):
+    # Read from __dict__ so deferred status fields are not loaded
+    instance._counted_status = instance.__dict__.get('status')
+
+
+@receiver(pre_save, sender=JobApplication)
+def load_counted_status(sender, instance, raw=False, **kwargs):
+    # Instances loaded with status deferred have not seen the stored status yet
+    if raw or instance._state.adding or instance._counted_status is not None:
+        return
+    instance._counted_status = JobApplication.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=JobApplication)
+def count_application_save(sender, instance, created, raw=False, **kwargs):
+    """Keep the job post's application counters in step"""
+    if raw:
+        return
+    old_status = None if created else instance._counted_status
+    if old_status is None and not created:
+        return
+    record_application_change(instance.jobpost_id, old_status, instance.status)
+    instance._counted_status = instance.status
+
+
+@receiver(pre_delete, sender=JobApplication)
+def load_deleted_status(sender, instance, **kwargs):
+    # A deferred status can no longer be loaded once the row is gone
+    instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=JobApplication)
+def count_application_delete(sender, instance, **kwargs):
+    record_application_change(instance.jobpost_id, instance._counted_status, None)
+
+
+@receiver(post_save, sender=SavedJob)
+def count_saved_job(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    record_saved_change(instance.jobpost_id, 1)
+
+
+@receiver(post_delete, sender=SavedJob)
+def count_unsaved_job(sender, instance, **kwargs):
+    record_saved_change(instance.jobpost_id, -1)
@@ -1,3 +1,283 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import FloatField, Func, Value
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from auth_app.models import JobProvider, JobSeeker, User
+from backend.pagination import InvalidCursor, KeysetPaginator
+from location_app.models import Location, LocationAlias
+from .autocomplete import SKILLS_GENERATION_KEY, SkillAutocompleteIndex, invalidate_skill_index
+from .counters import reconcile_job_counters
+from .matching import JOB_GENERATION_KEY, SEEKER_BITS_KEY, invalidate_seeker_skills, record_job_skills_change
+from .models import JobApplication, JobPost, Skills
+from .search import search_job_posts
+from .views import PublicJobPostListView
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_provider(email='provider@example.com', location='Kochi'):
+    user = User.objects.create_user(username=email, email=email, password='x', user_type='job_provider')
+    return JobProvider.objects.create(user=user, company_name='Acme', industry='IT', location=location)
+
+
+def create_seeker(email='seeker@example.com'):
+    user = User.objects.create_user(username=email, email=email, password='x', user_type='job_seeker')
+    return JobSeeker.objects.create(user=user, expected_salary=100)
+
+
+def create_job(provider, location='Kochi', **fields):
+    values = {
+        'title': 'Backend developer',
+        'description': 'Build APIs',
+        'requirements': 'Python',
+        'responsibilities': 'Ship features',
+        'location': location,
+        'job_type': 'ONSITE',
+        'employment_type': 'FULL_TIME',
+        'domain': 'IT',
+        'experience_level': 2,
+        'min_salary': 100,
+        'max_salary': 200,
+        'application_deadline': timezone.now() + timedelta(days=30),
+        'status': 'PUBLISHED',
+    }
+    values.update(fields)
+    return JobPost.objects.create(job_provider=provider, **values)
+
+
+class KeysetPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Two categories with five skills each, so every page boundary is a tie
+        for index in range(10):
+            Skills.objects.create(name=f'skill {index}', category='backend' if index < 5 else 'frontend')
+
+    def walk(self, queryset, ordering, page_size=3):
+        paginator = KeysetPaginator(queryset, ordering, page_size)
+        pages, cursor = [], None
+        while True:
+            items, next_cursor, previous_cursor = paginator.paginate(cursor)
+            pages.append((items, previous_cursor))
+            if next_cursor is None:
+                return paginator, pages
+            cursor = next_cursor
+
+    def test_forward_pages_through_ties_without_gaps_or_repeats(self):
+        for ordering in ('category', '-category'):
+            _, pages = self.walk(Skills.objects.all(), ordering)
+            ids = [skill.id for items, _ in pages for skill in items]
+            self.assertEqual(len(ids), 10, ordering)
+            self.assertEqual(len(set(ids)), 10, ordering)
+
+    def test_previous_cursor_returns_the_same_page(self):
+        paginator, pages = self.walk(Skills.objects.all(), 'category')
+        for (items, _), (_, previous_cursor) in zip(pages, pages[1:]):
+            previous_items, _, _ = paginator.paginate(previous_cursor)
+            self.assertEqual([skill.id for skill in previous_items], [skill.id for skill in items])
+
+    def test_float_ties_round_trip_through_the_cursor(self):
+        # Every row has the same rank, only the id tie-break can order them. On
+        # Postgres the cast yields a 4 byte real, like ts_rank does
+        ranked = Skills.objects.annotate(
+            search_rank=Func(Value(0.1), template='CAST(%(expressions)s AS real)', output_field=FloatField())
+        )
+        _, pages = self.walk(ranked, '-search_rank', page_size=4)
+        ids = [skill.id for items, _ in pages for skill in items]
+        self.assertEqual(sorted(ids), sorted(Skills.objects.values_list('id', flat=True)))
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            KeysetPaginator(Skills.objects.all(), 'category', 3).paginate('not-a-cursor')
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class SkillAutocompleteIndexTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for name in ('JavaScript', 'Node.js', 'C#', 'Python', 'Django'):
+            Skills.objects.create(name=name, category='dev')
+        self.index = SkillAutocompleteIndex()
+
+    def names(self, query):
+        return [skill['name'] for skill in self.index.search(query)]
+
+    def test_prefix_matches_rank_before_infix_matches(self):
+        Skills.objects.create(name='Jython', category='dev')
+        self.index = SkillAutocompleteIndex()
+        self.assertEqual(self.names('jy'), ['Jython'])
+        self.assertEqual(self.names('thon'), ['Jython', 'Python'])
+
+    def test_short_queries_still_match_inside_names(self):
+        self.assertEqual(set(self.names('js')), {'Node.js'})
+        self.assertEqual(self.names('#'), ['C#'])
+
+    def test_skill_added_on_another_worker_is_found_by_existing_ids(self):
+        self.index.search('py')
+        skill = Skills.objects.create(name='Go', category='dev')
+        # Still the old generation, but the id is checked against the database
+        self.assertEqual(self.index.existing_ids([skill.id, 999999]), {skill.id})
+
+    def test_generation_is_bumped_only_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_skill_index()
+            self.assertIsNone(cache.get(SKILLS_GENERATION_KEY))
+        self.assertEqual(cache.get(SKILLS_GENERATION_KEY), 1)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class MatchIndexInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_job_change_is_published_only_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_job_skills_change(7)
+            self.assertIsNone(cache.get(JOB_GENERATION_KEY))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cache.get(JOB_GENERATION_KEY), 1)
+
+    def test_seeker_bits_are_dropped_only_after_commit(self):
+        cache.set(SEEKER_BITS_KEY.format(3), 'bits')
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_seeker_skills(3)
+            self.assertEqual(cache.get(SEEKER_BITS_KEY.format(3)), 'bits')
+        self.assertIsNone(cache.get(SEEKER_BITS_KEY.format(3)))
+
+
+class PublicJobLocationFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        bengaluru, _ = Location.objects.get_or_create(normalized_name='bangalore', defaults={'name': 'Bengaluru'})
+        for alias in ('bangalore', 'bengaluru'):
+            LocationAlias.objects.get_or_create(alias=alias, defaults={'location': bengaluru})
+        provider = create_provider()
+        cls.alias_match = create_job(provider, location='Bangalore, Karnataka')
+        cls.coarser = create_job(provider, location='Bengaluru - Koramangala')
+        cls.unresolved = create_job(provider, location='Bengaluru')
+        JobPost.objects.filter(id=cls.unresolved.id).update(canonical_location=None)
+        cls.elsewhere = create_job(provider, location='Chennai')
+
+    def location_ids(self, location):
+        filters = {
+            'location': location, 'job_type': '', 'employment_type': '', 'domain': '',
+            'salary_min': None, 'salary_max': None,
+        }
+        return set(PublicJobPostListView().filter_jobs(filters).values_list('id', flat=True))
+
+    def test_alias_finds_canonical_and_unresolved_posts(self):
+        self.assertEqual(
+            self.location_ids('Bengaluru'),
+            {self.alias_match.id, self.coarser.id, self.unresolved.id}
+        )
+
+    def test_query_narrower_than_the_canonical_location_falls_back_to_text(self):
+        self.assertEqual(self.location_ids('Koramangala'), {self.coarser.id})
+
+    def test_location_is_resolved_again_only_when_it_changes(self):
+        job = JobPost.objects.get(id=self.alias_match.id)
+        job.title = 'Renamed'
+        with patch('location_app.signals.resolve_location') as resolve:
+            job.save()
+        resolve.assert_not_called()
+
+        job.location = 'Chennai'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual(job.canonical_location, self.elsewhere.canonical_location)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class JobCounterTests(TestCase):
+
+    def setUp(self):
+        self.job = create_job(create_provider())
+        self.seeker = create_seeker()
+
+    def counters(self):
+        return JobPost.objects.values('application_count', 'applied_count', 'reviewing_count').get(id=self.job.id)
+
+    def test_status_change_on_a_deferred_instance_moves_the_counter(self):
+        application = JobApplication.objects.create(jobpost=self.job, job_seeker=self.seeker)
+        deferred = JobApplication.objects.defer('status').get(id=application.id)
+        deferred.status = 'REVIEWING'
+        deferred.save()
+        self.assertEqual(self.counters(), {'application_count': 1, 'applied_count': 0, 'reviewing_count': 1})
+
+        JobApplication.objects.only('id', 'jobpost').get(id=application.id).delete()
+        self.assertEqual(self.counters(), {'application_count': 0, 'applied_count': 0, 'reviewing_count': 0})
+
+    def test_decrement_of_a_drifted_counter_stops_at_zero(self):
+        application = JobApplication.objects.create(jobpost=self.job, job_seeker=self.seeker)
+        JobPost.objects.filter(id=self.job.id).update(application_count=0, applied_count=0)
+        application.delete()
+        self.assertEqual(self.counters(), {'application_count': 0, 'applied_count': 0, 'reviewing_count': 0})
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        JobApplication.objects.create(jobpost=self.job, job_seeker=self.seeker)
+        # self.job was loaded before the application and still holds zeros
+        self.job.title = 'Senior backend developer'
+        self.job.save()
+        self.job.delete()
+        self.assertEqual(self.counters(), {'application_count': 1, 'applied_count': 1, 'reviewing_count': 0})
+        self.assertEqual(
+            JobPost.objects.values_list('title', 'is_deleted').get(id=self.job.id), ('Senior backend developer', True)
+        )
+        self.assertEqual(reconcile_job_counters([self.job.id]), [])
+
+    def test_reconcile_repairs_counters_changed_behind_the_signals(self):
+        JobApplication.objects.create(jobpost=self.job, job_seeker=self.seeker)
+        JobPost.objects.filter(id=self.job.id).update(application_count=0)
+
+        drifted = reconcile_job_counters([self.job.id])
+        self.assertEqual(drifted[0][1]['application_count'], (0, 1))
+        self.assertEqual(self.counters(), {'application_count': 1, 'applied_count': 1, 'reviewing_count': 0})
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Full-text search needs Postgres')
+@override_settings(CACHES=LOCAL_CACHE)
+class JobSearchTests(TestCase):
+
+    def setUp(self):
+        self.provider = create_provider()
+
+    def search(self, text):
+        return list(search_job_posts(JobPost.objects.all(), text))
+
+    def test_title_matches_rank_above_description_matches(self):
+        in_description = create_job(self.provider, title='Backend developer', description='Maintain our Django services')
+        in_title = create_job(self.provider, title='Django developer', description='Build APIs')
+        results = self.search('django')
+        self.assertEqual([job.id for job in results], [in_title.id, in_description.id])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    def test_highlight_marks_the_matched_terms(self):
+        create_job(self.provider, description='Maintain our Django services and their tests')
+        highlight = self.search('django')[0].search_highlight
+        self.assertIn('<mark>Django</mark>', highlight)
+
+    def test_vector_follows_the_post_its_skills_and_its_provider(self):
+        job = create_job(self.provider, title='Gardener')
+        self.assertEqual(self.search('plumber'), [])
+
+        job.title = 'Plumber'
+        job.save()
+        self.assertEqual([result.id for result in self.search('plumber')], [job.id])
+
+        job.skills.add(Skills.objects.create(name='Kubernetes', category='devops'))
+        self.assertEqual([result.id for result in self.search('kubernetes')], [job.id])
+
+        self.provider.company_name = 'Initech'
+        self.provider.save()
+        self.assertEqual([result.id for result in self.search('initech')], [job.id])
@@ -5,6 +5,8 @@ urlpatterns = [
     path('job-posts/', JobPostView.as_view(), name='job-post-list-create'),
     path('job-posts/<int:pk>/', JobPostDetailView.as_view(), name='job-post-detail'),
     path('public/job-posts/', PublicJobPostListView.as_view(), name='public-job-post-list'),
+    path('public/job-posts/facets/', PublicJobPostFacetsView.as_view(), name='public-job-post-facets'),
+    path('public/job-posts/salary-histogram/', PublicJobPostSalaryHistogramView.as_view(), name='public-job-post-salary-histogram'),
     path('skills/search/', SkillSearchView.as_view(), name='skill-search'),
     path("public/jobs/<int:job_id>/", PublicJobPostDetailView.as_view(), name="public-job-post-detail"),
     path('jobseeker/skills/', JobSeekerSkillsView.as_view(), name='jobseeker-skills'),
@@ -24,6 +26,7 @@ urlpatterns = [
     path('job-posts-list/<int:pk>/', JobPostDetailForApplicantsView.as_view(), name='job-post-detail-list'),
     path('job-posts-list/<int:pk>/applicants/', JobPostApplicantsView.as_view(), name='job-post-applicants'),
     path('applications/<int:pk>/', JobApplicationStatusUpdateView.as_view(), name='application-status-update'),
+    path('applications/bulk-status/', BulkApplicationStatusUpdateView.as_view(), name='application-bulk-status-update'),
 
     #job seeker applications
     path('job-seeker/applications/', JobSeekerApplicationsView.as_view(), name='job-seeker-applications'),
@@ -8,6 +8,7 @@ from profile_app.permissions import IsJobProvier
 from .models import JobPost, Skills, JobApplication, SavedJob
 from .serializer import *
 from django.db.models import Q
+from django.db import IntegrityError, transaction
 from rest_framework.pagination import PageNumberPagination
 from django.utils import timezone
 from auth_app.models import JobSeeker
@@ -16,11 +17,23 @@ from django.shortcuts import get_object_or_404
 from django.core.paginator import Paginator,EmptyPage
 import logging
 import bleach
-from django.core.mail import send_mail
+from notification_app.email import queue_email, queue_emails
 from notification_app.utils import send_notification
 from notification_app.models import Notification
 from notification_app.utils import *
 from notification_app.utils import send_job_applied_notification
+from .search import search_job_posts, match_job_posts
+from .facets import (
+    get_cached_facets, get_cached_salary_histogram,
+    SALARY_HISTOGRAM_FIELDS, DEFAULT_SALARY_BUCKET_WIDTH, MIN_SALARY_BUCKET_WIDTH,
+)
+from .matching import score_applicants_for_job
+from .caching import get_cached_job_detail, cache_job_detail
+from .autocomplete import skill_index
+from .counters import record_bulk_status_change
+from location_app.utils import matching_location_ids
+from django.utils.http import parse_etags
+from backend.pagination import KeysetPaginator, InvalidCursor, is_cursor_request, wants_total
 logger = logging.getLogger(__name__)
 
 
@@ -155,9 +168,11 @@ class JobPostView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Validate sort parameter
-            sort = request.query_params.get('sort', '-created_at')
-            if sort not in self.VALID_SORTS:
+            # Validate sort parameter; searches default to relevance order
+            sort = request.query_params.get('sort')
+            if sort is None and not search:
+                sort = '-created_at'
+            if sort is not None and sort not in self.VALID_SORTS:
                 return Response(
                     {'error': f"Invalid sort parameter. Must be one of {self.VALID_SORTS}"},
                     status=status.HTTP_400_BAD_REQUEST
@@ -179,16 +194,31 @@ class JobPostView(APIView):
                 **filter_params
             )
             
-            # Apply search filter if provided
+            # Apply full-text search if provided (ranked by relevance)
             if search:
-                job_posts = job_posts.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(location__icontains=search)
-                )
+                job_posts = search_job_posts(job_posts, search)
             
             # Apply sort
-            job_posts = job_posts.order_by(sort)
+            if sort:
+                job_posts = job_posts.order_by(sort)
+            
+            serializer_class = JobPostSearchSerializer if search else JobPostSerializer
+            
+            # Cursor pagination: seek on (sort key, id) with no COUNT(*) or OFFSET
+            if is_cursor_request(request):
+                keyset = KeysetPaginator(job_posts, sort or '-search_rank', page_size)
+                try:
+                    items, next_cursor, previous_cursor = keyset.paginate(request.query_params.get('cursor'))
+                except InvalidCursor:
+                    return Response(
+                        {'error': 'Invalid cursor'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                serializer = serializer_class(items, many=True)
+                return Response(
+                    keyset.get_response_data(serializer.data, next_cursor, previous_cursor, include_total=wants_total(request)),
+                    status=status.HTTP_200_OK
+                )
             
             # Pagination
             paginator = Paginator(job_posts, page_size)
@@ -201,7 +231,7 @@ class JobPostView(APIView):
                 )
             
             # Serialize and return response
-            serializer = JobPostSerializer(paginated_jobs, many=True)
+            serializer = serializer_class(paginated_jobs, many=True)
             return Response({
                 'results': serializer.data,
                 'next': None if not paginated_jobs.has_next() else page + 1,
@@ -495,71 +525,143 @@ class PublicJobPostListView(APIView):
             cleaned_text = cleaned_text[:max_length]
         return cleaned_text
 
-    def get(self, request):
+    def get_cursor_page(self, request, jobs, ordering, serializer_class):
+        """Keyset-paginate jobs for infinite-scroll clients"""
+        page_size = self.pagination_class().get_page_size(request)
+        keyset = KeysetPaginator(jobs, ordering, page_size)
         try:
-            # Sanitize search parameter
-            search = self.sanitize_text(request.query_params.get("search", ""), max_length=100)
-            
-            # Sanitize location parameter
-            location = self.sanitize_text(request.query_params.get("location", ""), max_length=255)
-            
-            # Validate job_type parameter
-            job_type = request.query_params.get("job_type", "").upper()
-            if job_type and job_type not in self.VALID_JOB_TYPES:
-                return Response(
-                    {'error': f"Invalid job_type. Must be one of {self.VALID_JOB_TYPES}"},
+            items, next_cursor, previous_cursor = keyset.paginate(request.query_params.get("cursor"))
+        except InvalidCursor:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = serializer_class(items, many=True)
+        return Response(
+            keyset.get_response_data(serializer.data, next_cursor, previous_cursor, include_total=wants_total(request)),
+            status=status.HTTP_200_OK
+        )
+
+    def parse_filters(self, request):
+        """
+        Validate and normalize the public job search parameters.
+
+        Returns a (filters, error_response) tuple; error_response is None
+        when every parameter is valid.
+        """
+        filters = {
+            # Sanitize free-text parameters
+            "search": self.sanitize_text(request.query_params.get("search", ""), max_length=100),
+            "location": self.sanitize_text(request.query_params.get("location", ""), max_length=255),
+            "job_type": request.query_params.get("job_type", "").upper(),
+            "employment_type": request.query_params.get("employment_type", "").upper(),
+            "domain": request.query_params.get("domain", "").upper(),
+        }
+        
+        # Salary range: salary_min keeps jobs paying at least that much,
+        # salary_max keeps jobs whose range starts at or below it
+        for name in ("salary_min", "salary_max"):
+            value = request.query_params.get(name)
+            if value in (None, ""):
+                filters[name] = None
+                continue
+            try:
+                filters[name] = int(value)
+            except (TypeError, ValueError):
+                filters[name] = -1
+            if filters[name] < 0:
+                return None, Response(
+                    {'error': f"{name} must be a non-negative number"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            # Validate employment_type parameter
-            employment_type = request.query_params.get("employment_type", "").upper()
-            if employment_type and employment_type not in self.VALID_EMPLOYMENT_TYPES:
-                return Response(
-                    {'error': f"Invalid employment_type. Must be one of {self.VALID_EMPLOYMENT_TYPES}"},
+        if (filters["salary_min"] is not None and filters["salary_max"] is not None
+                and filters["salary_min"] > filters["salary_max"]):
+            return None, Response(
+                {'error': 'salary_max must be greater than or equal to salary_min'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Validate choice parameters against hard-coded values
+        choice_params = [
+            ("job_type", self.VALID_JOB_TYPES),
+            ("employment_type", self.VALID_EMPLOYMENT_TYPES),
+            ("domain", self.VALID_DOMAINS),
+        ]
+        for name, valid_values in choice_params:
+            if filters[name] and filters[name] not in valid_values:
+                return None, Response(
+                    {'error': f"Invalid {name}. Must be one of {valid_values}"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+        
+        return filters, None
+
+    def filter_jobs(self, filters):
+        """Open public jobs matching every filter except the full-text search"""
+        # Base query - only published, non-deleted jobs with future deadline
+        jobs = JobPost.objects.filter(
+            status="PUBLISHED",
+            is_deleted=False,
+            application_deadline__gte=timezone.now(),
+        )
+        
+        if filters["location"]:
+            # Resolve through the canonical location table (exact or prefix
+            # on any alias) so "Bangalore" also finds "Bengaluru" posts. The
+            # free-text match stays for posts that never resolved and for
+            # posts whose canonical location is coarser than the query
+            # ("Bengaluru - Koramangala" when searching "Koramangala")
+            location_filter = Q(location__icontains=filters["location"])
+            location_ids = matching_location_ids(filters["location"])
+            if location_ids:
+                location_filter |= Q(canonical_location_id__in=location_ids)
+            jobs = jobs.filter(location_filter)
+        
+        # Apply validated choice filters
+        if filters["job_type"]:
+            jobs = jobs.filter(job_type=filters["job_type"])
             
-            # Validate domain parameter
-            domain = request.query_params.get("domain", "").upper()
-            if domain and domain not in self.VALID_DOMAINS:
-                return Response(
-                    {'error': f"Invalid domain. Must be one of {self.VALID_DOMAINS}"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        if filters["employment_type"]:
+            jobs = jobs.filter(employment_type=filters["employment_type"])
             
-            # Base query - only published, non-deleted jobs with future deadline
-            jobs = JobPost.objects.filter(
-                status="PUBLISHED",
-                is_deleted=False,
-                application_deadline__gte=timezone.now(),
-            )
+        if filters["domain"]:
+            jobs = jobs.filter(domain=filters["domain"])
+        
+        # Served by the partial (max_salary, min_salary) index on live posts
+        if filters.get("salary_min") is not None:
+            jobs = jobs.filter(max_salary__gte=filters["salary_min"])
+        
+        if filters.get("salary_max") is not None:
+            jobs = jobs.filter(min_salary__lte=filters["salary_max"])
+        
+        return jobs
+
+    def get(self, request):
+        try:
+            filters, error_response = self.parse_filters(request)
+            if error_response:
+                return error_response
+            
+            search = filters["search"]
+            jobs = self.filter_jobs(filters)
             
-            # Apply text-based filters
+            # Apply full-text search last so results are ranked by relevance
             if search:
-                jobs = jobs.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(job_provider__company_name__icontains=search)
-                )
-                
-            if location:
-                jobs = jobs.filter(location__icontains=location)
+                jobs = search_job_posts(jobs, search)
+                serializer_class = PublicJobPostSearchSerializer
+            else:
+                jobs = jobs.order_by("-created_at")
+                serializer_class = PublicJobPostSerializer
             
-            # Apply validated choice filters
-            if job_type:
-                jobs = jobs.filter(job_type=job_type)
-                
-            if employment_type:
-                jobs = jobs.filter(employment_type=employment_type)
-                
-            if domain:
-                jobs = jobs.filter(domain=domain)
+            if is_cursor_request(request):
+                ordering = "-search_rank" if search else "-created_at"
+                return self.get_cursor_page(request, jobs, ordering, serializer_class)
             
             try:
                 # Apply pagination and return results
                 paginator = self.pagination_class()
-                page = paginator.paginate_queryset(jobs.order_by("-created_at"), request)
-                serializer = PublicJobPostSerializer(page, many=True)
+                page = paginator.paginate_queryset(jobs, request)
+                serializer = serializer_class(page, many=True)
                 return paginator.get_paginated_response(serializer.data)
             except Exception as pagination_error:
                 logger.error(f"Pagination error: {str(pagination_error)}")
@@ -574,17 +676,103 @@ class PublicJobPostListView(APIView):
                 {'error': 'Server error occurred'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+class PublicJobPostFacetsView(PublicJobPostListView):
+    """Facet counts for the public job board under the active filter set"""
+
+    def get(self, request):
+        try:
+            filters, error_response = self.parse_filters(request)
+            if error_response:
+                return error_response
+            
+            jobs = self.filter_jobs(filters)
+            if filters["search"]:
+                jobs = match_job_posts(jobs, filters["search"])
+            
+            facets = get_cached_facets(jobs, filters)
+            return Response(facets, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in PublicJobPostFacetsView.get: {str(e)}", exc_info=True)
+            return Response(
+                {'error': 'Server error occurred'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+class PublicJobPostSalaryHistogramView(PublicJobPostListView):
+    """
+    Salary distribution of the public job board under the active filter set.
+
+    The salary range filters themselves are ignored so a slider always
+    shows the full distribution it is selecting from.
+    """
+
+    def get(self, request):
+        try:
+            filters, error_response = self.parse_filters(request)
+            if error_response:
+                return error_response
+            filters["salary_min"] = filters["salary_max"] = None
+            
+            field = request.query_params.get("field", "max_salary")
+            if field not in SALARY_HISTOGRAM_FIELDS:
+                return Response(
+                    {'error': f"Invalid field. Must be one of {list(SALARY_HISTOGRAM_FIELDS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                bucket_width = int(request.query_params.get("bucket_width", DEFAULT_SALARY_BUCKET_WIDTH))
+            except (TypeError, ValueError):
+                bucket_width = 0
+            if bucket_width < MIN_SALARY_BUCKET_WIDTH:
+                return Response(
+                    {'error': f"bucket_width must be a number of at least {MIN_SALARY_BUCKET_WIDTH}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            jobs = self.filter_jobs(filters)
+            if filters["search"]:
+                jobs = match_job_posts(jobs, filters["search"])
+            
+            histogram = get_cached_salary_histogram(jobs, filters, bucket_width, field)
+            return Response(histogram, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in PublicJobPostSalaryHistogramView.get: {str(e)}", exc_info=True)
+            return Response(
+                {'error': 'Server error occurred'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class PublicJobPostDetailView(APIView):
+    def not_modified(self, request, etag):
+        if_none_match = request.headers.get("If-None-Match")
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == "*" or etag in parse_etags(if_none_match)
+
     def get(self, request, job_id):
         try:
-            job = JobPost.objects.get(
-                id=job_id,
-                status="PUBLISHED",
-                is_deleted=False,
-                application_deadline__gte=timezone.now(),
-            )
-            serializer = PublicJobPostSerializer(job)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Served from the rendered-response cache until the job, its
+            # questions, skills or provider change (see jobpost_app.signals)
+            cached = get_cached_job_detail(job_id)
+            if cached is None:
+                job = JobPost.objects.select_related("job_provider").prefetch_related(
+                    "skills", "questions"
+                ).get(
+                    id=job_id,
+                    status="PUBLISHED",
+                    is_deleted=False,
+                    application_deadline__gte=timezone.now(),
+                )
+                data = PublicJobPostSerializer(job).data
+                etag = cache_job_detail(job, data)
+            else:
+                data, etag = cached
+            
+            if self.not_modified(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            return Response(data, status=status.HTTP_200_OK, headers={"ETag": etag})
         except JobPost.DoesNotExist:
             return Response(
                 {"error": "Job not found or not available."},
@@ -596,10 +784,8 @@ class SkillSearchView(APIView):
 
     def get(self, request):
         query = request.query_params.get("query", "")
-        skills = Skills.objects.filter(name__icontains=query)[:10]
-        serializer = SkillSerializer(skills, many=True)
-        print(serializer.data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        skills = skill_index.search(query)
+        return Response(skills, status=status.HTTP_200_OK)
     
 class JobSeekerSkillsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -672,135 +858,132 @@ class ApplyForJobView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            job_seeker = JobSeeker.objects.get(user=request.user)
+            job_seeker = JobSeeker.objects.select_related('user').get(user=request.user)
             job_id = request.data.get('jobpost_id')
             answers = request.data.get('answers', [])
+            # Clients send the same key when retrying, a replay returns the
+            # original application instead of tripping the unique constraint
+            idempotency_key = request.headers.get('Idempotency-Key') or request.data.get('idempotency_key')
             
             if not job_id:
                 return Response(
                     {"error": "jobpost_id is required."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            if idempotency_key and len(str(idempotency_key)) > 64:
+                return Response(
+                    {"error": "Idempotency key must be at most 64 characters."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not isinstance(answers, list):
+                return Response(
+                    {"error": "answers must be a list."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             try:
-                job = JobPost.objects.get(
+                job = JobPost.objects.select_related('job_provider__user').get(
                     id=job_id,
                     status="PUBLISHED",
                     is_deleted=False,
                     application_deadline__gte=timezone.now(),
                 )
-            except JobPost.DoesNotExist:
+            except (JobPost.DoesNotExist, ValueError, TypeError):
                 return Response(
                     {"error": "Job not found or not available for application."},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            if JobApplication.objects.filter(jobpost=job, job_seeker=job_seeker).exists():
-                return Response(
-                    {"error": "You have already applied for this job."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Check for job questions
-            job_questions = JobQuestion.objects.filter(job_post=job)
-            
-            # If there are questions, validate that all are answered
-            if job_questions.exists():
-                question_ids = set(q.id for q in job_questions)
-                answered_question_ids = set(a.get('question_id') for a in answers if a.get('question_id'))
+            # Validate every answer in memory against the job's questions
+            questions = {question.id: question for question in JobQuestion.objects.filter(job_post=job)}
+            answer_rows = []
+            for answer_data in answers:
+                if not isinstance(answer_data, dict):
+                    return Response(
+                        {"error": "Each answer must be an object."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                question_id = answer_data.get('question_id')
+                answer_text = answer_data.get('answer_text', '')
+                try:
+                    question = questions.get(int(question_id))
+                except (TypeError, ValueError):
+                    question = None
+                if question is None:
+                    return Response(
+                        {"error": f"Invalid question ID: {question_id}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
                 
-                if question_ids != answered_question_ids:
-                    missing_questions = question_ids - answered_question_ids
+                # For YES_NO questions, validate the answer
+                if question.question_type == 'YES_NO' and answer_text not in ['Yes', 'No']:
                     return Response(
-                        {"error": f"All job questions must be answered. Missing {len(missing_questions)} required question(s)."},
+                        {"error": f"Question '{question.question_text}' requires a Yes or No answer."},
                         status=status.HTTP_400_BAD_REQUEST
                     )
+                answer_rows.append((question, answer_text))
             
-            # Create the application
-            application = JobApplication.objects.create(
-                jobpost=job,
-                job_seeker=job_seeker,
-                status="APPLIED"
-            )
+            answered_question_ids = [question.id for question, _ in answer_rows]
+            if len(answered_question_ids) != len(set(answered_question_ids)):
+                return Response(
+                    {"error": "Each job question can only be answered once."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            missing_questions = set(questions) - set(answered_question_ids)
+            if missing_questions:
+                return Response(
+                    {"error": f"All job questions must be answered. Missing {len(missing_questions)} required question(s)."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            # Save the answers if there are any questions
-            if job_questions.exists():
-                for answer_data in answers:
-                    question_id = answer_data.get('question_id')
-                    answer_text = answer_data.get('answer_text', '')
-                    
-                    try:
-                        question = JobQuestion.objects.get(id=question_id, job_post=job)
-                        
-                        # For YES_NO questions, validate the answer
-                        if question.question_type == 'YES_NO' and answer_text not in ['Yes', 'No']:
-                            return Response(
-                                {"error": f"Question '{question.question_text}' requires a Yes or No answer."},
-                                status=status.HTTP_400_BAD_REQUEST
-                            )
-                        
-                        # Create the answer record
-                        JobQuestionAnswer.objects.create(
-                            question=question,
-                            application=application,
-                            answer_text=answer_text
-                        )
-                    except JobQuestion.DoesNotExist:
-                        return Response(
-                            {"error": f"Invalid question ID: {question_id}"},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
+            # Application and answers are written together or not at all
+            try:
+                with transaction.atomic():
+                    application = JobApplication.objects.create(
+                        jobpost=job,
+                        job_seeker=job_seeker,
+                        status="APPLIED",
+                        idempotency_key=idempotency_key or None
+                    )
+                    JobQuestionAnswer.objects.bulk_create([
+                        JobQuestionAnswer(question=question, application=application, answer_text=answer_text)
+                        for question, answer_text in answer_rows
+                    ])
+            except IntegrityError:
+                existing = JobApplication.objects.filter(jobpost=job, job_seeker=job_seeker).first()
+                if existing is not None and idempotency_key and existing.idempotency_key == idempotency_key:
+                    response_data = JobApplicationSerializer(existing).data
+                    response_data["message"] = "Application already submitted."
+                    return Response(response_data, status=status.HTTP_200_OK)
+                return Response(
+                    {"error": "You have already applied for this job."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             # Send notification to job provider
             send_job_applied_notification(application)
             
             try:
-                job_provider = job.job_provider
-                company_name = job_provider.company_name
-                
-                send_mail(
-                    subject=f'Application Submitted: {job.title}',
-                    message=f'''
-Congratulations! Your application for the position of "{job.title}" at {company_name} has been successfully submitted.
-
-Job Details:
-- Position: {job.title}
-- Company: {company_name}
-- Location: {job.location}
-- Salary Range: {job.min_salary} - {job.max_salary} 
-
-You can track the status of your application on your Seekerspot dashboard. We wish you the best of luck with your application!
-
-Regards,
-The Seekerspot Team
-                    ''',
-                    from_email=None,
-                    recipient_list=[request.user.email],
-                    fail_silently=True, 
-                )
+                queue_email('application_submitted', request.user.email, {
+                    'job_title': job.title,
+                    'company_name': job.job_provider.company_name,
+                    'location': job.location,
+                    'min_salary': job.min_salary,
+                    'max_salary': job.max_salary,
+                })
             except Exception as e:
-                print(f"Failed to send application confirmation email: {str(e)}")
+                logger.error(f"Failed to queue application confirmation email: {str(e)}")
             
             serializer = JobApplicationSerializer(application)
             
-            # Get user skills and job skills for informational purposes
-            user_skill_ids = set(js_skill.skill.id for js_skill in JobSeekerSkill.objects.filter(job_seeker=job_seeker))
-            job_skill_ids = set(skill.id for skill in job.skills.all())
-            
-            # Calculate matching skills percentage
-            total_job_skills = len(job_skill_ids)
-            matching_skills = len(user_skill_ids.intersection(job_skill_ids))
-            match_percentage = (matching_skills / total_job_skills * 100) if total_job_skills > 0 else 0
+            # Skill match for informational purposes
+            skill_match = score_applicants_for_job(job.id, [job_seeker.id])[job_seeker.id]
             
             # Include this info in the response
             response_data = serializer.data
             response_data.update({
                 "message": "Successfully applied for the job!",
-                "skill_match": {
-                    "matching_skills": matching_skills,
-                    "total_skills": total_job_skills,
-                    "match_percentage": round(match_percentage, 1)
-                }
+                "skill_match": skill_match
             })
             
             return Response(response_data, status=status.HTTP_201_CREATED)
@@ -939,7 +1122,7 @@ class JobPostListView(APIView):
             job_posts = JobPost.objects.filter(
                 job_provider=job_provider,
                 is_deleted=False
-            ).order_by('-created_at')
+            ).select_related('job_provider').order_by('-created_at')
             
             serializer = JobPostListSerializer(job_posts, many=True)
             return Response(serializer.data)
@@ -978,8 +1161,14 @@ class JobPostDetailForApplicantsView(APIView):
 
 
 
+class JobPostApplicantsPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 class JobPostApplicantsView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = JobPostApplicantsPagination
     
     def get(self, request, pk):
         try:
@@ -992,14 +1181,46 @@ class JobPostApplicantsView(APIView):
                 is_deleted=False
             )
             
-            # Simple query without problematic prefetch_related
-            applications = JobApplication.objects.filter(jobpost=job_post).select_related(
-                'job_seeker__user'
-            ).prefetch_related(
-                'question_answers__question'
+            applications = JobApplication.objects.filter(jobpost=job_post)
+            
+            # Optional status filter, e.g. ?status=APPLIED,REVIEWING
+            status_param = request.query_params.get('status', '')
+            if status_param:
+                statuses = [value.strip().upper() for value in status_param.split(',') if value.strip()]
+                valid_statuses = [status_choice[0] for status_choice in JobApplication.STATUS_CHOICES]
+                invalid = [value for value in statuses if value not in valid_statuses]
+                if invalid:
+                    return Response(
+                        {"error": f"Invalid status value. Must be one of: {', '.join(valid_statuses)}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                applications = applications.filter(status__in=statuses)
+            
+            applications = JobApplicationDetailSerializer.setup_eager_loading(
+                applications.order_by('-applied_at', '-id')
             )
             
-            serializer = JobApplicationDetailSerializer(applications, many=True)
+            # Pagination is opt-in so existing clients keep receiving a plain list
+            paginator = None
+            if 'page' in request.query_params or 'page_size' in request.query_params:
+                paginator = self.pagination_class()
+                applications = paginator.paginate_queryset(applications, request, view=self)
+            else:
+                applications = list(applications)
+            
+            # Score every applicant on the page against the job in one pass
+            skill_matches = score_applicants_for_job(
+                job_post.id,
+                [application.job_seeker_id for application in applications]
+            )
+            
+            serializer = JobApplicationDetailSerializer(
+                applications,
+                many=True,
+                context={'skill_matches': skill_matches}
+            )
+            if paginator is not None:
+                return paginator.get_paginated_response(serializer.data)
             return Response(serializer.data)
         
         except JobProvider.DoesNotExist:
@@ -1063,58 +1284,149 @@ class JobApplicationStatusUpdateView(APIView):
             )
     
     def send_shortlisted_email(self, application):
-        """Send email notification when application is shortlisted"""
-        job_seeker_name = application.job_seeker.user.get_full_name() or application.job_seeker.user.username
-        job_seeker_email = application.job_seeker.user.email
-        job_title = application.jobpost.title
-        company_name = application.jobpost.job_provider.company_name
-        
-        send_mail(
-            subject=f'Application Shortlisted: {job_title} at {company_name}',
-            message=f'''Dear {job_seeker_name},
+        """Queue the email sent when an application is shortlisted"""
+        queue_email(
+            'application_shortlisted',
+            application.job_seeker.user.email,
+            application_email_context(application)
+        )
+    
+    def send_hired_email(self, application):
+        """Queue the congratulations email sent when an application is hired"""
+        queue_email(
+            'application_hired',
+            application.job_seeker.user.email,
+            application_email_context(application)
+        )
 
-We are pleased to inform you that your application for the position of "{job_title}" at {company_name} has been shortlisted!
 
-Your application has impressed our hiring team, and you have moved to the next stage of our selection process. We will be in touch soon with further details about the next steps.
+# Statuses that get a dedicated email instead of the generic notification
+STATUS_EMAIL_TEMPLATES = {
+    'SHORTLISTED': 'application_shortlisted',
+    'HIRED': 'application_hired',
+}
 
-We appreciate your interest in joining our team and look forward to the possibility of working with you.
 
-Best regards,
-{company_name} Hiring Team
-via Seekerspot
-            ''',
-            from_email=None,
-            recipient_list=[job_seeker_email],
-            fail_silently=True,
-        )
-    
-    def send_hired_email(self, application):
-        """Send congratulations email when application is hired"""
-        job_seeker_name = application.job_seeker.user.get_full_name() or application.job_seeker.user.username
-        job_seeker_email = application.job_seeker.user.email
-        job_title = application.jobpost.title
-        company_name = application.jobpost.job_provider.company_name
-        
-        send_mail(
-            subject=f'Congratulations! Job Offer: {job_title} at {company_name}',
-            message=f'''Dear {job_seeker_name},
+def application_email_context(application):
+    user = application.job_seeker.user
+    return {
+        'job_seeker_name': user.get_full_name() or user.username,
+        'job_title': application.jobpost.title,
+        'company_name': application.jobpost.job_provider.company_name,
+    }
 
-Congratulations! We are thrilled to inform you that you have been selected for the position of "{job_title}" at {company_name}.
 
-Your skills, experience, and enthusiasm have impressed our team, and we are excited to welcome you aboard. Our HR team will be contacting you soon with the formal offer letter and onboarding details.
+class BulkApplicationStatusUpdateView(APIView):
+    """
+    Move many applications to one status in a single request.
 
-We look forward to having you as part of our team and are confident that you will make valuable contributions to our organization.
+    Ownership is checked with one query, the change is one UPDATE and the
+    resulting notifications and emails are fanned out as one batch.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_APPLICATIONS = 500
+
+    def post(self, request):
+        try:
+            job_provider = JobProvider.objects.get(user=request.user)
+        except JobProvider.DoesNotExist:
+            return Response(
+                {"error": "Job provider profile not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        status_value = request.data.get('status')
+        valid_statuses = [status_choice[0] for status_choice in JobApplication.STATUS_CHOICES]
+        if status_value not in valid_statuses:
+            return Response(
+                {"error": f"Invalid status value. Must be one of: {', '.join(valid_statuses)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        application_ids = request.data.get('application_ids')
+        if not isinstance(application_ids, list) or not application_ids:
+            return Response(
+                {"error": "application_ids must be a non-empty list."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(application_ids) > self.MAX_APPLICATIONS:
+            return Response(
+                {"error": f"At most {self.MAX_APPLICATIONS} applications can be updated at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            application_ids = list(dict.fromkeys(int(application_id) for application_id in application_ids))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "application_ids must contain integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            with transaction.atomic():
+                applications = {
+                    application.id: application
+                    for application in JobApplication.objects.select_for_update(of=('self',)).select_related(
+                        'jobpost__job_provider', 'job_seeker__user'
+                    ).filter(id__in=application_ids)
+                }
+                
+                results = {}
+                changed = []
+                for application_id in application_ids:
+                    application = applications.get(application_id)
+                    if application is None:
+                        results[application_id] = 'not_found'
+                    elif application.jobpost.job_provider_id != job_provider.id:
+                        results[application_id] = 'forbidden'
+                    elif application.status == status_value:
+                        results[application_id] = 'unchanged'
+                    else:
+                        results[application_id] = 'updated'
+                        changed.append(application)
+                
+                if changed:
+                    JobApplication.objects.filter(id__in=[application.id for application in changed]).update(
+                        status=status_value,
+                        updated_at=timezone.now()
+                    )
+                    # The UPDATE bypasses the model signals, keep the job counters in step here
+                    previous_statuses = {}
+                    for application in changed:
+                        previous_statuses.setdefault(application.jobpost_id, []).append(application.status)
+                        application.status = status_value
+                        application._counted_status = status_value
+                    for job_post_id, old_statuses in previous_statuses.items():
+                        record_bulk_status_change(job_post_id, old_statuses, status_value)
+            
+            if changed:
+                email_template = STATUS_EMAIL_TEMPLATES.get(status_value)
+                if email_template:
+                    queue_emails(
+                        (email_template, application.job_seeker.user.email, application_email_context(application))
+                        for application in changed
+                    )
+                else:
+                    send_application_status_notifications(changed)
+            
+            logger.info(f"Job provider {job_provider.id} moved {len(changed)} applications to {status_value}")
+            return Response({
+                "status": status_value,
+                "updated_count": len(changed),
+                "results": [
+                    {"id": application_id, "result": result}
+                    for application_id, result in results.items()
+                ],
+            }, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in BulkApplicationStatusUpdateView.post: {str(e)}", exc_info=True)
+            return Response(
+                {'error': 'Server error occurred'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
-Once again, congratulations on this achievement!
 
-Warm regards,
-{company_name} Hiring Team
-via Seekerspot
-            ''',
-            from_email=None,
-            recipient_list=[job_seeker_email],
-            fail_silently=True,
-        )
 class JobSeekerApplicationsView(APIView):
     permission_classes = [IsAuthenticated]
 
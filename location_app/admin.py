@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+from location_app.models import Location, LocationAlias
+
+# Register your models here.
+admin.site.register([Location, LocationAlias])
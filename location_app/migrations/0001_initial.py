@@ -0,0 +1,66 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Well-known alternate spellings, keyed by canonical name; the seed lives
+# only here, later spellings are added as they are seen
+KNOWN_ALIASES = {
+    'Bengaluru': ['bangalore', 'bengaluru', 'blr'],
+    'Mumbai': ['mumbai', 'bombay'],
+    'Chennai': ['chennai', 'madras'],
+    'Kolkata': ['kolkata', 'calcutta'],
+    'New Delhi': ['new delhi', 'delhi', 'ncr', 'delhi ncr'],
+    'Gurugram': ['gurugram', 'gurgaon'],
+    'Pune': ['pune', 'poona'],
+    'Kochi': ['kochi', 'cochin', 'ernakulam'],
+    'Thiruvananthapuram': ['thiruvananthapuram', 'trivandrum', 'tvm'],
+    'Kozhikode': ['kozhikode', 'calicut'],
+    'Mysuru': ['mysuru', 'mysore'],
+    'Hyderabad': ['hyderabad', 'hyd'],
+    'Remote': ['remote', 'work from home', 'wfh', 'anywhere'],
+}
+
+
+def seed_known_locations(apps, schema_editor):
+    Location = apps.get_model('location_app', 'Location')
+    LocationAlias = apps.get_model('location_app', 'LocationAlias')
+    for name, aliases in KNOWN_ALIASES.items():
+        location, _ = Location.objects.get_or_create(normalized_name=aliases[0], defaults={'name': name})
+        for alias in aliases:
+            LocationAlias.objects.get_or_create(alias=alias, defaults={'location': location})
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['normalized_name'], name='location_prefix_idx', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+        migrations.CreateModel(
+            name='LocationAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=255, unique=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='location_app.location')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['alias'], name='location_alias_prefix_idx', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+        migrations.RunPython(seed_known_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class Location(models.Model):
+    """Canonical location that free-text job and provider locations resolve to"""
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Supports LIKE 'prefix%' lookups regardless of database collation
+            models.Index(fields=['normalized_name'], name='location_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class LocationAlias(models.Model):
+    """Normalized spelling that maps to a canonical location ("bangalore" -> Bengaluru)"""
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='aliases')
+    alias = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['alias'], name='location_alias_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.alias} -> {self.location.name}"
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_init, pre_save
+from django.dispatch import receiver
+from auth_app.models import JobProvider
+from jobpost_app.models import JobPost
+from .utils import resolve_location
+
+
+@receiver(post_init, sender=JobPost)
+@receiver(post_init, sender=JobProvider)
+def remember_resolved_location(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred location is not loaded
+    instance._resolved_location = instance.__dict__.get('location')
+
+
+@receiver(pre_save, sender=JobPost)
+@receiver(pre_save, sender=JobProvider)
+def assign_canonical_location(sender, instance, raw=False, **kwargs):
+    """Resolve the free-text location to its canonical row when it is set or changed"""
+    if raw:
+        return
+    if not instance._state.adding and instance.location == instance._resolved_location:
+        return
+    location = resolve_location(instance.location)
+    instance.canonical_location_id = location.id if location else None
+    instance._resolved_location = instance.location
@@ -0,0 +1,59 @@
+import re
+import unicodedata
+from django.db import IntegrityError, transaction
+
+from .models import Location, LocationAlias
+
+
+def normalize_location(text):
+    """
+    Reduce a free-text location to its lookup key.
+
+    Only the most specific part is kept, so "Bangalore, Karnataka, India"
+    and " bangalore " both become "bangalore".
+    """
+    if not text:
+        return ''
+    primary = str(text).split(',')[0]
+    primary = unicodedata.normalize('NFKD', primary).encode('ascii', 'ignore').decode('ascii')
+    primary = re.sub(r'[^\w\s-]', ' ', primary.lower())
+    return re.sub(r'\s+', ' ', primary).strip()
+
+
+def resolve_location(text):
+    """
+    Return the canonical Location for a free-text location, creating it
+    (and its alias) the first time an unknown spelling is seen.
+    """
+    key = normalize_location(text)
+    if not key:
+        return None
+
+    alias = LocationAlias.objects.select_related('location').filter(alias=key).first()
+    if alias:
+        return alias.location
+
+    try:
+        with transaction.atomic():
+            location, _ = Location.objects.get_or_create(
+                normalized_name=key,
+                defaults={'name': str(text).split(',')[0].strip()[:255]}
+            )
+            LocationAlias.objects.get_or_create(alias=key, defaults={'location': location})
+    except IntegrityError:
+        # Another request registered the same spelling concurrently
+        return LocationAlias.objects.select_related('location').get(alias=key).location
+    return location
+
+
+def matching_location_ids(query):
+    """
+    Ids of canonical locations whose name or any alias equals or starts
+    with the query, served from the prefix indexes.
+    """
+    key = normalize_location(query)
+    if not key:
+        return []
+    return list(
+        LocationAlias.objects.filter(alias__startswith=key).values_list('location_id', flat=True).distinct()
+    )
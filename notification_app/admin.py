@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import EmailOutbox
 
-# Register your models here.
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('template', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'template')
+    search_fields = ('recipient',)
@@ -1,13 +1,41 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from auth_app.models import User
 from .models import Notification
+from .retention import recent_notifications
+from .sync import decode_sync_cursor, get_notification_delta, issue_sync_cursor, record_notification_changes
+from .unread import reset_unread_count
+from .utils import mark_notifications_read, parse_notification_ids
+from backend.pagination import InvalidCursor
+from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+UNREAD_ON_CONNECT = 20
+RESUME_BATCH_SIZE = 50
+# Past this a resuming client is told to reload the list over REST instead
+MAX_RESUMED_NOTIFICATIONS = 500
+# Read receipts arriving within this many seconds are written together
+READ_RECEIPT_DEBOUNCE = 0.25
+
+def notification_data(notification):
+    return {
+        'id': str(notification.id),
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'created_at': notification.created_at.isoformat(),
+        'source_id': notification.source_id,
+        'source_type': notification.source_type,
+        'is_read': notification.is_read,
+        'count': notification.count
+    }
+
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"]
@@ -31,24 +59,56 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         logger.info(f"User {self.user.id} connected to notification websocket")
         await self.accept()
         
+        # A client that saw notifications before resumes from its cursor:
+        # ws/notifications/?cursor=<sync_cursor from the last frame it processed>
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        cursor = query.get('cursor', [None])[0]
+        if cursor:
+            try:
+                since = decode_sync_cursor(cursor)
+            except InvalidCursor:
+                logger.warning(f"User {self.user.id} sent an invalid resume cursor")
+            else:
+                await self.resume(since)
+                return
+        
         # Send unread notifications on connect
-        unread_notifications = await self.get_unread_notifications()
+        unread_notifications, has_more, sync_cursor = await self.get_unread_notifications()
         logger.info(f"Sending {len(unread_notifications)} unread notifications to user {self.user.id}")
-        
-        if unread_notifications:
-            await self.send(text_data=json.dumps({
-                'type': 'unread_notifications',
-                'notifications': unread_notifications
-            }))
-        else:
-            logger.info(f"No unread notifications for user {self.user.id}")
-            # Send empty array to confirm connection is working
+        await self.send(text_data=json.dumps({
+            'type': 'unread_notifications',
+            'notifications': unread_notifications,
+            'has_more': has_more,
+            'sync_cursor': sync_cursor
+        }))
+
+    async def resume(self, since):
+        """Replay everything that changed after the client's cursor in capped batches"""
+        sent = 0
+        while True:
+            delta = await self.get_delta(since)
+            sent += len(delta['notifications'])
+            truncated = delta['has_more'] and sent >= MAX_RESUMED_NOTIFICATIONS
             await self.send(text_data=json.dumps({
-                'type': 'unread_notifications',
-                'notifications': []
+                'type': 'notifications_sync',
+                'notifications': delta['notifications'],
+                'read_ids': delta['read_ids'],
+                'has_more': delta['has_more'] and not truncated,
+                'truncated': truncated,
+                'sync_cursor': delta['next_cursor']
             }))
+            if not delta['has_more'] or truncated or not delta['notifications']:
+                break
+            since = decode_sync_cursor(delta['next_cursor'])
+        logger.info(f"Resumed notification session for user {self.user.id} with {sent} notifications")
 
     async def disconnect(self, close_code):
+        # Don't lose receipts still waiting for the debounce window
+        flush_task = getattr(self, 'read_receipt_task', None)
+        if flush_task is not None and not flush_task.done():
+            flush_task.cancel()
+            await self.flush_read_receipts(acknowledge=False)
+
         # Leave the group
         logger.info(f"User {self.user.id if hasattr(self, 'user') and not isinstance(self.user, AnonymousUser) else 'Anonymous'} disconnected from notification websocket with code {close_code}")
         
@@ -67,6 +127,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             
             if message_type == 'mark_read':
                 notification_id = data.get('notification_id')
+                notification_ids = data.get('notification_ids')
+                up_to = data.get('up_to')
                 all_notifications = data.get('all', False)
                 
                 if all_notifications:
@@ -77,16 +139,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                         'all': True,
                         'success': True
                     }))
-                elif notification_id:
-                    logger.info(f"User {self.user.id} marking notification {notification_id} as read")
-                    success = await self.mark_notification_as_read(notification_id)
-                    await self.send(text_data=json.dumps({
-                        'type': 'notification_marked_read',
-                        'notification_id': notification_id,
-                        'success': success
-                    }))
+                elif notification_id or notification_ids or up_to:
+                    await self.queue_read_receipt(notification_id, notification_ids, up_to)
                 else:
-                    logger.warning(f"Invalid mark_read request from user {self.user.id}: missing notification_id or all flag")
+                    logger.warning(f"Invalid mark_read request from user {self.user.id}: missing notification_id, notification_ids, up_to or all flag")
             else:
                 logger.warning(f"Unknown message type received from user {self.user.id}: {message_type}")
                 await self.send(text_data=json.dumps({
@@ -109,57 +165,104 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def notification_message(self, event):
         """Send notification to the WebSocket when received from channel layer"""
         logger.info(f"Sending notification to user {self.user.id}: {event.get('notification', {}).get('id')}")
-        # Forward the event data directly to the WebSocket
-        await self.send(text_data=json.dumps(event))
+        # Forward the event data with a cursor the client can resume from
+        await self.send(text_data=json.dumps(dict(event, sync_cursor=issue_sync_cursor())))
+
+    async def notification_updated(self, event):
+        """Forward an in-place update of a coalesced notification"""
+        await self.send(text_data=json.dumps(dict(event, sync_cursor=issue_sync_cursor())))
 
     @database_sync_to_async
     def get_unread_notifications(self):
-        """Retrieve unread notifications for the current user"""
+        """Retrieve the newest unread notifications and a cursor to resume from"""
+        sync_cursor = issue_sync_cursor()
         try:
-            notifications = Notification.objects.filter(
-                user=self.user,
+            notifications = list(recent_notifications(self.user).filter(
                 is_read=False
-            ).order_by('-created_at')[:20]
-            
-            return [
-                {
-                    'id': str(notification.id),
-                    'title': notification.title,
-                    'message': notification.message,
-                    'notification_type': notification.notification_type,
-                    'created_at': notification.created_at.isoformat(),
-                    'source_id': notification.source_id,
-                    'source_type': notification.source_type,
-                    'is_read': notification.is_read
-                }
-                for notification in notifications
-            ]
+            ).order_by('-created_at')[:UNREAD_ON_CONNECT + 1])
+            has_more = len(notifications) > UNREAD_ON_CONNECT
+            return [notification_data(notification) for notification in notifications[:UNREAD_ON_CONNECT]], has_more, sync_cursor
         except Exception as e:
             logger.exception(f"Error retrieving unread notifications for user {self.user.id}: {str(e)}")
-            return []
+            return [], False, sync_cursor
+
+    @database_sync_to_async
+    def get_delta(self, since):
+        """One batch of changes since a cursor, free when the user's marker is older"""
+        delta = get_notification_delta(self.user, since, limit=RESUME_BATCH_SIZE)
+        delta['notifications'] = [notification_data(notification) for notification in delta['notifications']]
+        return delta
+
+    async def queue_read_receipt(self, notification_id, notification_ids, up_to):
+        """Collect a read receipt and schedule one write for the whole burst"""
+        try:
+            ids = parse_notification_ids(([notification_id] if notification_id else []) + (notification_ids or []))
+            since = decode_sync_cursor(up_to).moment if up_to else None
+        except ValueError as e:
+            await self.send(text_data=json.dumps({'type': 'error', 'message': str(e)}))
+            return
+        except InvalidCursor:
+            await self.send(text_data=json.dumps({'type': 'error', 'message': "Invalid cursor"}))
+            return
+        
+        if getattr(self, 'read_receipt_task', None) is None or self.read_receipt_task.done():
+            self.pending_read_ids = {}
+            self.pending_single_ids = []
+            self.pending_up_to = None
+            self.read_receipt_task = asyncio.ensure_future(self.debounce_read_receipts())
+        self.pending_read_ids.update(dict.fromkeys(ids))
+        if notification_id and not notification_ids:
+            self.pending_single_ids.append(notification_id)
+        if since is not None and (self.pending_up_to is None or since > self.pending_up_to):
+            self.pending_up_to = since
+
+    async def debounce_read_receipts(self):
+        await asyncio.sleep(READ_RECEIPT_DEBOUNCE)
+        await self.flush_read_receipts()
+
+    async def flush_read_receipts(self, acknowledge=True):
+        notification_ids = list(self.pending_read_ids)
+        single_ids, up_to = self.pending_single_ids, self.pending_up_to
+        self.pending_read_ids, self.pending_single_ids, self.pending_up_to = {}, [], None
+        if not notification_ids and up_to is None:
+            return
+        
+        count = await self.mark_notifications_as_read(notification_ids, up_to)
+        logger.info(f"Marked {count} notifications as read for user {self.user.id} from {len(notification_ids)} receipts")
+        if not acknowledge:
+            return
+        success = count is not None
+        # Clients that sent a single id still get the per-notification frame
+        for notification_id in single_ids:
+            await self.send(text_data=json.dumps({
+                'type': 'notification_marked_read',
+                'notification_id': notification_id,
+                'success': success
+            }))
+        await self.send(text_data=json.dumps({
+            'type': 'notifications_marked_read',
+            'notification_ids': [str(notification_id) for notification_id in notification_ids],
+            'up_to': bool(up_to),
+            'count': count or 0,
+            'success': success
+        }))
 
     @database_sync_to_async
-    def mark_notification_as_read(self, notification_id):
-        """Mark a specific notification as read"""
+    def mark_notifications_as_read(self, notification_ids, up_to):
+        """Mark a batch of notifications as read in one UPDATE, None on failure"""
         try:
-            notification = Notification.objects.get(id=notification_id, user=self.user)
-            notification.is_read = True
-            notification.save()
-            logger.info(f"Notification {notification_id} marked as read for user {self.user.id}")
-            return True
-        except Notification.DoesNotExist:
-            logger.warning(f"Attempt to mark non-existent notification {notification_id} as read by user {self.user.id}")
-            return False
+            return mark_notifications_read(self.user.id, notification_ids, up_to=up_to)
         except Exception as e:
-            logger.exception(f"Error marking notification {notification_id} as read: {str(e)}")
-            return False
+            logger.exception(f"Error marking notifications as read for user {self.user.id}: {str(e)}")
+            return None
 
     @database_sync_to_async
     def mark_all_as_read(self):
         """Mark all notifications for the user as read"""
         try:
-            count = Notification.objects.filter(user=self.user, is_read=False).count()
-            Notification.objects.filter(user=self.user, is_read=False).update(is_read=True)
+            count = Notification.objects.filter(user=self.user, is_read=False).update(is_read=True, read_at=timezone.now())
+            reset_unread_count(self.user.id)
+            record_notification_changes([self.user.id])
             logger.info(f"Marked {count} notifications as read for user {self.user.id}")
             return True
         except Exception as e:
@@ -0,0 +1,174 @@
+"""
+Transactional email outbox.
+
+Views call ``queue_email`` which only inserts an EmailOutbox row (inside the
+caller's transaction, so a rolled back request sends nothing). The
+``send_queued_emails`` worker drains pending rows in batches over one reused
+SMTP connection, rendering ``templates/emails/<template>/subject.txt`` and
+``body.txt`` with the stored context, and retries failures with exponential
+backoff.
+
+A batch is claimed in a short transaction that marks its rows ``sending``
+with a lease (``next_attempt_at`` moved LEASE_SECONDS ahead); the SMTP work
+happens outside any transaction and every row records its own outcome right
+after its send. Rows of a worker that died mid-batch are claimed again once
+their lease runs out, so an email is sent at least once: a crash between the
+SMTP send and recording it can deliver that one email twice.
+"""
+from datetime import timedelta
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils import timezone
+import logging
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+LEASE_SECONDS = 5 * 60
+
+
+def queue_email(template, recipient, context=None):
+    """
+    Queue a templated email for the background worker.
+
+    Args:
+        template: Directory name under templates/emails/
+        recipient: Email address
+        context: JSON-serializable template context
+    """
+    email = EmailOutbox.objects.create(template=template, recipient=recipient, context=context or {})
+    logger.info(f"Queued {template} email {email.id} to {recipient}")
+    return email
+
+
+def queue_emails(emails):
+    """
+    Queue many templated emails with one INSERT.
+
+    Args:
+        emails: Iterable of (template, recipient, context) tuples
+    """
+    queued = EmailOutbox.objects.bulk_create([
+        EmailOutbox(template=template, recipient=recipient, context=context or {})
+        for template, recipient, context in emails
+    ])
+    logger.info(f"Queued {len(queued)} emails")
+    return queued
+
+
+def render_email(email):
+    """Build the EmailMessage for an outbox row"""
+    subject = render_to_string(f'emails/{email.template}/subject.txt', email.context)
+    body = render_to_string(f'emails/{email.template}/body.txt', email.context)
+    # Header injection guard, subjects must be a single line
+    subject = ' '.join(subject.split())
+    return EmailMessage(subject=subject, body=body.strip() + '\n', to=[email.recipient])
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def claim_pending_emails(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Lease a batch of due emails to this worker and return them.
+
+    Rows are locked with SKIP LOCKED so several workers can claim side by
+    side, and the transaction ends before anything is sent. Due rows are
+    pending ones and ``sending`` ones whose lease expired.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                status__in=EmailOutbox.DUE_STATUSES,
+                next_attempt_at__lte=now,
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=[email.id for email in batch]).update(
+            status=EmailOutbox.STATUS_SENDING,
+            next_attempt_at=lease_until,
+            attempts=F('attempts') + 1,
+        )
+    for email in batch:
+        email.status = EmailOutbox.STATUS_SENDING
+        email.next_attempt_at = lease_until
+        email.attempts += 1
+    return batch
+
+
+def _record(email, **fields):
+    """Store one row's outcome unless its lease was lost to another worker"""
+    return EmailOutbox.objects.filter(
+        id=email.id,
+        status=EmailOutbox.STATUS_SENDING,
+        next_attempt_at=email.next_attempt_at,
+    ).update(**fields)
+
+
+def _record_failure(email, error):
+    if email.attempts >= MAX_ATTEMPTS:
+        logger.error(f"Giving up on email {email.id} to {email.recipient}: {error}")
+        _record(email, status=EmailOutbox.STATUS_FAILED, last_error=error)
+    else:
+        logger.warning(f"Email {email.id} failed (attempt {email.attempts}), retrying: {error}")
+        _record(
+            email,
+            status=EmailOutbox.STATUS_PENDING,
+            last_error=error,
+            next_attempt_at=timezone.now() + backoff_delay(email.attempts),
+        )
+
+
+def send_pending_emails(connection, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Send one batch of due emails over an already created mail connection.
+
+    Returns the number of rows processed.
+    """
+    batch = claim_pending_emails(batch_size)
+    for email in batch:
+        if email.attempts > MAX_ATTEMPTS:
+            # Its lease ran out after the last allowed attempt
+            _record(email, status=EmailOutbox.STATUS_FAILED, last_error=email.last_error or 'Lease expired')
+            continue
+        try:
+            message = render_email(email)
+        except TemplateDoesNotExist as e:
+            # Retrying cannot fix a missing template
+            logger.error(f"Email {email.id} uses unknown template {email.template}")
+            _record(email, status=EmailOutbox.STATUS_FAILED, last_error=f'Template not found: {e}')
+            continue
+        except Exception as e:
+            _record_failure(email, f'Rendering failed: {e}')
+            continue
+        try:
+            # No-op while the connection is open; reopens it after a failure
+            connection.open()
+            connection.send_messages([message])
+        except Exception as e:
+            _record_failure(email, str(e))
+            # The connection may be unusable now; drop it so the next send reconnects
+            try:
+                connection.close()
+            except Exception:
+                pass
+        else:
+            # The context can hold one-time passwords, don't keep it around
+            _record(
+                email,
+                status=EmailOutbox.STATUS_SENT,
+                sent_at=timezone.now(),
+                last_error='',
+                context={},
+            )
+    return len(batch)
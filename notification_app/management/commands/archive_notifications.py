@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from notification_app.retention import (
+    DEFAULT_BATCH_SIZE, archive_notifications, archive_retention_days,
+    purge_archived_notifications, retention_days,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Move notifications older than NOTIFICATION_RETENTION_DAYS into the archive table and '
+        'purge archived ones older than NOTIFICATION_ARCHIVE_RETENTION_DAYS, in small batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would move')
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'batch_size': options['batch_size'],
+            'pause': options['pause'],
+            'dry_run': options['dry_run'],
+        }
+        archived = archive_notifications(**kwargs)
+        purged = purge_archived_notifications(**kwargs)
+
+        verb = 'Would have archived' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {archived} notifications older than {retention_days()} days and '
+            f'purged {purged} archived notifications older than {archive_retention_days()} days'
+        ))
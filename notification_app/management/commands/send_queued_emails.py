@@ -0,0 +1,39 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from notification_app.email import DEFAULT_BATCH_SIZE, send_pending_emails
+
+
+class Command(BaseCommand):
+    help = (
+        'Drain the email outbox over a single reused SMTP connection. '
+        'For local testing point EMAIL_HOST/EMAIL_PORT at a sink such as '
+        '"python -m aiosmtpd -n -l localhost:1025" with EMAIL_USE_TLS=false.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once no email is due instead of polling')
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        sent = 0
+        try:
+            while True:
+                processed = send_pending_emails(connection, options['batch_size'])
+                sent += processed
+                if processed:
+                    continue
+                # Idle: release the SMTP session rather than let the server time it out
+                connection.close()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(self.style.SUCCESS(f'Processed {sent} queued emails'))
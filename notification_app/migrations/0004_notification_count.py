@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification_app', '0003_notification_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
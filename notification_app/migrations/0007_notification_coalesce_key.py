@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification_app', '0006_email_outbox_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='coalesce_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='coalesce_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
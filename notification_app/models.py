@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Notification(models.Model):
     """Model for user notifications"""
@@ -29,15 +30,92 @@ class Notification(models.Model):
     notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPES, default=TYPE_SYSTEM)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Delta sync: updated_at moves on creation and content changes, read_at when marked read
+    updated_at = models.DateTimeField(auto_now=True)
+    read_at = models.DateTimeField(null=True, blank=True)
     source_id = models.CharField(max_length=255, blank=True, null=True)  # ID of the related object (job post, application, etc.)
     source_type = models.CharField(max_length=50, blank=True, null=True)  # Type of the related object
+    count = models.PositiveIntegerField(default=1)  # Events merged into this notification, see utils.send_coalesced_notification
+    coalesce_key = models.CharField(max_length=100, blank=True, null=True)  # Events sharing a key merge into one notification
+    coalesce_started_at = models.DateTimeField(null=True, blank=True)  # First merged event, anchors the coalescing window
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read', '-created_at']),
             models.Index(fields=['user', 'notification_type']),
+            # Unfiltered per-user listing, newest first
+            models.Index(fields=['user', '-created_at'], name='notification_user_recent_idx'),
+            # Archival scans by age
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+            # "Anything new since my cursor?" probes
+            models.Index(fields=['user', 'updated_at'], name='notification_user_updated_idx'),
+            models.Index(fields=['user', 'read_at'], name='notification_user_read_idx', condition=models.Q(read_at__isnull=False)),
         ]
 
     def __str__(self):
-        return f"{self.notification_type} for {self.user.username}: {self.title}"
\ No newline at end of file
+        return f"{self.notification_type} for {self.user.username}: {self.title}"
+
+class NotificationArchive(models.Model):
+    """Notifications moved out of the live table by the archive_notifications command"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_notifications')
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=50, choices=Notification.NOTIFICATION_TYPES)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    source_id = models.CharField(max_length=255, blank=True, null=True)
+    source_type = models.CharField(max_length=50, blank=True, null=True)
+    count = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notif_archive_user_idx'),
+            models.Index(fields=['created_at'], name='notif_archive_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived {self.notification_type} for user {self.user_id}: {self.title}"
+
+
+class EmailOutbox(models.Model):
+    """Transactional email waiting to be sent by the send_queued_emails worker"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    # Rows a worker may claim once next_attempt_at has passed; for 'sending'
+    # rows next_attempt_at is the end of the current worker's lease
+    DUE_STATUSES = (STATUS_PENDING, STATUS_SENDING)
+
+    template = models.CharField(max_length=100)  # Directory under templates/emails/
+    recipient = models.EmailField()
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                name='email_outbox_due_idx',
+                condition=models.Q(status__in=['pending', 'sending']),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.template} to {self.recipient} ({self.status})"
@@ -0,0 +1,94 @@
+"""
+Notification retention.
+
+The live Notification table only keeps the last NOTIFICATION_RETENTION_DAYS
+days; older rows are moved to NotificationArchive by the
+archive_notifications command and dropped from the archive after
+NOTIFICATION_ARCHIVE_RETENTION_DAYS. Every step works in small batches with
+one short transaction each, so no long locks are held on either table.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+import logging
+import time
+
+from .models import Notification, NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = [
+    'id', 'user_id', 'title', 'message', 'notification_type', 'is_read',
+    'created_at', 'source_id', 'source_type', 'count',
+]
+DEFAULT_BATCH_SIZE = 1000
+
+
+def retention_days():
+    return getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+
+
+def archive_retention_days():
+    return getattr(settings, 'NOTIFICATION_ARCHIVE_RETENTION_DAYS', 365)
+
+
+def live_cutoff():
+    """Oldest created_at still served by the notification list and counts"""
+    return timezone.now() - timedelta(days=retention_days())
+
+
+def recent_notifications(user):
+    return Notification.objects.filter(user=user, created_at__gte=live_cutoff())
+
+
+def archive_notifications(batch_size=DEFAULT_BATCH_SIZE, pause=0, dry_run=False):
+    """Move notifications past the retention window into the archive; returns the row count"""
+    from .unread import invalidate_unread_count
+
+    cutoff = live_cutoff()
+    if dry_run:
+        return Notification.objects.filter(created_at__lt=cutoff).count()
+
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects.filter(created_at__lt=cutoff).order_by('created_at').select_for_update(
+                    skip_locked=True
+                ).values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows],
+                ignore_conflicts=True
+            )
+            Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+        # Archived unread rows no longer count towards the badge
+        invalidate_unread_count({row['user_id'] for row in rows if not row['is_read']})
+        archived += len(rows)
+        logger.info(f"Archived {archived} notifications so far")
+        if pause:
+            time.sleep(pause)
+    return archived
+
+
+def purge_archived_notifications(batch_size=DEFAULT_BATCH_SIZE, pause=0, dry_run=False):
+    """Delete archived notifications past the archive retention window; returns the row count"""
+    cutoff = timezone.now() - timedelta(days=archive_retention_days())
+    expired = NotificationArchive.objects.filter(created_at__lt=cutoff)
+    if dry_run:
+        return expired.count()
+
+    purged = 0
+    while True:
+        ids = list(expired.order_by('created_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        NotificationArchive.objects.filter(id__in=ids).delete()
+        purged += len(ids)
+        if pause:
+            time.sleep(pause)
+    return purged
@@ -11,7 +11,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'message', 'notification_type', 
             'is_read', 'created_at', 'created_at_formatted',
-            'source_id', 'source_type'
+            'source_id', 'source_type', 'count'
         ]
         read_only_fields = fields
     
@@ -1,3 +1,236 @@
-from django.test import TestCase
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from auth_app.models import User
+from .email import MAX_ATTEMPTS, queue_email, send_pending_emails
+from .models import EmailOutbox, Notification
+from .sync import decode_sync_cursor, encode_sync_cursor, get_notification_delta, record_notification_changes
+from .unread import UNREAD_COUNT_KEY, get_unread_count
+from .utils import mark_notifications_read, send_coalesced_notification, send_notifications_bulk
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+IN_MEMORY_CHANNELS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class FakeConnection:
+    """Mail connection that records sends and fails for chosen recipients"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.failing:
+                raise SMTPServerDisconnected('Connection unexpectedly closed')
+            self.sent.append(message.to[0])
+        return len(messages)
+
+
+class EmailOutboxTests(TestCase):
+
+    def queue(self, recipient):
+        return queue_email('verification_otp', recipient, {'otp': '123456'})
+
+    def test_failed_send_is_retried_without_resending_delivered_mail(self):
+        delivered = self.queue('ok@example.com')
+        failing = self.queue('down@example.com')
+
+        connection = FakeConnection(failing={'down@example.com'})
+        self.assertEqual(send_pending_emails(connection), 2)
+        self.assertEqual(connection.sent, ['ok@example.com'])
+
+        delivered.refresh_from_db()
+        failing.refresh_from_db()
+        self.assertEqual(delivered.status, EmailOutbox.STATUS_SENT)
+        self.assertEqual(delivered.context, {})
+        self.assertEqual(failing.status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(failing.attempts, 1)
+        self.assertGreater(failing.next_attempt_at, timezone.now())
+
+        # Once the backoff has passed only the failed email goes out again
+        EmailOutbox.objects.filter(id=failing.id).update(next_attempt_at=timezone.now())
+        connection.failing.clear()
+        self.assertEqual(send_pending_emails(connection), 1)
+        self.assertEqual(connection.sent, ['ok@example.com', 'down@example.com'])
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), (EmailOutbox.STATUS_SENT, 2))
+
+    def test_email_fails_for_good_after_the_last_attempt(self):
+        email = self.queue('down@example.com')
+        EmailOutbox.objects.filter(id=email.id).update(attempts=MAX_ATTEMPTS - 1)
+        send_pending_emails(FakeConnection(failing={'down@example.com'}))
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailOutbox.STATUS_FAILED)
+        self.assertIn('unexpectedly closed', email.last_error)
+
+    def test_expired_lease_is_claimed_again(self):
+        email = self.queue('ok@example.com')
+        # A worker claimed it and died before recording the send
+        EmailOutbox.objects.filter(id=email.id).update(
+            status=EmailOutbox.STATUS_SENDING, attempts=1, next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        connection = FakeConnection()
+        self.assertEqual(send_pending_emails(connection), 1)
+        self.assertEqual(connection.sent, ['ok@example.com'])
+
+    def test_leased_email_is_not_claimed_by_another_worker(self):
+        self.queue('ok@example.com')
+        EmailOutbox.objects.update(
+            status=EmailOutbox.STATUS_SENDING, next_attempt_at=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(send_pending_emails(FakeConnection()), 0)
+
+
+@override_settings(
+    CACHES=LOCAL_CACHE,
+    CHANNEL_LAYERS=IN_MEMORY_CHANNELS,
+    NOTIFICATION_COALESCE_WINDOWS={Notification.TYPE_JOB_APPLIED: 60},
+)
+class CoalescedNotificationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='provider', email='provider@example.com', password='x')
+
+    def notify(self, application_id, job_post_id=1):
+        return send_coalesced_notification(
+            user=self.user,
+            notification_type=Notification.TYPE_JOB_APPLIED,
+            coalesce_key=f'job_post:{job_post_id}',
+            render=lambda count: {'title': f'{count} applicants', 'message': f'{count} applicants'},
+            source_type='application',
+            source_id=application_id,
+        )
+
+    def test_events_with_the_same_key_merge_and_point_at_the_latest_source(self):
+        first = self.notify(10)
+        merged = self.notify(11)
+        self.notify(12, job_post_id=2)
+
+        self.assertEqual(merged.id, first.id)
+        merged.refresh_from_db()
+        self.assertEqual((merged.count, merged.title), (2, '2 applicants'))
+        self.assertEqual((merged.source_type, merged.source_id), ('application', '11'))
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 2)
+
+    def test_window_is_anchored_on_the_first_event(self):
+        first = self.notify(10)
+        # Merged a moment ago, but the group started before the window
+        Notification.objects.filter(id=first.id).update(
+            coalesce_started_at=timezone.now() - timedelta(seconds=61), created_at=timezone.now()
+        )
+        second = self.notify(11)
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(second.count, 1)
+
+
+@override_settings(CACHES=LOCAL_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS)
+class NotificationDeltaSyncTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='seeker', email='seeker@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.first, self.second = (
+            Notification.objects.create(user=self.user, title=title, message=title) for title in ('first', 'second')
+        )
+        # Both were already delivered before the client's cursor
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Notification.objects.update(created_at=an_hour_ago, updated_at=an_hour_ago)
+        self.cursor = encode_sync_cursor(timezone.now() - timedelta(minutes=10))
+
+    def delta(self, cursor):
+        response = self.client.get(reverse('notification_app:notification-list'), {'since': cursor})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_mark_read_is_delivered_as_an_id_only(self):
+        delta = self.delta(self.cursor)
+        self.assertEqual((delta['notifications'], delta['read_ids']), ([], []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('notification_app:mark-notification-read', args=[self.first.id]))
+        self.assertEqual(response.status_code, 200)
+
+        delta = self.delta(self.cursor)
+        self.assertEqual(delta['notifications'], [])
+        self.assertEqual(delta['read_ids'], [str(self.first.id)])
+        self.assertFalse(delta['has_more'])
+
+    def test_new_notification_is_delivered_in_full(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            third = Notification.objects.create(user=self.user, title='third', message='third')
+            # Stamped the same way the notification helpers do
+            record_notification_changes([self.user.id])
+
+        delta = self.delta(self.cursor)
+        self.assertEqual([notification['id'] for notification in delta['notifications']], [str(third.id)])
+        self.assertEqual(delta['read_ids'], [])
+
+    def test_notifications_sharing_a_timestamp_are_split_across_pages(self):
+        cache.clear()
+        for title in ('third', 'fourth', 'fifth'):
+            Notification.objects.create(user=self.user, title=title, message=title)
+        # One UPDATE stamps every row with the same updated_at
+        Notification.objects.filter(user=self.user).update(updated_at=timezone.now() - timedelta(minutes=5))
+
+        seen, cursor = [], self.cursor
+        for _ in range(3):
+            delta = get_notification_delta(self.user, decode_sync_cursor(cursor), limit=2)
+            seen.extend(notification.id for notification in delta['notifications'])
+            cursor = delta['next_cursor']
+            if not delta['has_more']:
+                break
+        self.assertEqual(sorted(seen), sorted(Notification.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), 5)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('notification_app:notification-list'), {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCAL_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS, NOTIFICATION_RETENTION_DAYS=90)
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seeker', email='seeker@example.com', password='x')
+
+    def notify(self, count=1):
+        payload = {'title': 'Hello', 'message': 'Hello'}
+        return send_notifications_bulk([(self.user, Notification.TYPE_JOB_APPLIED, payload)] * count)
+
+    def test_new_notifications_are_counted_once_committed(self):
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify(2)
+            self.assertEqual(get_unread_count(self.user.id), 0)
+        self.assertEqual(get_unread_count(self.user.id), 2)
+
+    def test_rebuild_that_missed_a_new_notification_is_not_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify()
+        # A read that counted before the insert committed stores its result late
+        cache.add(UNREAD_COUNT_KEY.format(self.user.id, 0), 0)
+        self.assertEqual(get_unread_count(self.user.id), 1)
+
+    def test_marking_read_only_decrements_for_notifications_in_the_retention_window(self):
+        expired, live, _ = self.notify(3)
+        Notification.objects.filter(id=expired.id).update(created_at=timezone.now() - timedelta(days=91))
+        self.assertEqual(get_unread_count(self.user.id), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_notifications_read(self.user.id, [expired.id, live.id]), 1)
+        self.assertEqual(get_unread_count(self.user.id), 1)
@@ -0,0 +1,95 @@
+"""
+Per-user unread notification counters in the shared cache.
+
+The counter is created lazily from one COUNT query on the first read after
+a miss; from then on new notifications increment it and the mark-read paths
+decrement or reset it, so polling the count never reaches Postgres. Only
+notifications inside the retention window are counted.
+
+Counters are versioned: each user has a version token and the counter lives
+under a key that includes it. A change that finds no counter to adjust
+replaces the token instead, so a rebuild whose COUNT ran before that change
+committed stores its result under a key nobody reads any more and the next
+read counts again. Increments and decrements run once the write commits.
+"""
+from django.core.cache import cache
+from django.db import transaction
+import logging
+import uuid
+
+from .models import Notification
+from .retention import live_cutoff
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_KEY = 'notifications:unread:{}:{}'
+UNREAD_VERSION_KEY = 'notifications:unread_version:{}'
+# Counters expire so any drift heals itself at least once a day
+UNREAD_COUNT_TIMEOUT = 60 * 60 * 24
+# Past this many users one batch drops the counters instead of incrementing each
+MAX_INCREMENTED_USERS = 100
+
+
+def _count_keys(user_ids):
+    versions = cache.get_many([UNREAD_VERSION_KEY.format(user_id) for user_id in user_ids])
+    return {
+        user_id: UNREAD_COUNT_KEY.format(user_id, versions.get(UNREAD_VERSION_KEY.format(user_id), 0))
+        for user_id in user_ids
+    }
+
+
+def _replace_versions(user_ids):
+    # A fresh token per call, so concurrent replacements never land on a version a rebuild already read
+    if user_ids:
+        cache.set_many({UNREAD_VERSION_KEY.format(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout=None)
+
+
+def _adjust(counts):
+    keys = _count_keys(list(counts))
+    stale = []
+    for user_id, delta in counts.items():
+        try:
+            if cache.incr(keys[user_id], delta) < 0:
+                stale.append(user_id)
+        except ValueError:
+            # No counter for this version; make sure a rebuild in flight is not kept either
+            stale.append(user_id)
+    _replace_versions(stale)
+
+
+def get_unread_count(user_id):
+    key = _count_keys([user_id])[user_id]
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            user_id=user_id, is_read=False, created_at__gte=live_cutoff()
+        ).count()
+        cache.add(key, count, timeout=UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def record_new_notifications(counts):
+    """
+    Bump the counters once the notifications are committed.
+
+    Args:
+        counts: Dict of {user_id: number of new unread notifications}
+    """
+    counts = dict(counts)
+    if len(counts) > MAX_INCREMENTED_USERS:
+        transaction.on_commit(lambda: _replace_versions(list(counts)))
+    elif counts:
+        transaction.on_commit(lambda: _adjust(counts))
+
+
+def record_notifications_read(user_id, count=1):
+    """Lower the counter once notifications inside the retention window are marked read"""
+    transaction.on_commit(lambda: _adjust({user_id: -count}))
+
+
+def reset_unread_count(user_id):
+    cache.set(_count_keys([user_id])[user_id], 0, timeout=UNREAD_COUNT_TIMEOUT)
+
+
+def invalidate_unread_count(user_ids):
+    _replace_versions(list(user_ids))
@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     NotificationListView,
     MarkNotificationReadView,
+    MarkNotificationsReadView,
     MarkAllNotificationsReadView,
     NotificationCountView
 )
@@ -11,6 +12,7 @@ app_name = 'notification_app'
 urlpatterns = [
     path('notifications/', NotificationListView.as_view(), name='notification-list'),
     path('notifications/mark-read/<uuid:notification_id>/', MarkNotificationReadView.as_view(), name='mark-notification-read'),
+    path('notifications/mark-read/', MarkNotificationsReadView.as_view(), name='mark-notifications-read'),
     path('notifications/mark-all-read/', MarkAllNotificationsReadView.as_view(), name='mark-all-notifications-read'),
     path('notifications/count/', NotificationCountView.as_view(), name='notification-count'),
 ]
\ No newline at end of file
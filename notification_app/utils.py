@@ -1,11 +1,130 @@
 from asgiref.sync import async_to_sync
+import asyncio
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from channels.layers import get_channel_layer
-import json
 import logging
 from .models import Notification
+from .retention import live_cutoff
+from .sync import record_notification_changes
+from .unread import record_new_notifications, record_notifications_read
+import uuid
 
 logger = logging.getLogger(__name__)
 
+BULK_BATCH_SIZE = 1000
+MAX_READ_RECEIPT_IDS = 1000
+
+def notification_message(notification):
+    """Channel layer event delivered to the user's NotificationConsumer"""
+    return {
+        'type': 'notification_message',
+        'notification': {
+            'id': str(notification.id),
+            'title': notification.title,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'created_at': notification.created_at.isoformat(),
+            'source_id': notification.source_id,
+            'source_type': notification.source_type,
+            'is_read': notification.is_read,
+            'count': notification.count
+        }
+    }
+
+def notification_update_message(notification):
+    """Delta event for a coalesced notification that was updated in place"""
+    return {
+        'type': 'notification_updated',
+        'notification': {
+            'id': str(notification.id),
+            'title': notification.title,
+            'message': notification.message,
+            'count': notification.count,
+            'created_at': notification.created_at.isoformat(),
+        }
+    }
+
+async def _group_send_all(channel_layer, messages):
+    results = await asyncio.gather(
+        *(channel_layer.group_send(group_name, message) for group_name, message in messages),
+        return_exceptions=True
+    )
+    for (group_name, _), result in zip(messages, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to push notification to {group_name}: {str(result)}")
+
+def push_notifications(notifications):
+    """Deliver already saved notifications over WebSocket in one event loop bridge"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        logger.error("No channel layer available for sending notifications")
+        return
+    messages = [
+        (f'notifications_{notification.user_id}', notification_message(notification))
+        for notification in notifications
+    ]
+    if messages:
+        async_to_sync(_group_send_all)(channel_layer, messages)
+
+def send_notifications_bulk(notifications, batch_size=BULK_BATCH_SIZE):
+    """
+    Create and send many notifications at once
+    
+    Rows are inserted with bulk_create and the WebSocket pushes for each
+    batch go out concurrently through a single async_to_sync bridge.
+    
+    Args:
+        notifications: Iterable of (user, notification_type, payload) tuples,
+            where user is a User or user id and payload holds title, message
+            and optionally source_id, source_type, coalesce_key and
+            coalesce_started_at
+        batch_size: Rows per INSERT and per push batch
+    
+    Returns:
+        The created notifications
+    """
+    created = []
+    batch = []
+    for user, notification_type, payload in notifications:
+        batch.append(Notification(
+            user_id=getattr(user, 'id', user),
+            notification_type=notification_type,
+            title=payload['title'],
+            message=payload['message'],
+            source_id=payload.get('source_id'),
+            source_type=payload.get('source_type'),
+            coalesce_key=payload.get('coalesce_key'),
+            coalesce_started_at=payload.get('coalesce_started_at')
+        ))
+        if len(batch) >= batch_size:
+            created.extend(_create_and_push(batch))
+            batch = []
+    if batch:
+        created.extend(_create_and_push(batch))
+    return created
+
+def _create_and_push(batch):
+    try:
+        Notification.objects.bulk_create(batch)
+    except Exception as e:
+        logger.exception(f"Failed to create {len(batch)} notifications: {str(e)}")
+        return []
+    counts = {}
+    for notification in batch:
+        counts[notification.user_id] = counts.get(notification.user_id, 0) + 1
+    record_new_notifications(counts)
+    record_notification_changes(counts)
+    try:
+        push_notifications(batch)
+        logger.info(f"Sent {len(batch)} notifications via WebSocket")
+    except Exception as e:
+        logger.exception(f"Failed to send notifications via WebSocket: {str(e)}")
+    return batch
+
 def send_notification(user, notification_type, title, message, source_id=None, source_type=None):
     """
     Create and send a notification to a user
@@ -21,57 +140,136 @@ def send_notification(user, notification_type, title, message, source_id=None, s
     Returns:
         The created notification
     """
-    try:
-        logger.info(f"Creating notification for user {user.id}: {notification_type} - {title}")
-        
-        # Create notification in database
-        notification = Notification.objects.create(
-            user=user,
-            notification_type=notification_type,
-            title=title,
-            message=message,
-            source_id=source_id,
-            source_type=source_type
-        )
-        
-        # Send to WebSocket if channel layer available
+    logger.info(f"Creating notification for user {user.id}: {notification_type} - {title}")
+    created = send_notifications_bulk([(user, notification_type, {
+        'title': title,
+        'message': message,
+        'source_id': source_id,
+        'source_type': source_type,
+    })])
+    return created[0] if created else None
+
+def coalesce_window(notification_type):
+    """Seconds within which same-source notifications of a type are merged, 0 to disable"""
+    windows = getattr(settings, 'NOTIFICATION_COALESCE_WINDOWS', {})
+    return windows.get(notification_type, 0)
+
+def send_coalesced_notification(user, notification_type, coalesce_key, render, source_type=None, source_id=None):
+    """
+    Create a notification, or merge it into the user's unread notification of
+    the same type and coalescing key if that one started within the
+    coalescing window
+    
+    The window is anchored on the first merged event, so a steady stream of
+    events still starts a new notification once per window. A merge bumps
+    the notification's count and timestamp, re-renders its text, points its
+    source at the latest event and pushes one small 'notification_updated'
+    frame instead of a new notification.
+    
+    Args:
+        user: User to notify
+        notification_type: Type of notification
+        coalesce_key: Events with the same key are merged, e.g. "job_post:12"
+        render: Callable taking the merged count and returning a payload
+            dict with title and message
+        source_type: Type of the object behind the latest event
+        source_id: ID of the object behind the latest event
+    
+    Returns:
+        The created or updated notification
+    """
+    window = coalesce_window(notification_type)
+    source_id = str(source_id) if source_id is not None else None
+    now = timezone.now()
+    if window:
         try:
-            channel_layer = get_channel_layer()
-            if channel_layer is None:
-                logger.error("No channel layer available for sending notifications")
-                return notification
-                
-            notification_data = {
-                'type': 'notification_message',
-                'notification': {
-                    'id': str(notification.id),
-                    'title': notification.title,
-                    'message': notification.message,
-                    'notification_type': notification.notification_type,
-                    'created_at': notification.created_at.isoformat(),
-                    'source_id': notification.source_id,
-                    'source_type': notification.source_type,
-                    'is_read': notification.is_read
-                }
-            }
-            
-            # Send to the user's notification group
-            group_name = f'notifications_{user.id}'
-            logger.info(f"Sending notification to channel group: {group_name}")
-            
-            async_to_sync(channel_layer.group_send)(
-                group_name,
-                notification_data
-            )
-            
-            logger.info(f"Notification sent to user {user.id} via WebSocket")
+            with transaction.atomic():
+                notification = Notification.objects.select_for_update().filter(
+                    user=user,
+                    notification_type=notification_type,
+                    coalesce_key=coalesce_key,
+                    is_read=False,
+                    coalesce_started_at__gte=now - timedelta(seconds=window)
+                ).order_by('-coalesce_started_at').first()
+                if notification is not None:
+                    payload = render(notification.count + 1)
+                    notification.count += 1
+                    notification.title = payload['title']
+                    notification.message = payload['message']
+                    notification.source_type = source_type
+                    notification.source_id = source_id
+                    notification.created_at = now
+                    notification.save(update_fields=[
+                        'count', 'title', 'message', 'source_type', 'source_id', 'created_at', 'updated_at'
+                    ])
+                    record_notification_changes([notification.user_id])
         except Exception as e:
-            logger.exception(f"Failed to send notification via WebSocket: {str(e)}")
+            logger.exception(f"Failed to coalesce notification for user {user.id}: {str(e)}")
+            notification = None
         
-        return notification
-    except Exception as e:
-        logger.exception(f"Failed to create notification: {str(e)}")
-        return None
+        if notification is not None:
+            # Still a single unread notification, so the unread counter stays as is
+            try:
+                channel_layer = get_channel_layer()
+                if channel_layer is not None:
+                    async_to_sync(channel_layer.group_send)(
+                        f'notifications_{notification.user_id}',
+                        notification_update_message(notification)
+                    )
+            except Exception as e:
+                logger.exception(f"Failed to push notification update via WebSocket: {str(e)}")
+            return notification
+    
+    payload = render(1)
+    payload.update({
+        'source_id': source_id,
+        'source_type': source_type,
+        'coalesce_key': coalesce_key,
+        'coalesce_started_at': now,
+    })
+    created = send_notifications_bulk([(user, notification_type, payload)])
+    return created[0] if created else None
+
+def parse_notification_ids(values):
+    """
+    Validate a client supplied list of notification ids
+    
+    Raises:
+        ValueError: If values is not a list of at most MAX_READ_RECEIPT_IDS UUIDs
+    """
+    if not isinstance(values, list) or len(values) > MAX_READ_RECEIPT_IDS:
+        raise ValueError(f"notification_ids must be a list of at most {MAX_READ_RECEIPT_IDS} ids")
+    try:
+        return list(dict.fromkeys(uuid.UUID(str(value)) for value in values))
+    except ValueError:
+        raise ValueError("notification_ids must contain notification UUIDs")
+
+def mark_notifications_read(user_id, notification_ids=(), up_to=None):
+    """
+    Mark a user's notifications as read with one UPDATE
+    
+    Args:
+        user_id: Owner of the notifications
+        notification_ids: Notification UUIDs to mark
+        up_to: Also mark every notification last changed at or before this
+            time, usually a decoded sync cursor the client has caught up to
+    
+    Only notifications inside the retention window are marked, the same rows
+    the list and the unread counter see; older ones are left to the archive.
+    
+    Returns:
+        Number of notifications that were unread
+    """
+    condition = Q(id__in=list(notification_ids))
+    if up_to is not None:
+        condition |= Q(updated_at__lte=up_to)
+    count = Notification.objects.filter(
+        condition, user_id=user_id, is_read=False, created_at__gte=live_cutoff()
+    ).update(is_read=True, read_at=timezone.now())
+    if count:
+        record_notifications_read(user_id, count)
+        record_notification_changes([user_id])
+    return count
 
 def send_application_status_notification(application):
     """
@@ -80,21 +278,32 @@ def send_application_status_notification(application):
     Args:
         application: JobApplication instance
     """
-    job_seeker_user = application.job_seeker.user
-    job_title = application.jobpost.title
-    company_name = application.jobpost.job_provider.company_name
-    status = application.status
-    
-    title = f"Application Status Update: {job_title}"
-    message = f"Your application for {job_title} at {company_name} has been updated to: {status}"
-    
-    send_notification(
-        user=job_seeker_user,
-        notification_type=Notification.TYPE_APPLICATION_UPDATE,
-        title=title,
-        message=message,
-        source_id=str(application.id),
-        source_type="application"
+    send_application_status_notifications([application])
+
+def send_application_status_notifications(applications):
+    """
+    Notify the job seekers of many applications about their new status with
+    one INSERT and one batch of WebSocket pushes.
+
+    Args:
+        applications: JobApplication instances with jobpost__job_provider
+            and job_seeker loaded
+    """
+    return send_notifications_bulk(
+        (
+            application.job_seeker.user_id,
+            Notification.TYPE_APPLICATION_UPDATE,
+            {
+                'title': f"Application Status Update: {application.jobpost.title}",
+                'message': (
+                    f"Your application for {application.jobpost.title} at "
+                    f"{application.jobpost.job_provider.company_name} has been updated to: {application.status}"
+                ),
+                'source_id': str(application.id),
+                'source_type': "application",
+            }
+        )
+        for application in applications
     )
 
 def send_interview_scheduled_notification(interview):
@@ -180,6 +389,9 @@ def send_job_applied_notification(application):
     """
     Send notification to job provider when someone applies for a job
     
+    Applications to the same job within the coalescing window are merged
+    into one "N new applicants" notification.
+    
     Args:
         application: JobApplication instance
     """
@@ -187,14 +399,22 @@ def send_job_applied_notification(application):
     job_title = application.jobpost.title
     job_seeker_name = f"{application.job_seeker.user.first_name} {application.job_seeker.user.last_name}".strip()
     
-    title = f"New Application: {job_title}"
-    message = f"{job_seeker_name} has applied for the {job_title} position"
+    def render(count):
+        if count == 1:
+            return {
+                'title': f"New Application: {job_title}",
+                'message': f"{job_seeker_name} has applied for the {job_title} position",
+            }
+        return {
+            'title': f"{count} New Applications: {job_title}",
+            'message': f"{count} new applicants for the {job_title} position, most recently {job_seeker_name}",
+        }
     
-    send_notification(
+    send_coalesced_notification(
         user=job_provider_user,
         notification_type=Notification.TYPE_JOB_APPLIED,
-        title=title,
-        message=message,
-        source_id=str(application.id),
-        source_type="application"
-    )
\ No newline at end of file
+        coalesce_key=f"job_post:{application.jobpost_id}",
+        render=render,
+        source_type="application",
+        source_id=application.id
+    )
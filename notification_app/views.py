@@ -5,6 +5,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from .models import Notification
 from .serializer import NotificationSerializer
+from .retention import recent_notifications
+from .sync import decode_sync_cursor, get_notification_delta, issue_sync_cursor, record_notification_changes
+from backend.pagination import InvalidCursor
+from .unread import get_unread_count, reset_unread_count
+from .utils import mark_notifications_read, parse_notification_ids
+from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,12 +27,16 @@ class NotificationListView(APIView):
     
     def get(self, request):
         try:
+            if 'since' in request.query_params:
+                return self.get_delta(request)
+            
             # Get filter parameters
             is_read = request.query_params.get('is_read')
             notification_type = request.query_params.get('type')
             
             # Build query
-            notifications = Notification.objects.filter(user=request.user)
+            # Only the retention window; older rows live in NotificationArchive
+            notifications = recent_notifications(request.user)
             
             if is_read is not None:
                 is_read = is_read.lower() == 'true'
@@ -40,7 +50,10 @@ class NotificationListView(APIView):
             page = paginator.paginate_queryset(notifications, request)
             serializer = NotificationSerializer(page, many=True)
             
-            return paginator.get_paginated_response(serializer.data)
+            response = paginator.get_paginated_response(serializer.data)
+            # Starting point for ?since= delta polling
+            response.data['sync_cursor'] = issue_sync_cursor()
+            return response
         
         except Exception as e:
             logger.exception(f"Error in NotificationListView: {str(e)}")
@@ -49,6 +62,29 @@ class NotificationListView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def get_delta(self, request):
+        """
+        Changes since a sync cursor: full rows for new or changed
+        notifications and only the ids of notifications marked read
+        """
+        since = request.query_params.get('since')
+        if not since:
+            return Response(
+                {'notifications': [], 'read_ids': [], 'has_more': False, 'next_cursor': issue_sync_cursor()},
+                status=status.HTTP_200_OK
+            )
+        try:
+            since = decode_sync_cursor(since)
+        except InvalidCursor:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        delta = get_notification_delta(request.user, since)
+        delta['notifications'] = NotificationSerializer(delta['notifications'], many=True).data
+        return Response(delta, status=status.HTTP_200_OK)
+
 class MarkNotificationReadView(APIView):
     """Mark a notification as read"""
     permission_classes = [IsAuthenticated]
@@ -56,8 +92,9 @@ class MarkNotificationReadView(APIView):
     def post(self, request, notification_id):
         try:
             notification = Notification.objects.get(id=notification_id, user=request.user)
-            notification.is_read = True
-            notification.save()
+            if not notification.is_read:
+                mark_notifications_read(request.user.id, [notification.id])
+                notification.is_read = True
             
             serializer = NotificationSerializer(notification)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -75,13 +112,60 @@ class MarkNotificationReadView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class MarkNotificationsReadView(APIView):
+    """
+    Mark many notifications as read with one UPDATE, by id and/or everything
+    up to a sync cursor the client has caught up to
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        try:
+            notification_ids = parse_notification_ids(request.data.get('notification_ids', []))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        up_to = request.data.get('up_to')
+        if up_to:
+            try:
+                up_to = decode_sync_cursor(up_to).moment
+            except InvalidCursor:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        if not notification_ids and not up_to:
+            return Response(
+                {'error': 'notification_ids or up_to is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            count = mark_notifications_read(request.user.id, notification_ids, up_to=up_to or None)
+            return Response(
+                {'marked_read': count, 'unread_count': get_unread_count(request.user.id)},
+                status=status.HTTP_200_OK
+            )
+        
+        except Exception as e:
+            logger.exception(f"Error in MarkNotificationsReadView: {str(e)}")
+            return Response(
+                {'error': 'An error occurred while marking notifications as read'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class MarkAllNotificationsReadView(APIView):
     """Mark all notifications as read for the current user"""
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
         try:
-            Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+            Notification.objects.filter(user=request.user, is_read=False).update(is_read=True, read_at=timezone.now())
+            reset_unread_count(request.user.id)
+            record_notification_changes([request.user.id])
             
             return Response(
                 {'message': 'All notifications marked as read'},
@@ -101,7 +185,8 @@ class NotificationCountView(APIView):
     
     def get(self, request):
         try:
-            count = Notification.objects.filter(user=request.user, is_read=False).count()
+            # Served from the shared cache counter, see notification_app.unread
+            count = get_unread_count(request.user.id)
             
             return Response(
                 {'unread_count': count},
@@ -5,6 +5,7 @@ from .models import *
 from auth_app.models import *
 from jobpost_app.models import SavedJob,JobPost
 import logging
+from jobpost_app.autocomplete import skill_index
 
 import os
 logger = logging.getLogger(__name__)
@@ -142,7 +143,7 @@ class JobSeekerSkillSerializer(serializers.ModelSerializer):
         return data
 
     def validate_skill_id(self, value):
-        if not Skills.objects.filter(id=value).exists():
+        if not skill_index.existing_ids([value]):
             raise serializers.ValidationError("Skill does not exist.")
         job_seeker = self.context['request'].user.job_seeker_profile
         if JobSeekerSkill.objects.filter(job_seeker=job_seeker, skill_id=value).exists():
@@ -151,11 +152,16 @@ class JobSeekerSkillSerializer(serializers.ModelSerializer):
 
     def validate_skill_ids(self, value):
         job_seeker = self.context['request'].user.job_seeker_profile
+        # Existence comes from the in-memory skill index; ownership is one query
+        existing_ids = skill_index.existing_ids(value)
+        owned_ids = set(JobSeekerSkill.objects.filter(
+            job_seeker=job_seeker, skill_id__in=value
+        ).values_list('skill_id', flat=True))
         errors = []
         for skill_id in value:
-            if not Skills.objects.filter(id=skill_id).exists():
+            if skill_id not in existing_ids:
                 errors.append(f"Skill with ID {skill_id} does not exist.")
-            elif JobSeekerSkill.objects.filter(job_seeker=job_seeker, skill_id=skill_id).exists():
+            elif skill_id in owned_ids:
                 errors.append(f"Skill with ID {skill_id} is already added to your profile.")
         if errors:
             raise serializers.ValidationError(errors)
@@ -167,13 +173,11 @@ class JobSeekerSkillSerializer(serializers.ModelSerializer):
         skill_id = validated_data.pop('skill_id', None)
 
         if skill_id:
-            skill = Skills.objects.get(id=skill_id)
-            return JobSeekerSkill.objects.create(job_seeker=job_seeker, skill=skill, **validated_data)
+            return JobSeekerSkill.objects.create(job_seeker=job_seeker, skill_id=skill_id, **validated_data)
         elif skill_ids:
             instances = []
             for skill_id in skill_ids:
-                skill = Skills.objects.get(id=skill_id)
-                instance = JobSeekerSkill.objects.create(job_seeker=job_seeker, skill=skill, **validated_data)
+                instance = JobSeekerSkill.objects.create(job_seeker=job_seeker, skill_id=skill_id, **validated_data)
                 instances.append(instance)
             return instances
         
@@ -16,6 +16,7 @@ import cloudinary.uploader
 from cloudinary.exceptions import Error as CloudinaryError
 import mimetypes
 import os
+from jobpost_app.autocomplete import skill_index
 
 
 logger = logging.getLogger(__name__)
@@ -152,9 +153,8 @@ class SkillSearchView(APIView):
         job_seeker = request.user.job_seeker_profile
         # Exclude skills already associated with the job seeker
         existing_skill_ids = JobSeekerSkill.objects.filter(job_seeker=job_seeker).values_list('skill_id', flat=True)
-        skills = Skills.objects.filter(name__icontains=query).exclude(id__in=existing_skill_ids)[:10]
-        serializer = SkillSerializer(skills, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        skills = skill_index.search(query, exclude_ids=existing_skill_ids)
+        return Response(skills, status=status.HTTP_200_OK)
 
 class JobSeekerSkillView(APIView):
     permission_classes = [IsAuthenticated]
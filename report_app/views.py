@@ -13,8 +13,8 @@ from report_app.serializer import (  # Note: Changed from serializer to serializ
     ApplicationReportSerializer,
     InterviewReportSerializer
 )
-from django.db.models import Count, Avg, Sum, Q, F
-from django.db.models.functions import ExtractMonth
+from django.db.models import Count, Avg, Sum, Q, F, Value
+from django.db.models.functions import Coalesce, ExtractMonth
 
 class BaseReportView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
@@ -73,8 +73,8 @@ class JobPostReportView(BaseReportView):
         )
         
         # Job posts with most applications
-        top_jobs = JobPost.objects.filter(Q(is_deleted=False) & time_filter).annotate(
-            application_count=Count('applications')
+        top_jobs = JobPost.objects.filter(Q(is_deleted=False) & time_filter).select_related(
+            'job_provider'
         ).order_by('-application_count')[:10]
         
         # Monthly job posting trend (last 6 months)
@@ -146,7 +146,10 @@ class UserReportView(BaseReportView):
             count=Count('id')
         ).order_by('-count')
         
-        providers_by_location = JobProvider.objects.filter(provider_filter).values('location').annotate(
+        # Providers whose location never resolved are grouped as 'Unknown'
+        providers_by_location = JobProvider.objects.filter(provider_filter).values(
+            location=Coalesce(F('canonical_location__name'), Value('Unknown'))
+        ).annotate(
             count=Count('id')
         ).order_by('-count')[:10]
         
@@ -8,7 +8,8 @@ import bleach
 from auth_app.models import User, JobSeeker, JobProvider
 from .serializer import JobSeekerAdminSerializer, JobProviderAdminSerializer
 import logging
-from django.core.mail import send_mail
+from notification_app.email import queue_email
+from backend.pagination import KeysetPaginator, InvalidCursor, is_cursor_request, wants_total
 
 logger = logging.getLogger(__name__)
 
@@ -132,6 +133,22 @@ class JobSeekerAdminView(APIView):
                 )
             job_seekers = job_seekers.order_by(sort)
             
+            # Cursor pagination: seek on (sort key, id) with no COUNT(*) or OFFSET
+            if is_cursor_request(request):
+                keyset = KeysetPaginator(job_seekers, sort, page_size)
+                try:
+                    items, next_cursor, previous_cursor = keyset.paginate(request.query_params.get('cursor'))
+                except InvalidCursor:
+                    return Response(
+                        {'error': 'Invalid cursor'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                serializer = JobSeekerAdminSerializer(items, many=True)
+                return Response(
+                    keyset.get_response_data(serializer.data, next_cursor, previous_cursor, include_total=wants_total(request)),
+                    status=status.HTTP_200_OK
+                )
+            
             # Pagination
             paginator = Paginator(job_seekers, page_size)
             try:
@@ -396,15 +413,8 @@ class JobProviderVerifyView(APIView):
             job_provider.is_verified = True
             job_provider.save()
             try:
-                send_mail(
-                    subject='Seekerspot Account Verification Successful',
-                    message='Congratulations! Your Seekerspot job provider account has been verified successfully. '
-                            'You can now log in to your account and start using our services.',
-                    from_email=None,
-                    recipient_list=[user.email],
-                    fail_silently=False,
-                )
-                logger.info(f"Verification email sent to job provider {pk}")
+                queue_email('provider_verified', user.email)
+                logger.info(f"Verification email queued for job provider {pk}")
             except Exception as e:
                 # Log the error but don't fail the verification process
                 logger.error(f"Failed to send verification email to job provider {pk}: {str(e)}")